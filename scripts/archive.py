@@ -0,0 +1,207 @@
+"""
+Content-addressed archive of every response body the scrapers fetch.
+The engine hands each decoded body to a per-run Run, which stores it once
+under its SHA-256 and appends a line to that run's index:
+
+  data/archive/objects/<sha[:2]>/<sha>.zst      body, zstd-compressed
+  data/archive/runs/<site>/<started>.jsonl      one line per response:
+      fetched_at, kind ("page" or "session"), method, url, data (POST body),
+      status, headers, sha256, size, and seq (a listing page's position)
+
+A body already in objects/ (from this run or any earlier one) is not written
+again, so storage grows only with what the sites actually changed. zstandard
+is optional; without it new objects are gzipped (<sha>.gz) and both kinds
+are read back.
+
+Re-extraction after a parser fix runs from disk, with no network:
+
+  python3 scripts/archive.py reparse kontakt            # latest run -> data/kontakt.csv
+  python3 scripts/archive.py reparse kontakt --run 20260301T060000.000000Z --out /tmp/k.csv
+  python3 scripts/archive.py stats                      # runs, objects, dedup ratio
+"""
+
+import argparse
+import gzip
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import metrics
+
+try:
+    import zstandard
+except ImportError:     # optional: pip install zstandard; bodies are gzipped instead
+    zstandard = None
+
+ARCHIVE_DIR = Path(__file__).parent.parent / "data" / "archive"
+ZSTD_LEVEL = 10
+
+
+# --- objects ---
+
+def _object_path(sha: str, suffix: str, root: Path) -> Path:
+    return root / "objects" / sha[:2] / f"{sha}{suffix}"
+
+
+def put(body: bytes, root: Path | None = None) -> tuple[str, bool]:
+    """Store body under its SHA-256; returns (sha, whether it was new)."""
+    root = root or ARCHIVE_DIR
+    sha = hashlib.sha256(body).hexdigest()
+    if any(_object_path(sha, suffix, root).exists() for suffix in (".zst", ".gz")):
+        return sha, False
+    if zstandard:
+        path, packed = _object_path(sha, ".zst", root), zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    else:
+        path, packed = _object_path(sha, ".gz", root), gzip.compress(body, compresslevel=6)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".tmp{os.getpid()}-{threading.get_ident()}")
+    tmp.write_bytes(packed)
+    os.replace(tmp, path)       # a crash never leaves a truncated object behind
+    return sha, True
+
+
+def get(sha: str, root: Path | None = None) -> bytes:
+    """The body stored under sha."""
+    root = root or ARCHIVE_DIR
+    path = _object_path(sha, ".zst", root)
+    if path.exists():
+        if not zstandard:
+            raise RuntimeError(f"{path.name} is zstd-compressed; pip install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(path.read_bytes())
+    return gzip.decompress(_object_path(sha, ".gz", root).read_bytes())
+
+
+# --- run index ---
+
+class Run:
+    """One site run's index; store() archives a response and indexes it.
+    Runs given the same started stamp (jobs.py workers on one run) share an
+    index; each line is appended in one write, so processes can interleave."""
+
+    def __init__(self, site: str, root: Path | None = None, started: str | None = None):
+        self.site = site
+        self.root = root or ARCHIVE_DIR
+        started = started or datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")    # unique, sorts by time
+        self.index = self.root / "runs" / site / f"{started}.jsonl"
+        self._lock = threading.Lock()
+
+    def store(self, kind: str, url: str, data: bytes | None, status: int,
+              headers: list[tuple[str, str]], body: bytes, seq: int | None = None) -> str:
+        """Archive body; seq is a listing page's position in the site's output."""
+        sha, new = put(body, self.root)
+        if new:
+            metrics.incr(self.site, "archive_objects_written")
+        entry = {
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "kind": kind,
+            "method": "POST" if data is not None else "GET",
+            "url": url,
+            "data": data.decode("utf-8", "replace") if data is not None else None,
+            "status": status,
+            "headers": headers,
+            "sha256": sha,
+            "size": len(body),
+        }
+        if seq is not None:
+            entry["seq"] = seq
+        line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            self.index.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.index, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)      # line by line: a crashed run keeps its index
+            finally:
+                os.close(fd)
+        return sha
+
+
+def runs(site: str, root: Path | None = None) -> list[Path]:
+    """A site's run indexes, oldest first."""
+    return sorted(((root or ARCHIVE_DIR) / "runs" / site).glob("*.jsonl"))
+
+
+def entries(index: Path) -> list[dict]:
+    with open(index, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# --- re-extraction ---
+
+def pages(index: Path) -> list[tuple[int, dict]]:
+    """A run's listing pages as (seq, entry) in page order. Parallel runs
+    (crawl.py, jobs.py) fetch out of order, so each entry carries its seq;
+    a page fetched more than once (page-size probes) counts as its last
+    fetch. Indexes from before seq was recorded are in fetch order."""
+    listing = [entry for entry in entries(index) if entry["kind"] == "page"]
+    if not all("seq" in entry for entry in listing):
+        return list(enumerate(listing))
+    return sorted({entry["seq"]: entry for entry in listing}.items(), key=lambda item: item[0])
+
+
+def reparse(site, index: Path, root: Path | None = None) -> list[dict]:
+    """Run site.parse over a run's archived listing pages, in page order,
+    keeping each product's first occurrence as the scrape did (engine.Dedup)."""
+    import engine       # engine imports this module
+    dedup = engine.Dedup(site)
+    products: list[dict] = []
+    for seq, entry in pages(index):
+        body = get(entry["sha256"], root)
+        products.extend(dedup.add(seq, site.parse(body if site.raw else body.decode("utf-8"))[0]))
+    dedup.report(len(products))
+    return products
+
+
+def stats(root: Path | None = None) -> dict:
+    """Run, response and object counts, and how much deduplication saved."""
+    root = root or ARCHIVE_DIR
+    objects = [p for p in (root / "objects").glob("*/*") if p.suffix in (".zst", ".gz")]
+    indexes = list((root / "runs").glob("*/*.jsonl"))
+    responses = [e for index in indexes for e in entries(index)]
+    unique = {e["sha256"]: e["size"] for e in responses}
+    return {
+        "runs": len(indexes),
+        "responses": len(responses),
+        "objects": len(objects),
+        "body_bytes": sum(e["size"] for e in responses),
+        "unique_body_bytes": sum(unique.values()),
+        "stored_bytes": sum(p.stat().st_size for p in objects),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    sub = ap.add_subparsers(dest="command", required=True)
+    rp = sub.add_parser("reparse", help="re-extract a site's CSV from an archived run")
+    rp.add_argument("site")
+    rp.add_argument("--run", help="run stamp, e.g. 20260301T060000.000000Z (default: latest)")
+    rp.add_argument("--out", type=Path, help="CSV path (default: the site's usual output)")
+    sub.add_parser("stats", help="print archive size and deduplication")
+    args = ap.parse_args()
+
+    if args.command == "stats":
+        s = stats()
+        print(f"{s['runs']} runs, {s['responses']} responses, {s['objects']} objects")
+        print(f"bodies {s['body_bytes'] / 1e6:.1f} MB, unique {s['unique_body_bytes'] / 1e6:.1f} MB, "
+              f"stored {s['stored_bytes'] / 1e6:.1f} MB")
+        return
+
+    import engine
+    site = importlib.import_module(args.site).SITE
+    indexes = runs(site.name)
+    if args.run:
+        indexes = [p for p in indexes if p.stem == args.run]
+    if not indexes:
+        raise SystemExit(f"no archived run for {site.name}" + (f" at {args.run}" if args.run else ""))
+    start = time.perf_counter()
+    products = reparse(site, indexes[-1])
+    print(f"Re-parsed {indexes[-1].name}: {len(products)} products in {time.perf_counter() - start:.2f} s")
+    engine.save_csv(products, args.out or site.output, site.fields)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,26 +4,16 @@ URL pattern: https://aztechshop.az/noutbuklar/?page={page}
 Saves all products to data/aztechshop.csv.
 """
 
-import csv
-import re
-import time
-import urllib.request
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import engine
 
 BASE_URL = "https://aztechshop.az"
 CATEGORY_URL = f"{BASE_URL}/noutbuklar/"
 OUTPUT = Path(__file__).parent.parent / "data" / "aztechshop.csv"
+CARD = "div.product-thumb.uni-item"
 
 HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/144.0.0.0 Safari/537.36"
-    ),
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
     "Referer": BASE_URL,
 }
 
@@ -39,32 +29,19 @@ CSV_FIELDS = [
 ]
 
 
-def fetch_page(page: int) -> str:
-    url = f"{CATEGORY_URL}?page={page}"
-    req = urllib.request.Request(url, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return r.read().decode("utf-8")
+def page_url(page: int) -> str:
+    return f"{CATEGORY_URL}?page={page}"
 
 
-def get_last_page(soup: BeautifulSoup) -> int:
+def get_last_page(html: str) -> int:
     """Return last page number from the '>|' (last) pagination link."""
-    pager = soup.select_one("ul.pagination")
-    if not pager:
-        return 1
-    max_page = 1
-    for link in pager.select("a"):
-        href = link.get("href", "")
-        m = re.search(r"[?&]page=(\d+)", href)
-        if m:
-            max_page = max(max_page, int(m.group(1)))
-    return max_page
+    return engine.max_page(html, "ul.pagination a", pattern=r"[?&]page=(\d+)")
 
 
 def parse_products(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
     products = []
 
-    for card in soup.select("div.product-thumb.uni-item"):
+    for card in engine.cards(html, CARD):
         # --- product ID ---
         pid_btn = card.select_one("button[data-pid]")
         product_id = pid_btn.get("data-pid", "") if pid_btn else ""
@@ -117,41 +94,22 @@ def parse_products(html: str) -> list[dict]:
     return products
 
 
-def scrape_all() -> list[dict]:
-    print(f"Starting scrape — {CATEGORY_URL}")
+def parse_page(html: str) -> tuple[list[dict], int]:
+    """Products and the last page number (the PageNumbers cursor)."""
+    return parse_products(html), get_last_page(html)
 
-    print("  Fetching page 1 (discovering pagination) ...", end=" ", flush=True)
-    html = fetch_page(1)
-    soup = BeautifulSoup(html, "html.parser")
-    last_page = get_last_page(soup)
-    print(f"last page = {last_page}")
 
-    all_products: list[dict] = []
-
-    page_products = parse_products(html)
-    all_products.extend(page_products)
-    print(f"  Page 1: {len(page_products)} products  (total: {len(all_products)})")
-
-    for page in range(2, last_page + 1):
-        time.sleep(0.6)
-        print(f"  Fetching page {page}/{last_page} ...", end=" ", flush=True)
-        html = fetch_page(page)
-        page_products = parse_products(html)
-        all_products.extend(page_products)
-        print(f"got {len(page_products)} products  (total: {len(all_products)})")
-
-    return all_products
-
-
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} rows -> {path}")
+SITE = engine.Site(
+    name="aztechshop",
+    page_url=page_url,
+    parse=parse_page,
+    pagination=engine.PageNumbers(),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    delay=0.6,
+)
 
 
 if __name__ == "__main__":
-    products = scrape_all()
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
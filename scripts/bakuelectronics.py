@@ -2,32 +2,31 @@
 Scraper for bakuelectronics.az laptops.
 URL pattern: https://www.bakuelectronics.az/catalog/noutbuklar-komputerler-planshetler/noutbuklar?page={page}
 Product data is embedded in __NEXT_DATA__ JSON — no JS rendering needed.
+Page 1 is the HTML listing; its __NEXT_DATA__ carries the Next.js build ID,
+so later pages come from the compact JSON data route
+/_next/data/<buildId>/catalog/....json instead. The page size is negotiated
+on page 1 (engine.PageSize). The build ID travels in the cursor, so a page
+served from engine.ParseCache still sets it (note_build_id).
 Saves all products to data/bakuelectronics.csv.
 """
 
-import csv
 import json
-import math
-import re
-import time
-import urllib.request
 from pathlib import Path
 
+import engine
+
 BASE_URL = "https://www.bakuelectronics.az"
-CATEGORY_URL = f"{BASE_URL}/catalog/noutbuklar-komputerler-planshetler/noutbuklar"
+CATEGORY_PATH = "/catalog/noutbuklar-komputerler-planshetler/noutbuklar"
+CATEGORY_URL = f"{BASE_URL}{CATEGORY_PATH}"
 OUTPUT = Path(__file__).parent.parent / "data" / "bakuelectronics.csv"
 
 HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/144.0.0.0 Safari/537.36"
-    ),
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
     "Referer": BASE_URL,
 }
 
+NEXT_DATA_OPEN = b'<script id="__NEXT_DATA__" type="application/json">'
+NEXT_DATA_CLOSE = b"</script>"
+
 CSV_FIELDS = [
     "product_id",
     "product_code",
@@ -45,26 +44,54 @@ CSV_FIELDS = [
 ]
 
 
-def fetch_page_json(page: int) -> dict:
-    url = f"{CATEGORY_URL}?page={page}"
-    req = urllib.request.Request(url, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=30) as r:
-        html = r.read().decode("utf-8")
+# Next.js build ID, read from page 1's __NEXT_DATA__ (None until then).
+# use_data_route is cleared if the route stops answering, e.g. after a
+# redeploy changes the build ID mid-run.
+build_id: str | None = None
+use_data_route = True
+
+
+def html_url(page: int) -> str:
+    return f"{CATEGORY_URL}?page={page}&size={PAGE_SIZE.value}"
+
+
+def page_url(page: int) -> str:
+    if build_id is None or not use_data_route:
+        return html_url(page)
+    return f"{BASE_URL}/_next/data/{build_id}{CATEGORY_PATH}.json?page={page}&size={PAGE_SIZE.value}"
 
-    m = re.search(
-        r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>',
-        html,
-        re.DOTALL,
-    )
-    if not m:
+
+def fallback_url(page: int) -> str:
+    """Data route failed: go back to HTML pages for the rest of the run."""
+    global use_data_route
+    use_data_route = False
+    return html_url(page)
+
+
+def extract_next_data(body: bytes) -> dict:
+    """Return the parsed __NEXT_DATA__ JSON embedded in a page ({} if absent).
+    Only the script's bytes are decoded, not the whole page."""
+    start = body.find(NEXT_DATA_OPEN)
+    if start == -1:
         return {}
-    return json.loads(m.group(1))
+    start += len(NEXT_DATA_OPEN)
+    end = body.find(NEXT_DATA_CLOSE, start)
+    return json.loads(body[start:end if end != -1 else None])
+
+
+def page_props(body: bytes) -> tuple[dict, str | None]:
+    """pageProps from a data-route JSON body or an HTML page, and the page's
+    build ID (None for data-route JSON)."""
+    if body.lstrip()[:1] == b"{":
+        return json.loads(body).get("pageProps") or {}, None
+    next_data = extract_next_data(body)
+    return next_data.get("props", {}).get("pageProps") or {}, next_data.get("buildId")
 
 
-def parse_products(next_data: dict) -> tuple[list[dict], int, int]:
+def parse_products(props: dict) -> tuple[list[dict], int, int]:
     """Return (products, total, size)."""
     try:
-        inner = next_data["props"]["pageProps"]["products"]["products"]
+        inner = props["products"]["products"]
     except (KeyError, TypeError):
         return [], 0, 18
 
@@ -114,39 +141,38 @@ def parse_products(next_data: dict) -> tuple[list[dict], int, int]:
     return products, total, size
 
 
-def scrape_all() -> list[dict]:
-    print(f"Starting scrape — {CATEGORY_URL}")
+# The HTML listing shows 18; larger sizes are probed on page 1 of each run.
+PAGE_SIZE = engine.PageSize((100, 54, 36, 18))
 
-    print("  Fetching page 1 (discovering pagination) ...", end=" ", flush=True)
-    next_data = fetch_page_json(1)
-    page_products, total, size = parse_products(next_data)
-    last_page = math.ceil(total / size) if size else 1
-    print(f"total={total}  size={size}  last_page={last_page}")
 
-    all_products: list[dict] = []
-    all_products.extend(page_products)
-    print(f"  Page 1: {len(page_products)} products  (total: {len(all_products)})")
+def parse_page(body: bytes) -> tuple[list[dict], tuple[int, int, str | None]]:
+    """Products and the TotalSize cursor (total, size, build ID) for one page."""
+    props, page_build_id = page_props(body)
+    products, total, size = parse_products(props)
+    return products, (total, size, page_build_id)
 
-    for page in range(2, last_page + 1):
-        time.sleep(0.5)
-        print(f"  Fetching page {page}/{last_page} ...", end=" ", flush=True)
-        next_data = fetch_page_json(page)
-        page_products, _, _ = parse_products(next_data)
-        all_products.extend(page_products)
-        print(f"got {len(page_products)} products  (total: {len(all_products)})")
 
-    return all_products
+def note_build_id(cursor) -> None:
+    """Site.on_cursor: keep the build ID of an HTML page, parsed or cached."""
+    global build_id
+    build_id = cursor[2] or build_id
 
 
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} rows -> {path}")
+SITE = engine.Site(
+    name="bakuelectronics",
+    page_url=page_url,
+    parse=parse_page,
+    pagination=engine.TotalSize(),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    delay=0.5,
+    raw=True,
+    fallback_url=fallback_url,
+    page_size=PAGE_SIZE,
+    on_cursor=note_build_id,
+)
 
 
 if __name__ == "__main__":
-    products = scrape_all()
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
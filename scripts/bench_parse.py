@@ -0,0 +1,169 @@
+"""
+Parse-throughput benchmark for every site adapter's parser (engine.Site.parse).
+Runs each parser over its offline fixture pages (see fixtures.py) and reports
+pages/s, products/s, MB/s, peak RSS and traced allocation per product, plus
+how many cards fell back from the attribute scan to the DOM. Each
+site runs in its own subprocess so peak RSS is not shared between sites.
+
+Results are compared against benchmarks/parse_baseline.json; a products/s
+drop beyond REGRESSION is flagged. No network access is needed.
+
+Usage:
+  python3 scripts/bench_parse.py [site ...]     # benchmark and compare
+  python3 scripts/bench_parse.py --save         # write a new baseline
+  python3 scripts/bench_parse.py --check        # exit 1 on any regression
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import metrics
+from fixtures import SITES, digest, load_pages
+
+BASELINE = Path(__file__).parent.parent / "benchmarks" / "parse_baseline.json"
+REPEAT = 3
+REGRESSION = 0.20   # fractional products/s drop that counts as a regression
+
+
+def page_parser(site: str):
+    """Return the site adapter's body -> (products, cursor) parser and whether it takes bytes."""
+    adapter = importlib.import_module(site).SITE
+    return adapter.parse, adapter.raw
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def bench_site(site: str, repeat: int = REPEAT) -> dict:
+    """Benchmark one site in the current process."""
+    fixture_pages = load_pages(site)
+    parse, raw = page_parser(site)
+    pages = [body.encode("utf-8") for body in fixture_pages] if raw else fixture_pages
+    size = sum(len(body.encode("utf-8")) for body in fixture_pages)
+
+    metrics.reset(site)
+    products = sum(len(parse(body)[0]) for body in pages)   # warm-up + count
+    fallbacks = metrics.summary(site)["counters"].get("parse_fallbacks", 0)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in pages:
+            parse(body)
+        best = min(best, time.perf_counter() - start)
+
+    # Traced peak allocation per page, summed and spread over its products.
+    tracemalloc.start()
+    alloc = 0
+    for body in pages:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        parse(body)
+        alloc += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+
+    return {
+        "pages": len(pages),
+        "products": products,
+        "bytes": size,
+        "seconds": round(best, 4),
+        "pages_per_s": round(len(pages) / best, 1),
+        "products_per_s": round(products / best, 1),
+        "mb_per_s": round(size / 1e6 / best, 2),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "alloc_kb_per_product": round(alloc / 1024 / products, 1) if products else None,
+        "parse_fallbacks": fallbacks,
+        "fixture_digest": digest(fixture_pages),
+    }
+
+
+def run_isolated(site: str, repeat: int) -> dict:
+    """Run bench_site in a fresh interpreter so peak RSS is per site."""
+    proc = subprocess.run(
+        [sys.executable, __file__, "--child", site, "--repeat", str(repeat)],
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout)
+
+
+def load_baseline(path: Path = BASELINE) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("sites", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(results: dict, path: Path = BASELINE) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "sites": results,
+        }, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """Print a results table and return the sites that regressed."""
+    print(f"{'site':18s} {'pages':>5} {'products':>8} {'pages/s':>9} {'prod/s':>9} "
+          f"{'MB/s':>6} {'RSS MB':>7} {'KB/prod':>8}  vs baseline")
+    regressed = []
+    for site, r in results.items():
+        base = baseline.get(site)
+        note = "-"
+        if base:
+            change = r["products_per_s"] / base["products_per_s"] - 1
+            note = f"{change:+.0%}"
+            if base.get("fixture_digest") != r["fixture_digest"]:
+                note += " (fixtures changed)"
+            elif change < -REGRESSION:
+                note += "  REGRESSION"
+                regressed.append(site)
+        if r.get("parse_fallbacks"):
+            note += f"  ({r['parse_fallbacks']} DOM fallbacks)"
+        print(f"{site:18s} {r['pages']:>5} {r['products']:>8} {r['pages_per_s']:>9.1f} "
+              f"{r['products_per_s']:>9.1f} {r['mb_per_s']:>6.2f} {r['peak_rss_mb']:>7.1f} "
+              f"{r['alloc_kb_per_product'] or 0:>8.1f}  {note}")
+    return regressed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("sites", nargs="*", default=SITES)
+    ap.add_argument("--repeat", type=int, default=REPEAT)
+    ap.add_argument("--save", action="store_true", help="write results as the new baseline")
+    ap.add_argument("--check", action="store_true", help="exit 1 if any site regressed")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(bench_site(args.child, args.repeat)))
+        return
+
+    results = {site: run_isolated(site, args.repeat) for site in args.sites}
+    regressed = compare(results, load_baseline())
+
+    if args.save:
+        merged = {**load_baseline(), **results}
+        save_baseline(merged)
+        print(f"\nSaved baseline -> {BASELINE}")
+    if args.check and regressed:
+        print(f"\nRegressed: {', '.join(regressed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
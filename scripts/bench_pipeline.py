@@ -0,0 +1,316 @@
+"""
+End-to-end pipeline benchmark: scrape -> combine -> charts.
+Serves fixture responses (see fixtures.py) from a local HTTP server, points
+every site adapter at it and runs the real engine.scrape / combine / chart
+code into a temporary directory. Times each stage, each site and each chart
+and writes a JSON report that can be diffed across commits.
+
+The server gzips responses when the client accepts it (--no-gzip to turn
+that off), so "bytes" is what crossed the wire and "decoded_bytes" what the
+parsers saw.
+
+Polite delays (metrics.sleep in the engine) are recorded but skipped, so
+scrape timings show network + parse cost; the skipped total and each site's
+fetch/parse split from metrics.py are reported per site. --scale renders N× the catalog (more pages per site) to show how each
+stage grows with catalog size; each scale runs in a fresh interpreter.
+--warm scrapes every site once untimed first, so the timed scrape is a
+rerun over unchanged pages: saved sessions and parse-cache hits.
+
+Usage:
+  python3 scripts/bench_pipeline.py                      # scale 1, all sites
+  python3 scripts/bench_pipeline.py --scale 1 10         # 1× and 10× catalogs
+  python3 scripts/bench_pipeline.py --sites kontakt irshad --latency 50
+  python3 scripts/bench_pipeline.py --warm               # rerun over warm caches
+  python3 scripts/bench_pipeline.py --compare old_report.json
+"""
+
+import argparse
+import contextlib
+import csv
+import gzip
+import importlib
+import io
+import json
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import archive
+import engine
+import metrics
+from fixtures import SITES, landing_page, next_data_route, render_pages
+
+ROOT = Path(__file__).parent.parent
+REPORT = ROOT / "benchmarks" / "pipeline_report.json"
+PAGE_PARAMS = ("p", "page", "s", "sehife")
+
+
+# --- mock server ---
+
+class FixtureServer(ThreadingHTTPServer):
+    """Serves /<site>/... from pre-rendered fixture pages."""
+
+    daemon_threads = True
+
+    def __init__(self, pages: dict[str, list[str]], latency: float = 0.0, compress: bool = True):
+        super().__init__(("127.0.0.1", 0), FixtureHandler)
+        self.pages = pages
+        self.latency = latency
+        self.compress = compress
+        self.gzipped: dict[str, bytes] = {}     # payload -> gzip body, compressed once
+        self.requests: dict[str, int] = {site: 0 for site in pages}
+        self.bytes_sent: dict[str, int] = {site: 0 for site in pages}
+
+    @property
+    def base(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def page_number(site: str, path: str, query: dict, body: dict) -> int:
+    """Resolve a scraper request to a 1-based fixture page number."""
+    if site == "soliton":
+        return int(body.get("offset", ["0"])[0]) // 15 + 1
+    for key in PAGE_PARAMS:
+        if key in query and query[key][0].isdigit():
+            return int(query[key][0])
+    m = re.search(r"/page/(\d+)", path) or re.search(r"/(\d+)/?$", path)
+    return int(m.group(1)) if m else 1
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def _respond(self) -> None:
+        url = urllib.parse.urlsplit(self.path)
+        site, _, rest = url.path.lstrip("/").partition("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        body = urllib.parse.parse_qs(self.rfile.read(length).decode()) if length else {}
+
+        pages = self.server.pages.get(site)
+        if pages is None:
+            self.send_error(404)
+            return
+        if site == "irshad" and "list-products" not in rest:
+            payload = landing_page(site)
+        else:
+            n = page_number(site, "/" + rest, urllib.parse.parse_qs(url.query), body)
+            if not 1 <= n <= len(pages):
+                self.send_error(404)
+                return
+            payload = pages[n - 1]
+            if site == "bakuelectronics" and rest.startswith("_next/data/"):
+                payload = next_data_route(payload)
+
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        data = payload.encode("utf-8")
+        gzip_ok = self.server.compress and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzip_ok:
+            if payload not in self.server.gzipped:
+                self.server.gzipped[payload] = gzip.compress(data, compresslevel=6)
+            data = self.server.gzipped[payload]
+        self.send_response(200)
+        json_body = payload.startswith("{")
+        self.send_header("Content-Type", "application/json" if json_body else "text/html; charset=utf-8")
+        if gzip_ok:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server.requests[site] += 1
+        self.server.bytes_sent[site] += len(data)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+# --- scraper wiring ---
+
+def point_at(mod, base: str) -> None:
+    """Rewrite a scraper module's URL constants to the mock server."""
+    origin = mod.BASE_URL
+    for name, value in list(vars(mod).items()):
+        if name.isupper() and isinstance(value, str) and value.startswith(origin):
+            setattr(mod, name, base + value[len(origin):])
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    return result, round(time.perf_counter() - start, 3)
+
+
+def run_pipeline(sites: list[str], scale: int, latency: float, compress: bool = True,
+                 warm: bool = False) -> dict:
+    """Run scrape -> combine -> charts once and return stage timings."""
+    render_start = time.perf_counter()
+    pages = {site: render_pages(site, scale) for site in sites}
+    render_s = time.perf_counter() - render_start
+
+    metrics.skip_sleeps = True
+    server = FixtureServer(pages, latency, compress)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    result = {"scale": scale, "fixture_render_s": round(render_s, 2), "stages": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        data_dir = work / "data"
+        engine.PAGE_SIZE_CACHE = work / "cache" / "page_sizes.json"
+        engine.SESSION_CACHE = work / "cache" / "sessions.json"
+        engine.PARSE_CACHE = work / "cache" / "parse"
+        engine.THROTTLE_CACHE = work / "cache" / "throttle.json"
+        engine.HEALTH_CACHE = work / "cache" / "health.json"
+        archive.ARCHIVE_DIR = work / "archive"
+
+        # --- scrape ---
+        site_stats = {}
+        for site in sites:
+            mod = importlib.import_module(site)
+            point_at(mod, f"{server.base}/{site}")
+            if warm:
+                _timed(engine.scrape, mod.SITE)
+                metrics.reset(site)
+                server.requests[site] = server.bytes_sent[site] = 0
+            products, seconds = _timed(engine.scrape, mod.SITE)
+            m = metrics.summary(site)
+            with contextlib.redirect_stdout(io.StringIO()):
+                engine.save_csv(products, data_dir / f"{site}.csv", mod.SITE.fields)
+            site_stats[site] = {
+                "seconds": seconds,
+                "pages": len(pages[site]),
+                "requests": server.requests[site],
+                "products": len(products),
+                "bytes": server.bytes_sent[site],
+                "decoded_bytes": m["decoded_bytes"],
+                "products_per_s": round(len(products) / seconds, 1) if seconds else None,
+                "fetch_s": m["fetch_s"],
+                "parse_s": m["parse_s"],
+                "parse_cache_hits": m["counters"].get("parse_cache_hits", 0),
+                "skipped_sleep_s": round(m["sleep_s"], 1),
+            }
+        server.shutdown()
+        result["stages"]["scrape"] = {
+            "seconds": round(sum(s["seconds"] for s in site_stats.values()), 3),
+            "skipped_sleep_s": round(sum(s["skipped_sleep_s"] for s in site_stats.values()), 1),
+            "sites": site_stats,
+        }
+
+        # --- combine ---
+        combine = importlib.import_module("combine")
+        output = data_dir / "data.csv"
+        _, seconds = _timed(combine.main, data_dir, output)
+        with open(output, newline="", encoding="utf-8") as f:
+            rows = sum(1 for _ in csv.DictReader(f))
+        result["stages"]["combine"] = {"seconds": seconds, "rows": rows}
+
+        # --- charts ---
+        charts = importlib.import_module("generate_charts")
+        charts.CHARTS_DIR = work / "charts"
+        charts.CHARTS_DIR.mkdir()
+        (_, priced), load_s = _timed(charts.load, output)
+        chart_times = {"load": load_s}
+        for chart in charts.CHARTS:
+            _, chart_times[chart.__name__] = _timed(chart, priced)
+        result["stages"]["charts"] = {
+            "seconds": round(sum(chart_times.values()), 3),
+            "charts": chart_times,
+        }
+
+    result["total_s"] = round(sum(s["seconds"] for s in result["stages"].values()), 3)
+    return result
+
+
+# --- reporting ---
+
+def _git_commit() -> str:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True)
+        return proc.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def print_run(run: dict, previous: dict | None = None) -> None:
+    def delta(new, old):
+        return f"  ({new / old - 1:+.0%})" if old else ""
+
+    prev = previous or {"stages": {}}
+    print(f"\n=== scale {run['scale']}× — total {run['total_s']:.2f} s "
+          f"(fixtures rendered in {run['fixture_render_s']:.1f} s) ===")
+    scrape = run["stages"]["scrape"]
+    prev_sites = prev["stages"].get("scrape", {}).get("sites", {})
+    print(f"scrape   {scrape['seconds']:8.2f} s   (+{scrape['skipped_sleep_s']:.0f} s polite delay skipped)")
+    for site, s in scrape["sites"].items():
+        old = prev_sites.get(site, {}).get("seconds")
+        print(f"  {site:18s} {s['seconds']:7.2f} s  {s['requests']:>5} req  {s['products']:>6} products  "
+              f"{s['bytes'] / 1e6:7.2f} MB ({s['decoded_bytes'] / 1e6:.2f} decoded){delta(s['seconds'], old)}")
+    for stage in ("combine", "charts"):
+        s = run["stages"][stage]
+        old = prev["stages"].get(stage, {}).get("seconds")
+        print(f"{stage:8s} {s['seconds']:8.2f} s{delta(s['seconds'], old)}")
+    for name, seconds in run["stages"]["charts"]["charts"].items():
+        old = prev["stages"].get("charts", {}).get("charts", {}).get(name)
+        print(f"  {name:28s} {seconds:6.2f} s{delta(seconds, old)}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--sites", nargs="+", default=SITES)
+    ap.add_argument("--scale", nargs="+", type=int, default=[1])
+    ap.add_argument("--latency", type=float, default=0.0, help="per-request delay in ms")
+    ap.add_argument("--no-gzip", action="store_true", help="serve uncompressed even if gzip is accepted")
+    ap.add_argument("--warm", action="store_true", help="time a rerun: scrape each site once untimed first")
+    ap.add_argument("--out", type=Path, default=REPORT)
+    ap.add_argument("--compare", type=Path, help="earlier report to diff against")
+    ap.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_pipeline(args.sites, args.child, args.latency / 1000, not args.no_gzip, args.warm)))
+        return
+
+    previous = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            previous = {r["scale"]: r for r in json.load(f)["runs"]}
+
+    runs = []
+    for scale in args.scale:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", str(scale), "--latency", str(args.latency),
+             *(["--no-gzip"] if args.no_gzip else []), *(["--warm"] if args.warm else []),
+             "--sites", *args.sites],
+            capture_output=True, text=True, check=True,
+        )
+        run = json.loads(proc.stdout)
+        print_run(run, previous.get(scale))
+        runs.append(run)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "latency_ms": args.latency,
+        "gzip": not args.no_gzip,
+        "warm": args.warm,
+        "runs": runs,
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"\nReport -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,25 +7,18 @@ only the grid_content div is parsed to avoid double-counting.
 Saves all products to data/brothers.csv.
 """
 
-import csv
 import re
-import urllib.request
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import engine
 
 BASE_URL = "https://brothers.az"
 LISTING_URL = f"{BASE_URL}/product/ucuz-qiymete-notebooklar"
 OUTPUT = Path(__file__).parent.parent / "data" / "brothers.csv"
+CARD = "article.single_product"
+CARD_CUT = '<div class="list_content"'   # list view repeats the grid fields
 
 HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/144.0.0.0 Safari/537.36"
-    ),
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
     "Referer": BASE_URL,
 }
 
@@ -38,12 +31,6 @@ CSV_FIELDS = [
 ]
 
 
-def fetch_page() -> str:
-    req = urllib.request.Request(LISTING_URL, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=60) as r:
-        return r.read().decode("utf-8")
-
-
 def parse_price(text: str) -> float | None:
     """Convert '2,219 ₼' or '999 ₼' -> float. Comma is thousands separator."""
     if not text:
@@ -62,10 +49,9 @@ def parse_price(text: str) -> float | None:
 
 
 def parse_products(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
     products = []
 
-    for card in soup.select("article.single_product"):
+    for card in engine.cards(html, CARD, CARD_CUT):
         # --- URL & product ID ---
         link = card.select_one("a.primary_img")
         url = link.get("href", "") if link else ""
@@ -103,19 +89,22 @@ def parse_products(html: str) -> list[dict]:
     return products
 
 
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"Saved {len(products)} rows -> {path}")
+def parse_page(html: str) -> tuple[list[dict], None]:
+    """Products; there is no pagination cursor on the single page."""
+    return parse_products(html), None
+
+
+SITE = engine.Site(
+    name="brothers",
+    page_url=lambda page: LISTING_URL,
+    parse=parse_page,
+    pagination=engine.SinglePage(),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    timeout=60,
+)
 
 
 if __name__ == "__main__":
-    print(f"Fetching {LISTING_URL} (single large page) ...")
-    html = fetch_page()
-    print("  Parsing products ...")
-    products = parse_products(html)
-    print(f"  Found {len(products)} products")
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
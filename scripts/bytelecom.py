@@ -8,26 +8,17 @@ Product ID extracted from wire:click="toggleWishlist({id})" button.
 Saves all products to data/bytelecom.csv.
 """
 
-import csv
 import re
-import time
-import urllib.request
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import engine
 
 BASE_URL = "https://bytelecom.az"
 CATEGORY_URL = f"{BASE_URL}/az/category/noutbuklar"
 OUTPUT = Path(__file__).parent.parent / "data" / "bytelecom.csv"
+CARD = "div.product"
 
 HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/144.0.0.0 Safari/537.36"
-    ),
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
     "Referer": BASE_URL,
 }
 
@@ -42,22 +33,13 @@ CSV_FIELDS = [
 ]
 
 
-def fetch_page(page: int) -> str:
-    url = f"{CATEGORY_URL}?page={page}"
-    req = urllib.request.Request(url, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return r.read().decode("utf-8")
+def page_url(page: int) -> str:
+    return f"{CATEGORY_URL}?page={page}"
 
 
-def get_last_page(soup: BeautifulSoup) -> int:
-    max_page = 1
-    pag = soup.select_one("ul.pagination")
-    if pag:
-        for btn in pag.select("button[wire\\:click]"):
-            m = re.search(r"gotoPage\((\d+)", btn.get("wire:click", ""))
-            if m:
-                max_page = max(max_page, int(m.group(1)))
-    return max_page
+def get_last_page(html: str) -> int:
+    return engine.max_page(html, "ul.pagination button[wire:click]",
+                           attr="wire:click", pattern=r"gotoPage\((\d+)")
 
 
 def parse_price(text: str) -> float | None:
@@ -80,10 +62,9 @@ def parse_price(text: str) -> float | None:
 
 
 def parse_products(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
     products = []
 
-    for card in soup.select("div.product"):
+    for card in engine.cards(html, CARD):
         # --- product ID from toggleWishlist button ---
         wish_btn = card.select_one("button.favourite-product[wire\\:click]")
         product_id = ""
@@ -131,41 +112,22 @@ def parse_products(html: str) -> list[dict]:
     return products
 
 
-def scrape_all() -> list[dict]:
-    print(f"Starting scrape — {CATEGORY_URL}")
-
-    print("  Fetching page 1 (discovering pagination) ...", end=" ", flush=True)
-    html = fetch_page(1)
-    soup = BeautifulSoup(html, "html.parser")
-    last_page = get_last_page(soup)
-    print(f"last page = {last_page}")
-
-    all_products: list[dict] = []
-
-    page_products = parse_products(html)
-    all_products.extend(page_products)
-    print(f"  Page 1: {len(page_products)} products  (total: {len(all_products)})")
-
-    for page in range(2, last_page + 1):
-        time.sleep(0.5)
-        print(f"  Fetching page {page}/{last_page} ...", end=" ", flush=True)
-        html = fetch_page(page)
-        page_products = parse_products(html)
-        all_products.extend(page_products)
-        print(f"got {len(page_products)} products  (total: {len(all_products)})")
-
-    return all_products
+def parse_page(html: str) -> tuple[list[dict], int]:
+    """Products and the last page number (the PageNumbers cursor)."""
+    return parse_products(html), get_last_page(html)
 
 
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} rows -> {path}")
+SITE = engine.Site(
+    name="bytelecom",
+    page_url=page_url,
+    parse=parse_page,
+    pagination=engine.PageNumbers(),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    delay=0.5,
+)
 
 
 if __name__ == "__main__":
-    products = scrape_all()
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
@@ -0,0 +1,147 @@
+"""
+Change feed: what changed in data/data.csv since the last diff.
+
+Compares the new unified snapshot with the previous one, joined on
+(source, product_id) (the URL for listings without an id), and writes one
+JSON line per change:
+
+  new              listed now, not before
+  delisted         listed before, not now
+  price_drop       price_azn went down
+  price_rise       price_azn went up
+  price_change     price_azn appeared or disappeared (price on request)
+  discount_change  same price, different discount_azn / discount_percent
+
+Each line carries the title, URL and old and new price_azn, discount_azn and
+discount_percent (null where there is none). The previous snapshot is
+hashed into a dict of just those columns, then the new one streams past it,
+so a diff is one pass over each file and memory grows with the old
+snapshot's key count, not its width. Run it after combine.py:
+
+  data/changes/<UTC time>.jsonl     one feed per diff with changes
+  data/changes/snapshot.csv         data.csv as of the last diff
+
+The first run only takes the snapshot.
+
+Usage:
+  python3 scripts/changes.py                        # data.csv vs the last diff
+  python3 scripts/changes.py old.csv new.csv -o feed.jsonl
+"""
+
+import argparse
+import csv
+import json
+import shutil
+from collections import Counter
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+import combine
+
+CHANGES_DIR = Path(__file__).parent.parent / "data" / "changes"
+TRACKED = ("price_azn", "discount_azn", "discount_percent")
+
+
+def _listings(path: Path) -> Iterator[tuple[tuple[str, str], str, str, tuple]]:
+    """(source, id), title, url and the TRACKED values of each row of a data.csv.
+    Reads only those columns; the values are numbers already (combine.validate)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        col = {name: n for n, name in enumerate(next(reader))}
+        source, pid, title, url = col["source"], col["product_id"], col["title"], col["url"]
+        tracked = [col[name] for name in TRACKED]
+        for row in reader:
+            yield ((row[source], row[pid] or row[url]), row[title], row[url],
+                   tuple(float(row[n]) if row[n] else None for n in tracked))
+
+
+def _index(path: Path) -> dict[tuple[str, str], tuple]:
+    """(source, id) -> (title, url, TRACKED values) for every listing of a snapshot."""
+    index: dict[tuple[str, str], tuple] = {}
+    for key, title, url, values in _listings(path):
+        index.setdefault(key, (title, url, values))
+    return index
+
+
+def _event(kind: str, key: tuple[str, str], title: str, url: str, old: tuple | None, new: tuple | None) -> dict:
+    event = {"type": kind, "source": key[0], "product_id": key[1], "title": title, "url": url}
+    for n, field in enumerate(TRACKED):
+        event[f"old_{field}"] = old[n] if old else None
+        event[f"new_{field}"] = new[n] if new else None
+    return event
+
+
+def _kind(old: tuple, new: tuple) -> str | None:
+    (old_price, *old_discount), (new_price, *new_discount) = old, new
+    if old_price != new_price:
+        if old_price is None or new_price is None:
+            return "price_change"
+        return "price_drop" if new_price < old_price else "price_rise"
+    return "discount_change" if old_discount != new_discount else None
+
+
+def diff(old_path: Path, new_path: Path, out_path: Path) -> Counter[str]:
+    """Write the changes from old_path to new_path as JSONL; returns counts per type.
+    out_path is only created when there is a change."""
+    before = _index(old_path)
+    seen: set[tuple[str, str]] = set()
+    counts: Counter[str] = Counter()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as out:
+        def emit(event: dict) -> None:
+            out.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+            counts[event["type"]] += 1
+
+        for key, title, url, new in _listings(new_path):
+            if key in seen:
+                continue            # one listing per key; the first row wins, as in the index
+            seen.add(key)
+            old = before.pop(key, None)
+            if old is None:
+                emit(_event("new", key, title, url, None, new))
+            elif kind := _kind(old[2], new):
+                emit(_event(kind, key, title, url, old[2], new))
+        for key, (title, url, old) in before.items():
+            emit(_event("delisted", key, title, url, old, None))
+    if not counts:
+        out_path.unlink()
+    return counts
+
+
+def update(data_file: Path = combine.OUTPUT, root: Path = CHANGES_DIR) -> Path | None:
+    """Diff data_file against the last snapshot and take a new one; returns the feed, if any."""
+    snapshot = root / "snapshot.csv"
+    feed = None
+    if snapshot.exists():
+        path = root / f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}.jsonl"
+        counts = diff(snapshot, data_file, path)
+        print(", ".join(f"{n} {kind}" for kind, n in counts.most_common()) or "No changes")
+        feed = path if counts else None
+    else:
+        print("No previous snapshot; this one is the baseline")
+    root.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(data_file, snapshot)
+    return feed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("old", nargs="?", type=Path, help="older data.csv (default: the last diff's snapshot)")
+    ap.add_argument("new", nargs="?", type=Path, default=combine.OUTPUT)
+    ap.add_argument("-o", "--out", type=Path, help="feed to write when OLD is given")
+    args = ap.parse_args()
+
+    if args.old is None:
+        if feed := update(args.new):
+            print(f"Saved -> {feed}")
+        return
+    out = args.out or Path(f"{args.new.stem}.changes.jsonl")
+    counts = diff(args.old, args.new, out)
+    print(", ".join(f"{n} {kind}" for kind, n in counts.most_common()) or "No changes")
+    if counts:
+        print(f"Saved -> {out}")
+
+
+if __name__ == "__main__":
+    main()
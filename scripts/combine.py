@@ -6,12 +6,42 @@ Maps site-specific column names to a unified schema.
 Unified columns:
   source, product_id, title, url, price_azn, old_price_azn,
   discount_azn, discount_percent, brand, specs, availability,
-  label, monthly_payment_azn, rating, review_count
+  label, monthly_payment_azn, rating, review_count, product_key,
+  cpu_family, cpu_model, ram_gb, ssd_gb, gpu, screen_in
+
+'product_key' groups listings of the same product across retailers
+(see matching.py). The spec columns are extracted from title and specs
+text (see specs.py); results are cached in data/cache/specs.json.
+Listings without specs get the spec text enrich.py read from their detail
+page, if any (data/cache/details.jsonl).
+
+Numeric columns are parsed and checked here once (see validate): prices
+and discount_percent are plain numbers, missing or rejected values are
+empty, and 'rejected' says why a value was dropped. load() reads data.csv
+back with those columns as float / int / None.
+
+With --workers N, each source CSV is read and normalized in one of N worker
+processes; the output is the same as a single-process run.
+
+Usage:
+  python3 scripts/combine.py
+  python3 scripts/combine.py --workers 8
 """
 
+import argparse
 import csv
+import math
+import re
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
+from detail_cache import DetailCache
+from matching import assign_product_keys
+from specs import SPEC_FIELDS, cache_entries, cache_size, extract_row, load_cache, merge_cache, save_cache
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 OUTPUT = DATA_DIR / "data.csv"
 
@@ -31,15 +61,109 @@ UNIFIED_FIELDS = [
     "monthly_payment_azn",
     "rating",
     "review_count",
+    "product_key",
+    *SPEC_FIELDS,
+    "rejected",
 ]
 
+FLOAT_FIELDS = ["price_azn", "old_price_azn", "discount_azn", "discount_percent",
+                "monthly_payment_azn", "rating", "screen_in"]
+INT_FIELDS = ["review_count", "ram_gb", "ssd_gb"]
+
 
 def read_csv(path: Path) -> list[dict]:
     with open(path, newline="", encoding="utf-8") as f:
         return list(csv.DictReader(f))
 
 
-def normalize(row: dict, source: str) -> dict:
+def load(path: Path = OUTPUT) -> list[dict]:
+    """data.csv rows, FLOAT_FIELDS / INT_FIELDS as float / int, empty or
+    missing as None. A data.csv from before validate() gets its raw values
+    checked here, as combine would have."""
+    rows = read_csv(path)
+    checked = not rows or "rejected" in rows[0]
+    for row in rows:
+        if not checked:
+            row["rejected"] = "; ".join(validate(row))
+        for f in FLOAT_FIELDS:
+            if not isinstance(value := row.get(f), float):
+                row[f] = float(value) if value else None
+        for f in INT_FIELDS:
+            if not isinstance(value := row.get(f), int):
+                row[f] = int(value) if value else None
+    return rows
+
+
+# --- typed values ---
+# Scrapers write prices as they parsed them; a few are placeholders (0.0
+# for "price on request") and discount_percent is a label ("11%", "-13 %").
+# validate() turns every numeric column into a float / int or None, and
+# drops values that cannot be right, noting "field='raw': reason" in the
+# row's 'rejected' column. Checks are per row and cheap; readers of
+# data.csv can trust the columns (load()).
+
+PERCENT_RE = re.compile(r"-?\s*(\d+(?:\.\d+)?)\s*%?")
+
+
+def _number(raw: str) -> float:
+    value = float(raw)
+    if not math.isfinite(value):
+        raise ValueError
+    return value
+
+
+def validate(out: dict) -> list[str]:
+    """Type the numeric columns of a unified row in place; returns rejection reasons."""
+    rejected = []
+
+    def reject(field: str, raw, reason: str) -> None:
+        rejected.append(f"{field}={raw!r}: {reason}")
+        out[field] = None
+
+    for field in ("price_azn", "old_price_azn", "discount_azn", "monthly_payment_azn", "rating", "review_count"):
+        raw = out[field].strip()
+        out[field] = None
+        if raw:
+            try:
+                out[field] = _number(raw)
+            except ValueError:
+                reject(field, raw, "not a number")
+
+    # --- discount_percent: magnitude of the label, "-13 %" -> 13.0 ---
+    raw = out["discount_percent"].strip()
+    out["discount_percent"] = None
+    if raw:
+        m = PERCENT_RE.fullmatch(raw)
+        if m is None:
+            reject("discount_percent", raw, "not a percentage")
+        elif not 0 <= float(m.group(1)) < 100:
+            reject("discount_percent", raw, "outside 0-100")
+        else:
+            out["discount_percent"] = float(m.group(1))
+
+    # --- ranges ---
+    for field in ("price_azn", "old_price_azn", "monthly_payment_azn"):
+        if out[field] is not None and out[field] <= 0:
+            reject(field, out[field], "not positive")
+    if out["discount_azn"] is not None and out["discount_azn"] < 0:
+        reject("discount_azn", out["discount_azn"], "negative")
+    if out["old_price_azn"] is not None and out["price_azn"] is not None and out["old_price_azn"] < out["price_azn"]:
+        reject("old_price_azn", out["old_price_azn"], "below price_azn")
+    if out["review_count"] is not None:
+        if out["review_count"] < 0 or not out["review_count"].is_integer():
+            reject("review_count", out["review_count"], "not a count")
+        else:
+            out["review_count"] = int(out["review_count"])
+    if out["rating"] is not None:
+        if not 0 <= out["rating"] <= 5:
+            reject("rating", out["rating"], "outside 0-5")
+        elif out["rating"] == 0 and not out["review_count"]:
+            out["rating"] = None        # bakuelectronics shows 0 stars for "no reviews yet"
+
+    return rejected
+
+
+def normalize(row: dict, source: str, details: dict | None = None) -> dict:
     """Map a site-specific row dict to the unified schema."""
     out = {f: "" for f in UNIFIED_FIELDS}
     out["source"] = source
@@ -79,8 +203,10 @@ def normalize(row: dict, source: str) -> dict:
     # --- brand ---
     out["brand"] = row.get("brand", "") or row.get("brand_id", "")
 
-    # --- specs (also covers 'description' from aztechshop) ---
+    # --- specs (also covers 'description' from aztechshop; else the detail page, see enrich.py) ---
     out["specs"] = row.get("specs", "") or row.get("description", "")
+    if not out["specs"] and details:
+        out["specs"] = details.get(out["url"], {}).get("specs", "")
 
     # --- availability ---
     out["availability"] = row.get("availability", "")
@@ -108,6 +234,10 @@ def normalize(row: dict, source: str) -> dict:
     out["rating"]       = row.get("rating", "")
     out["review_count"] = row.get("review_count", "")
 
+    # --- typed spec columns ---
+    out.update(extract_row(out["title"], out["specs"]))
+
+    out["rejected"] = "; ".join(validate(out))
     return out
 
 
@@ -132,28 +262,88 @@ SOURCES = {
 }
 
 
-def main() -> None:
+def normalize_source(stem: str, source: str, data_dir: Path, details: dict | None = None) -> list[dict]:
+    """data/<stem>.csv in the unified schema."""
+    return [normalize(r, source, details) for r in read_csv(data_dir / f"{stem}.csv")]
+
+
+# --- parallel combine ---
+# Reading and normalizing (mostly spec extraction) is per source, so each
+# source can go to a worker process. A worker loads the spec and detail
+# caches once (_init_worker, so it works with any multiprocessing start
+# method) and returns each source's rows with the spec cache entries it
+# added, which the parent merges and saves. pool.map hands results back in
+# SOURCES order as they complete, so rows, product keys and the output are
+# the same as in one process. Matching (assign_product_keys) compares rows
+# across sources and stays in the parent.
+
+_details: dict = {}
+_cache_seen = 0         # this worker's spec cache entries already sent back
+
+
+def _init_worker(data_dir: Path) -> None:
+    global _details, _cache_seen
+    load_cache(data_dir / "cache" / "specs.json")
+    _details = DetailCache(data_dir / "cache" / "details.jsonl").entries
+    _cache_seen = cache_size()
+
+
+def _normalize_in_worker(source: tuple[str, str], data_dir: Path) -> tuple[list[dict], dict]:
+    global _cache_seen
+    rows = normalize_source(*source, data_dir, _details)
+    added = cache_entries(_cache_seen)
+    _cache_seen += len(added)
+    return rows, added
+
+
+def _normalized(sources: list[tuple[str, str]], data_dir: Path, workers: int) -> Iterator[list[dict]]:
+    """Each source's unified rows, in order."""
+    if workers <= 1 or len(sources) <= 1:
+        details = DetailCache(data_dir / "cache" / "details.jsonl").entries
+        for stem, source in sources:
+            yield normalize_source(stem, source, data_dir, details)
+        return
+    with ProcessPoolExecutor(min(workers, len(sources)), initializer=_init_worker, initargs=(data_dir,)) as pool:
+        for rows, added in pool.map(_normalize_in_worker, sources, repeat(data_dir)):
+            merge_cache(added)
+            yield rows
+
+
+def main(data_dir: Path = DATA_DIR, output: Path = OUTPUT, workers: int = 1) -> None:
     all_rows: list[dict] = []
+    specs_cache = data_dir / "cache" / "specs.json"
+    load_cache(specs_cache)
 
+    sources = []
     for stem, source in SOURCES.items():
-        path = DATA_DIR / f"{stem}.csv"
+        path = data_dir / f"{stem}.csv"
         if not path.exists():
             print(f"  [SKIP] {path.name} not found")
             continue
-        rows = read_csv(path)
-        normalized = [normalize(r, source) for r in rows]
-        all_rows.extend(normalized)
+        sources.append((stem, source))
+    for (_, source), rows in zip(sources, _normalized(sources, data_dir, workers)):
+        all_rows.extend(rows)
         print(f"  {source:30s} {len(rows):>5} rows")
 
     print(f"\nTotal: {len(all_rows)} rows")
+    rejected = Counter((r["source"], reason.split("=", 1)[0])
+                       for r in all_rows if r["rejected"] for reason in r["rejected"].split("; "))
+    for (source, field), n in sorted(rejected.items()):
+        print(f"  {source:30s} {n:>5} {field} rejected")
+    save_cache(specs_cache)
+
+    assign_product_keys(all_rows)
+    print(f"Matched into {len({r['product_key'] for r in all_rows if r['product_key']})} products")
 
-    with open(OUTPUT, "w", newline="", encoding="utf-8") as f:
+    with open(output, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=UNIFIED_FIELDS)
         writer.writeheader()
         writer.writerows(all_rows)
 
-    print(f"Saved -> {OUTPUT}")
+    print(f"Saved -> {output}")
 
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--workers", type=int, default=1, help="processes reading and normalizing sources")
+    main(workers=ap.parse_args().workers)
@@ -0,0 +1,205 @@
+"""
+Crawl many sites at once from one global page queue.
+Every listing page of every site is a task. Page 1 of a site is queued at
+the start; when it is parsed, the pages its pagination can already list
+(Pagination.plan) are queued together, and chained pages (next()) one at a
+time as each arrives. Tasks wait in per-host queues, each host capped by
+its engine.Throttle: floor(limit) requests in flight and one request start
+per Site.delay / limit seconds, the limit adapting to the host's latency and
+errors. Any idle worker takes the next task from whichever host has
+capacity, preferring the longest queue, so small sites finish alongside the
+long crawls instead of after them and the run takes about as long as the
+busiest host needs at its rate cap.
+
+Each site's CSV is written and its metrics exported when the crawl ends;
+a site whose page fails (or fails its engine.Health checks) keeps its
+previous CSV and the others carry on.
+
+Usage:
+  python3 scripts/crawl.py                          # every site
+  python3 scripts/crawl.py notecomp compstore ctrl --workers 4
+"""
+
+import argparse
+import importlib
+import threading
+import time
+from collections import deque
+from typing import NamedTuple
+
+import engine
+import metrics
+from combine import SOURCES
+
+SITES = list(SOURCES)
+WORKERS = 8
+
+
+class Task(NamedTuple):
+    site: str
+    page: object
+    seq: int            # position of the page's products in the site's output
+
+
+class Host:
+    """A host's queued tasks; its caps come from the host's engine.Throttle."""
+
+    def __init__(self, name: str, throttle: engine.Throttle):
+        self.name = name
+        self.throttle = throttle
+        self.queue: deque[Task] = deque()
+        self.in_flight = 0
+        self.next_start = 0.0           # time.monotonic() the next request may start
+
+    @property
+    def concurrency(self) -> int:
+        return self.throttle.concurrency
+
+    @property
+    def interval(self) -> float:
+        """Seconds between request starts."""
+        return 0.0 if metrics.skip_sleeps else self.throttle.interval
+
+
+class Crawl:
+    """Scrape several sites through one queue; run() returns products per site."""
+
+    def __init__(self, sites: list[engine.Site], workers: int = WORKERS):
+        self.sites = {site.name: site for site in sites}
+        self.workers = workers
+        self.hosts: dict[str, Host] = {}
+        self.site_runs: dict[str, engine.SiteRun] = {}
+        self.results: dict[str, dict[int, list[dict]]] = {site.name: {} for site in sites}
+        self.errors: dict[str, Exception] = {}
+        self.last_seq: dict[str, int] = {}      # highest page position queued per site
+        self.pending = 0                # tasks queued or in flight
+        self.cond = threading.Condition()
+
+    def run(self) -> dict[str, list[dict]]:
+        self._run([Task(site.name, site.pagination.start, 0) for site in self.sites.values()])
+        results = {}
+        for name, pages in self.results.items():
+            if name in self.errors:
+                continue
+            site_run = self.site_runs[name]
+            products = site_run.dedup.assemble(pages)
+            try:
+                site_run.finish(products)
+            except engine.ParserDrift as e:
+                print(f"  {e}")
+                self.errors[name] = e
+                continue
+            results[name] = products
+        return results
+
+    def _run(self, tasks: list[Task]) -> None:
+        """Work through tasks and all they lead to, then close the site runs."""
+        with self.cond:
+            for task in tasks:
+                self._put(task)
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for site_run in self.site_runs.values():
+            site_run.close()
+
+    # --- scheduling (callers hold self.cond) ---
+
+    def _host(self, task: Task) -> Host:
+        """The host a task's request goes to, created on first use."""
+        site = self.sites[task.site]
+        name = engine.host_of(site)
+        if name not in self.hosts:
+            self.hosts[name] = Host(name, engine.throttle_for(site))
+        return self.hosts[name]
+
+    def _put(self, task: Task) -> None:
+        self._host(task).queue.append(task)
+        self.pending += 1
+
+    def _take(self) -> tuple[Host, Task] | None:
+        """Block until some host may start a request; None when all work is done."""
+        with self.cond:
+            while self.pending:
+                now = time.monotonic()
+                ready = [h for h in self.hosts.values() if h.queue and h.in_flight < h.concurrency]
+                startable = [h for h in ready if h.next_start <= now]
+                if startable:
+                    host = max(startable, key=lambda h: len(h.queue))
+                    host.in_flight += 1
+                    host.next_start = now + host.interval
+                    return host, host.queue.popleft()
+                self.cond.wait(min((h.next_start - now for h in ready), default=None))
+            return None
+
+    def _done(self, host: Host, follow: list[Task]) -> None:
+        with self.cond:
+            host.in_flight -= 1
+            self.pending -= 1
+            for task in follow:
+                self._put(task)
+            self.cond.notify_all()
+
+    def _fail(self, task: Task, err: Exception) -> None:
+        """Drop the rest of a failed site's work."""
+        with self.cond:
+            self.errors.setdefault(task.site, err)
+            for host in self.hosts.values():
+                dropped = [t for t in host.queue if t.site == task.site]
+                host.queue = deque(t for t in host.queue if t.site != task.site)
+                self.pending -= len(dropped)
+
+    # --- work ---
+
+    def _worker(self) -> None:
+        while (taken := self._take()) is not None:
+            host, task = taken
+            follow: list[Task] = []
+            if task.site not in self.errors:
+                try:
+                    follow = self._load(task)
+                except Exception as e:
+                    print(f"  {task.site}: page {task.page} failed: {e}")
+                    self._fail(task, e)
+            self._done(host, follow)
+
+    def _load(self, task: Task) -> list[Task]:
+        """Fetch and parse one page; return the tasks it makes known."""
+        site = self.sites[task.site]
+        if task.seq == 0:
+            self.site_runs[site.name] = engine.SiteRun(site)
+            products, cursor = self.site_runs[site.name].first()
+        else:
+            products, cursor = self.site_runs[site.name].load(task.page, seq=task.seq)
+        print(f"  {site.name:16s} page {task.page}: {len(products)} products")
+        follow = [Task(site.name, page, seq) for page, seq in engine.next_pages(site, task.page, task.seq, cursor)]
+        with self.cond:
+            self.last_seq[site.name] = max([self.last_seq.get(site.name, 0)] + [t.seq for t in follow])
+            last = not follow and task.seq == self.last_seq[site.name]
+        site_run = self.site_runs[site.name]
+        site_run.health.check(task.page, products, last)
+        self.results[site.name][task.seq] = site_run.dedup.add(task.seq, products)
+        return follow
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("sites", nargs="*", default=SITES)
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    args = ap.parse_args()
+
+    sites = [importlib.import_module(name).SITE for name in args.sites]
+    start = time.perf_counter()
+    crawl = Crawl(sites, args.workers)
+    results = crawl.run()
+    print(f"\nCrawled {len(results)}/{len(sites)} sites in {time.perf_counter() - start:.1f} s")
+    for site in sites:
+        if site.name in results:
+            engine.save_csv(results[site.name], site.output, site.fields)
+        metrics.export(site.name, error=crawl.errors.get(site.name))
+
+
+if __name__ == "__main__":
+    main()
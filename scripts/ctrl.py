@@ -7,25 +7,18 @@ Last page discovered from ul.page-numbers links.
 Saves all products to data/ctrl.csv.
 """
 
-import csv
 import re
-import time
 import urllib.parse
-import urllib.request
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import engine
 
 BASE_URL = "https://ctrl.az"
 TAG_URL = f"{BASE_URL}/product-tag/notebooklar"
 OUTPUT = Path(__file__).parent.parent / "data" / "ctrl.csv"
+CARD = "li.product"
 
 HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/144.0.0.0 Safari/537.36"
-    ),
     "Accept": "*/*",
     "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8",
     "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
@@ -51,21 +44,12 @@ CSV_FIELDS = [
 ]
 
 
-def fetch_page(page: int) -> str:
-    url = f"{TAG_URL}/" if page == 1 else f"{TAG_URL}/page/{page}/"
-    req = urllib.request.Request(url, data=PAYLOAD, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return r.read().decode("utf-8")
+def page_url(page: int) -> str:
+    return f"{TAG_URL}/" if page == 1 else f"{TAG_URL}/page/{page}/"
 
 
-def get_last_page(soup: BeautifulSoup) -> int:
-    max_page = 1
-    for a in soup.select("ul.page-numbers a"):
-        href = a.get("href", "")
-        m = re.search(r"/page/(\d+)/", href)
-        if m:
-            max_page = max(max_page, int(m.group(1)))
-    return max_page
+def get_last_page(html: str) -> int:
+    return engine.max_page(html, "ul.page-numbers a", pattern=r"/page/(\d+)/")
 
 
 def parse_price(bdi_el) -> float | None:
@@ -82,10 +66,9 @@ def parse_price(bdi_el) -> float | None:
 
 
 def parse_products(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
     products = []
 
-    for card in soup.select("li.product"):
+    for card in engine.cards(html, CARD):
         # --- product ID from li class list: post-{id} ---
         classes = " ".join(card.get("class", []))
         pid_m = re.search(r"\bpost-(\d+)\b", classes)
@@ -131,41 +114,23 @@ def parse_products(html: str) -> list[dict]:
     return products
 
 
-def scrape_all() -> list[dict]:
-    print(f"Starting scrape — {TAG_URL}")
+def parse_page(html: str) -> tuple[list[dict], int]:
+    """Products and the last page number (the PageNumbers cursor)."""
+    return parse_products(html), get_last_page(html)
 
-    print("  Fetching page 1 (discovering pagination) ...", end=" ", flush=True)
-    html = fetch_page(1)
-    soup = BeautifulSoup(html, "html.parser")
-    last_page = get_last_page(soup)
-    print(f"last page = {last_page}")
 
-    all_products: list[dict] = []
-
-    page_products = parse_products(html)
-    all_products.extend(page_products)
-    print(f"  Page 1: {len(page_products)} products  (total: {len(all_products)})")
-
-    for page in range(2, last_page + 1):
-        time.sleep(0.5)
-        print(f"  Fetching page {page}/{last_page} ...", end=" ", flush=True)
-        html = fetch_page(page)
-        page_products = parse_products(html)
-        all_products.extend(page_products)
-        print(f"got {len(page_products)} products  (total: {len(all_products)})")
-
-    return all_products
-
-
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} rows -> {path}")
+SITE = engine.Site(
+    name="ctrl",
+    page_url=page_url,
+    page_data=lambda page: PAYLOAD,
+    parse=parse_page,
+    pagination=engine.PageNumbers(),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    delay=0.5,
+)
 
 
 if __name__ == "__main__":
-    products = scrape_all()
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
@@ -0,0 +1,46 @@
+"""
+Detail page specs by URL, as enrich.py fetched them.
+One JSON line per page in data/cache/details.jsonl, appended as pages
+arrive, so a long enrichment run that stops loses nothing. Later lines win.
+combine.py fills empty specs from it, which is why this module needs nothing
+from the scraping engine.
+"""
+
+import json
+import threading
+from pathlib import Path
+
+DETAIL_CACHE = Path(__file__).parent.parent / "data" / "cache" / "details.jsonl"
+
+
+class DetailCache:
+    """Detail page specs by URL; add() appends to DETAIL_CACHE as pages arrive."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or DETAIL_CACHE
+        self.entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["url"]] = entry      # later lines win
+        except (OSError, ValueError):
+            pass
+
+    def add(self, entry: dict) -> None:
+        with self._lock:
+            self.entries[entry["url"]] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def compact(self) -> None:
+        """Rewrite the file with one line per URL."""
+        with self._lock:
+            tmp = self.path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            tmp.replace(self.path)
@@ -0,0 +1,1254 @@
+"""
+Shared scraping engine.
+Each scripts/<site>.py is a small adapter: it declares its URLs, request
+headers, pagination strategy and card parser as an engine.Site, and
+engine.run(site) does the rest: fetching (with a cookie jar, saved between
+runs for sites with a session), pagination, polite delays, metrics and CSV
+output.
+
+Pagination strategies:
+  PageNumbers  last page read from page 1 (?p=, ?page=, ?s=, /page/N/, ctrl POST)
+  TotalSize    page count = ceil(total / size) from page 1 metadata (bakuelectronics)
+  Offset       offset += step while the response says there is more (soliton)
+  Cursor       next page token read from every response (irshad #loadMore)
+  SinglePage   everything on one page (brothers)
+
+Sites whose endpoint takes a page size declare an engine.PageSize; page 1
+probes the largest size the server honours and the result is cached in
+data/cache/page_sizes.json. Parse results are cached by response hash in
+data/cache/parse/, so unchanged pages are not parsed again. Every response
+body is kept in the content-addressed archive (archive.py, data/archive/).
+The pace per host adapts to its latency and errors (Throttle). Every page
+is checked against the site's history (Health); a site whose markup has
+drifted stops at the first bad page instead of saving empty rows. Products
+that reappear on a later page while the catalog shifts are dropped (Dedup).
+Product detail pages (enrich.py) are read by detail_specs().
+"""
+
+import csv
+import functools
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from html import unescape
+from http.cookiejar import Cookie, CookieJar
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from bs4 import __version__ as bs4_version
+
+import archive
+import metrics
+
+try:
+    import brotli
+except ImportError:     # optional: pip install brotli to also accept br
+    brotli = None
+
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/144.0.0.0 Safari/537.36"
+)
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": ACCEPT_ENCODING,
+}
+
+
+# --- pagination strategies ---
+# Site.parse reads each page once and returns (products, cursor); the cursor
+# is the pagination state found on that page, in the shape the strategy
+# expects (see each class). start: first page value. After each page the
+# engine asks plan() for the remaining pages it can already enumerate; if
+# none, it follows next() one page at a time until it returns None. total()
+# is the listing's item count, when the cursor carries one.
+
+class Pagination:
+    start = 1
+
+    def plan(self, page, cursor) -> list:
+        return []
+
+    def next(self, page, cursor):
+        return None
+
+    def total(self, cursor) -> int | None:
+        return None
+
+
+class PageNumbers(Pagination):
+    """Numbered pages; cursor = highest page number linked from the page."""
+
+    def plan(self, page, cursor):
+        return list(range(page + 1, cursor + 1)) if page == self.start else []
+
+
+class TotalSize(Pagination):
+    """Numbered pages; cursor = (total, size, ...), counted from page 1."""
+
+    def plan(self, page, cursor):
+        if page != self.start:
+            return []
+        total, size = cursor[:2]
+        last_page = math.ceil(total / size) if size else 1
+        return list(range(page + 1, last_page + 1))
+
+    def total(self, cursor):
+        return cursor[0]
+
+
+class Offset(Pagination):
+    """Offset/limit paging; cursor = (has_more, total).
+    step may be a callable, e.g. reading a negotiated PageSize."""
+
+    start = 0
+
+    def __init__(self, step: int | Callable[[], int]):
+        self.step = step
+
+    def next(self, page, cursor):
+        step = self.step() if callable(self.step) else self.step
+        return page + step if cursor[0] else None
+
+    def total(self, cursor):
+        return cursor[1]
+
+
+class Cursor(Pagination):
+    """cursor = the next page value, None when done."""
+
+    def next(self, page, cursor):
+        return cursor
+
+
+class SinglePage(Pagination):
+    """The whole catalog is served on one page; cursor = None."""
+
+
+# --- page-size negotiation ---
+# Endpoints that take a page size (soliton's limit, bakuelectronics' size)
+# cost fewer round trips at the largest size they honour. The first page of
+# each run doubles as the probe: it is requested at the cached size (or the
+# largest candidate). An HTTP error or an empty page means the size was
+# rejected and the next smaller candidate is tried; fewer products than
+# requested while the listing has more means the server truncated, and the
+# served count becomes the size. The outcome is cached per site and re-probed
+# from the top once it is older than PAGE_SIZE_TTL.
+
+PAGE_SIZE_CACHE = Path(__file__).parent.parent / "data" / "cache" / "page_sizes.json"
+PAGE_SIZE_TTL = timedelta(days=7)
+
+
+class PageSize:
+    """Page sizes to try, largest first; the last is the size the site is
+    known to serve. The listing's item count comes from the pagination
+    cursor (Pagination.total). Adapters put .value into their request."""
+
+    def __init__(self, candidates: tuple[int, ...]):
+        self.candidates = tuple(sorted(candidates, reverse=True))
+        self.value = self.candidates[-1]
+
+
+def _load_page_sizes(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _page_size_tries(site_name: str, size: PageSize, path: Path) -> list[int]:
+    """Sizes to request page 1 at: the fresh cached size, else every candidate."""
+    cached = _load_page_sizes(path).get(site_name)
+    if cached:
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(cached["probed_at"])
+        if age < PAGE_SIZE_TTL:
+            return [cached["size"]] + [c for c in size.candidates if c < cached["size"]]
+    return list(size.candidates)
+
+
+def save_page_size(site_name: str, value: int, path: Path) -> None:
+    sizes = _load_page_sizes(path)
+    sizes[site_name] = {"size": value, "probed_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(sizes, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def negotiate_page_size(site: "Site", load: Callable[[], tuple]) -> tuple:
+    """Load page 1 at the largest size the endpoint honours; returns load()'s result."""
+    size = site.page_size
+    tries = _page_size_tries(site.name, size, PAGE_SIZE_CACHE)
+    for n, value in enumerate(tries):
+        last = n == len(tries) - 1
+        size.value = value
+        if n:
+            metrics.sleep(site.name, site.delay)
+        try:
+            products, cursor = load()
+        except urllib.error.HTTPError:
+            if last:
+                raise
+            metrics.incr(site.name, "page_size_rejected")
+            continue
+        total = site.pagination.total(cursor)
+        if not products and total and not last:
+            metrics.incr(site.name, "page_size_rejected")
+            continue
+        if products and len(products) < min(value, total or value):
+            size.value = len(products)
+            metrics.incr(site.name, "page_size_truncated")
+        break
+    save_page_size(site.name, size.value, PAGE_SIZE_CACHE)
+    return products, cursor
+
+
+# --- site adapter ---
+
+@dataclass
+class Site:
+    name: str                                    # metrics label, e.g. "kontakt"
+    page_url: Callable[[int], str]               # page value -> URL
+    parse: Callable[[str], tuple[list[dict], object]]   # body -> (rows, cursor)
+    pagination: Pagination
+    fields: list[str]                            # CSV columns
+    output: Path
+    headers: dict = field(default_factory=dict)  # merged over DEFAULT_HEADERS
+    page_data: Callable[[int], bytes] | None = None         # POST body, if any
+    session: Callable[[Callable], dict] | None = None       # get -> extra headers
+    cookies: dict = field(default_factory=dict)  # preset cookies, e.g. city choice
+    session_ttl: float = 2 * 3600                # seconds a saved session is reused
+    delay: float = 0.5                           # polite delay between pages
+    concurrency: int = 4                         # most requests in flight per host (Throttle)
+    timeout: float = 30
+    raw: bool = False                            # parse gets the undecoded bytes
+    fallback_url: Callable[[int], str] | None = None        # retried on HTTP error
+    page_size: PageSize | None = None            # negotiated on page 1
+    detail: Callable[[str], str] | None = None   # detail page -> specs text (default: detail_specs)
+    on_cursor: Callable[[object], None] | None = None       # sees every page's cursor, parsed or cached
+
+
+# --- card parsing ---
+# Adapters declare their card container as a simple selector,
+# "tag.class.class[attr]". cards() skips everything before the first card's
+# opening tag in the raw HTML and parses the rest with a SoupStrainer, so only
+# card subtrees become tree nodes; headers, menus, footers and scripts are
+# never built. With a cut marker, each card is instead sliced out on its own
+# and truncated at the marker, for pages where most of a card's markup is
+# not needed (brothers repeats every card's content in a list view).
+
+_CARD_RE = re.compile(r"^(\w+)((?:\.[\w-]+)*)((?:\[[\w:-]+\])*)$")
+
+
+@functools.lru_cache(maxsize=None)
+def _card_patterns(card: str) -> tuple[re.Pattern, SoupStrainer]:
+    m = _CARD_RE.match(card)
+    if not m:
+        raise ValueError(f"unsupported card selector: {card!r}")
+    tag, classes, attrs = m.group(1), m.group(2).split(".")[1:], re.findall(r"\[([\w:-]+)\]", m.group(3))
+    lookaheads = "".join(
+        rf"""(?=[^>]*\sclass=["'](?:[^"']*\s)?{re.escape(c)}(?:\s[^"']*)?["'])""" for c in classes
+    ) + "".join(rf"(?=[^>]*\s{re.escape(a)}[\s=>/])" for a in attrs)
+    opening = re.compile(rf"<{tag}\b{lookaheads}", re.IGNORECASE)
+    # The class attribute is still one raw string when the strainer sees it;
+    # select(card) afterwards applies the full selector.
+    if classes:
+        return opening, SoupStrainer(tag, class_=re.compile(rf"(?:^|\s){re.escape(classes[0])}(?:\s|$)"))
+    return opening, SoupStrainer(tag, attrs={a: True for a in attrs})
+
+
+def cards(html: str, card: str, cut: str | None = None) -> list[Tag]:
+    """Return the card elements of a listing page, parsing only their markup."""
+    opening, strainer = _card_patterns(card)
+    starts = [m.start() for m in opening.finditer(html)]
+    if not starts:
+        return []
+    if not cut:
+        return BeautifulSoup(html[starts[0]:], "html.parser", parse_only=strainer).select(card)
+    found = []
+    for start, end in zip(starts, starts[1:] + [len(html)]):
+        stop = html.find(cut, start, end)
+        piece = html[start:end if stop == -1 else stop]
+        found += BeautifulSoup(piece, "html.parser", parse_only=strainer).select(card)[:1]
+    return found
+
+
+# --- attribute scan ---
+# Fast path for cards whose fields sit in attributes and a few small elements:
+# read them from the raw card markup with precompiled patterns, no tree at
+# all. The helpers mirror what BeautifulSoup (html.parser) would return and
+# raise ScanError when the markup is too irregular to be sure; adapters then
+# parse that card through the DOM path and count a parse_fallbacks event.
+
+class ScanError(ValueError):
+    """Card markup the attribute scan cannot read reliably."""
+
+
+class Element(NamedTuple):
+    name: str
+    attrs: dict[str, str]
+    start: int      # index of the opening "<"
+    inner: tuple[int, int]
+
+
+_TAG_RE = re.compile(r"""<(/?)([a-zA-Z][\w:-]*)((?:[^>"']|"[^"]*"|'[^']*')*)>""")
+_ATTR_RE = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>"']+)))?""")
+_PART_RE = re.compile(r"^(\w*)((?:\.[\w-]+)*)((?:\[[\w:-]+\])*)$")
+_UNREADABLE = ("<!--", "<![CDATA[", "<script", "<style", "<SCRIPT", "<STYLE")
+
+
+def card_slices(html: str, card: str) -> list[str]:
+    """Raw markup from each card's opening tag up to the next card's."""
+    opening, _ = _card_patterns(card)
+    starts = [m.start() for m in opening.finditer(html)]
+    return [html[a:b] for a, b in zip(starts, starts[1:] + [len(html)])]
+
+
+def tag_attrs(tag_text: str) -> dict[str, str]:
+    """Attributes of one opening tag's attribute text, unescaped like html.parser."""
+    attrs = {}
+    for m in _ATTR_RE.finditer(tag_text):
+        value = next((v for v in m.group(2, 3, 4) if v is not None), "")
+        attrs[m.group(1).lower()] = unescape(value)
+    return attrs
+
+
+@functools.lru_cache(maxsize=None)
+def _part(part: str) -> tuple[str, tuple[str, ...], tuple[str, ...]]:
+    m = _PART_RE.match(part)
+    if not m:
+        raise ValueError(f"unsupported selector part: {part!r}")
+    return m.group(1).lower(), tuple(m.group(2).split(".")[1:]), tuple(re.findall(r"\[([\w:-]+)\]", m.group(3)))
+
+
+def _close(markup: str, name: str, pos: int, hi: int) -> int:
+    """Index of the end tag closing the <name> element whose content starts at pos."""
+    depth = 1
+    for m in _TAG_RE.finditer(markup, pos, hi):
+        if m.group(2).lower() != name or m.group(3).endswith("/"):
+            continue
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return m.start()
+    raise ScanError(f"unclosed <{name}>")
+
+
+def _tags_with(markup: str, needle: str, lo: int, hi: int):
+    """Opening-tag matches whose text contains needle, found with str.find
+    instead of matching every tag in [lo, hi)."""
+    pos, last = lo, -1
+    while (pos := markup.find(needle, pos, hi)) != -1:
+        start = markup.rfind("<", lo, pos)
+        pos += len(needle)
+        if start == -1 or start == last:
+            continue
+        m = _TAG_RE.match(markup, start, hi)
+        if m and m.end() >= pos:
+            last = start
+            yield m
+
+
+def _elements(markup: str, part: str, lo: int, hi: int):
+    tag, classes, attrs = _part(part)
+    tags = _tags_with(markup, classes[0], lo, hi) if classes else _TAG_RE.finditer(markup, lo, hi)
+    for m in tags:
+        if m.group(1) or (tag and m.group(2).lower() != tag):
+            continue
+        found = tag_attrs(m.group(3))
+        have = found.get("class", "").split()
+        if all(c in have for c in classes) and all(a in found for a in attrs):
+            name = m.group(2).lower()
+            end = m.end() if m.group(3).endswith("/") else _close(markup, name, m.end(), hi)
+            yield Element(name, found, m.start(), (m.end(), end))
+
+
+def element(markup: str) -> Element:
+    """The element whose opening tag starts the markup (a card slice)."""
+    m = _TAG_RE.match(markup)
+    if not m:
+        raise ScanError("no opening tag")
+    name = m.group(2).lower()
+    return Element(name, tag_attrs(m.group(3)), 0, (m.end(), _close(markup, name, m.end(), len(markup))))
+
+
+def select(markup: str, selector: str, within: Element | None = None) -> list[Element]:
+    """Descendants matching a "tag.class[attr] .class" selector, in document order."""
+    parts = selector.split()
+    found: dict[int, Element] = {}
+
+    def walk(i: int, lo: int, hi: int) -> None:
+        for el in _elements(markup, parts[i], lo, hi):
+            if i == len(parts) - 1:
+                found.setdefault(el.start, el)
+            else:
+                walk(i + 1, *el.inner)
+
+    walk(0, *(within.inner if within else (0, len(markup))))
+    return [found[k] for k in sorted(found)]
+
+
+def select_one(markup: str, selector: str, within: Element | None = None) -> Element | None:
+    found = select(markup, selector, within)
+    return found[0] if found else None
+
+
+def text(markup: str, el: Element, sep: str = "") -> str:
+    """el's text like Tag.get_text(sep, strip=True)."""
+    inner = markup[el.inner[0]:el.inner[1]]
+    if any(s in inner for s in _UNREADABLE):
+        raise ScanError("comment or script inside element")
+    parts = (unescape(p).strip() for p in _TAG_RE.sub("\0", inner).split("\0"))
+    return sep.join(p for p in parts if p)
+
+
+# --- pager scan ---
+# The page-number links sit outside the cards, so they are read with the
+# same scan helpers instead of a second, whole-page DOM build.
+
+def max_page(html: str, selector: str, attr: str | None = "href", pattern: str = r"(\d+)") -> int:
+    """Highest page number in the pager: pattern's first group, searched in
+    attr (or the element text when attr is None) of every element matching
+    the comma-separated selectors. 1 when there is no pager."""
+    selectors = [sel.strip() for sel in selector.split(",")]
+    try:
+        values = [
+            el.attrs.get(attr, "") if attr else text(html, el)
+            for sel in selectors for el in select(html, sel)
+        ]
+    except ScanError:
+        soup = BeautifulSoup(html, "html.parser")
+        values = [el.get(attr, "") if attr else el.get_text(strip=True) for el in soup.select(selector)]
+    pages = [int(m.group(1)) for v in values if (m := re.search(pattern, v))]
+    return max([1, *pages])
+
+
+# --- transport ---
+# Listing pages compress 5-10x, so every request advertises ACCEPT_ENCODING
+# and the body is decoded here; metrics record both the bytes on the wire and
+# the decoded size.
+
+def decompress(body: bytes, content_encoding: str) -> bytes:
+    """Undo a Content-Encoding header's codings (applied in order, so undone in reverse)."""
+    for coding in reversed([c.strip().lower() for c in content_encoding.split(",") if c.strip()]):
+        if coding in ("gzip", "x-gzip"):
+            body = gzip.decompress(body)
+        elif coding == "deflate":
+            try:
+                body = zlib.decompress(body)
+            except zlib.error:      # raw deflate without the zlib header, as some servers send
+                body = zlib.decompress(body, -zlib.MAX_WBITS)
+        elif coding == "br" and brotli:
+            body = brotli.decompress(body)
+        elif coding != "identity":
+            raise ValueError(f"unsupported Content-Encoding: {coding}")
+    return body
+
+
+def new_opener(jar: CookieJar | None = None) -> urllib.request.OpenerDirector:
+    """Opener with its own cookie jar; one per site run."""
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(jar if jar is not None else CookieJar()))
+
+
+def fetch(site: Site, url: str, opener: urllib.request.OpenerDirector,
+          data: bytes | None = None, headers: dict | None = None,
+          decode: bool = True, record: Callable | None = None) -> str | bytes:
+    """GET (or POST data to) url; record(url, data, status, headers, body), if
+    given, gets the decoded response, e.g. archive.Run.store."""
+    req = urllib.request.Request(url, data=data, headers={**DEFAULT_HEADERS, **(headers or {})})
+    with metrics.request(site.name):
+        with opener.open(req, timeout=site.timeout) as r:
+            body = metrics.read(site.name, r)
+            encoding = r.headers.get("Content-Encoding", "")
+            status, response_headers = r.status, list(r.headers.items())
+        body = decompress(body, encoding)
+        metrics.decoded(site.name, len(body))
+    if record:
+        record(url, data, status, response_headers, body)
+    return body.decode("utf-8") if decode else body
+
+
+# --- adaptive throttle ---
+# One Throttle per host sets the pace of its requests. Its limit is a
+# multiple of the site's polite rate: at limit L the engine waits
+# Site.delay / L between requests and crawl.py allows floor(L) in flight.
+# The limit moves AIMD-style: each healthy response adds INCREASE / L (so
+# +INCREASE per window of L requests), while a 429, a 5xx, a network error or
+# a latency spike halves it, at most once per window. A spike is smoothed latency
+# above LATENCY_SPIKE times the host's usual latency: the median of its last
+# BASELINE_WINDOW responses, so one fast outlier (jitter, a 304) does not
+# make every normal response look slow, and a host that settles at a new
+# speed becomes the new normal. Listing and detail pages (SiteRun.kind) keep
+# separate baselines, being different sizes. The limit stays between
+# THROTTLE_FLOOR and Site.concurrency; it and the baselines are saved in
+# THROTTLE_CACHE, so the next run starts at the pace the host last
+# tolerated.
+
+THROTTLE_CACHE = Path(__file__).parent.parent / "data" / "cache" / "throttle.json"
+THROTTLE_FLOOR = 0.25
+INCREASE = 0.25
+LATENCY_SPIKE = 3.0
+LATENCY_FLOOR = 0.05        # baseline floor, so jitter on very fast hosts is no spike
+BASELINE_WINDOW = 50        # responses the latency baseline is the median of
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+
+
+def _load_throttles(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Throttle:
+    """AIMD pace for one host; shared by every site and thread using it."""
+
+    def __init__(self, host: str, delay: float, ceiling: int, site: str):
+        saved = _load_throttles(THROTTLE_CACHE).get(host, {})
+        self.host = host
+        self.delay = delay
+        self.ceiling = ceiling
+        self.site = site                # metrics label
+        self.limit = min(max(saved.get("limit", 1.0), THROTTLE_FLOOR), ceiling)
+        baselines = saved.get("baseline_s")
+        self.latencies: dict[str, deque[float]] = {     # kind -> recent response times
+            kind: deque([seconds], maxlen=BASELINE_WINDOW)
+            for kind, seconds in (baselines.items() if isinstance(baselines, dict) else ())}
+        self.smoothed: dict[str, float] = {}
+        self.hold = 0                   # responses to wait before the next decrease
+        self._lock = threading.Lock()
+
+    @property
+    def concurrency(self) -> int:
+        return max(1, int(self.limit))
+
+    @property
+    def interval(self) -> float:
+        return self.delay / self.limit
+
+    def baseline(self, kind: str = "page") -> float | None:
+        """Usual latency of kind's responses (median of the recent ones)."""
+        window = self.latencies.get(kind)
+        return statistics.median(window) if window else None
+
+    def success(self, seconds: float, kind: str = "page") -> None:
+        with self._lock:
+            baseline = self.baseline(kind) or seconds
+            self.latencies.setdefault(kind, deque(maxlen=BASELINE_WINDOW)).append(seconds)
+            smoothed = self.smoothed.get(kind)
+            smoothed = self.smoothed[kind] = seconds if smoothed is None else 0.7 * smoothed + 0.3 * seconds
+            self.hold = max(self.hold - 1, 0)
+            if smoothed > LATENCY_SPIKE * max(baseline, LATENCY_FLOOR):
+                self._decrease("latency")
+            else:
+                self.limit = min(self.limit + INCREASE / self.limit, self.ceiling)
+
+    def failure(self, reason: str) -> None:
+        with self._lock:
+            self.hold = max(self.hold - 1, 0)
+            self._decrease(reason)
+
+    def _decrease(self, reason: str) -> None:
+        if self.hold:
+            return
+        self.limit = max(self.limit / 2, THROTTLE_FLOOR)
+        self.smoothed.clear()
+        self.hold = math.ceil(self.limit)
+        metrics.incr(self.site, "throttle_decreases")
+        metrics.incr(self.site, f"throttle_{reason}")
+
+    def save(self) -> None:
+        with self._lock:
+            throttles = _load_throttles(THROTTLE_CACHE)
+            throttles[self.host] = {
+                "limit": round(self.limit, 3),
+                "baseline_s": {kind: round(self.baseline(kind), 4) for kind in self.latencies},
+                "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            }
+            THROTTLE_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            with open(THROTTLE_CACHE, "w", encoding="utf-8") as f:
+                json.dump(throttles, f, indent=2, sort_keys=True)
+                f.write("\n")
+
+
+_throttles: dict[str, Throttle] = {}
+_throttles_lock = threading.Lock()
+
+
+def host_of(site: "Site") -> str:
+    return urllib.parse.urlsplit(site.page_url(site.pagination.start)).hostname or site.name
+
+
+def throttle_for(site: "Site", host: str | None = None) -> Throttle:
+    """The Throttle of a host (default: the site's listing host), created on first use."""
+    host = host or host_of(site)
+    with _throttles_lock:
+        if host not in _throttles:
+            _throttles[host] = Throttle(host, site.delay, site.concurrency, site.name)
+        return _throttles[host]
+
+
+def retry_after(err: urllib.error.HTTPError) -> float | None:
+    """Seconds from a Retry-After header, when it holds a number."""
+    value = err.headers.get("Retry-After", "") if err.headers else ""
+    return float(value) if value.strip().isdigit() else None
+
+
+# --- sessions ---
+# Sites with a session bootstrap (irshad's CSRF page) or preset cookies
+# (birmarket) keep their cookies and session headers between runs in
+# SESSION_CACHE. A saved session is reused until it is session_ttl old;
+# there is no separate check request, the first listing request is the
+# check. If the server answers it with a SESSION_REJECTED status, the
+# session is bootstrapped again and the request retried once.
+
+SESSION_CACHE = Path(__file__).parent.parent / "data" / "cache" / "sessions.json"
+SESSION_REJECTED = {401, 403, 419}      # 419: Laravel's CSRF token mismatch
+
+
+def _load_sessions(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _cookie_dict(cookie: Cookie) -> dict:
+    d = dict(vars(cookie))
+    d["rest"] = d.pop("_rest")
+    return d
+
+
+def preset_cookie(name: str, value: str, domain: str) -> Cookie:
+    """A plain host cookie, as if the site had set it."""
+    return Cookie(0, name, value, None, False, domain, False, False, "/", True,
+                  False, None, True, None, None, {})
+
+
+class Session:
+    """Cookies and extra headers for one site run. Persisted in SESSION_CACHE
+    when the site has a session hook or preset cookies."""
+
+    def __init__(self, site: "Site", jar: CookieJar, get: Callable[..., str]):
+        self.site = site
+        self.jar = jar
+        self.get = get                  # url -> body, handed to the session hook
+        self.headers: dict = {}
+        self.created_at = ""
+        self.fresh = False              # bootstrapped during this run
+        self.generation = 0             # bumped by every bootstrap
+        self.persistent = bool(site.session or site.cookies)
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Reuse a saved session younger than site.session_ttl, else bootstrap."""
+        if not self.persistent:
+            return
+        saved = _load_sessions(SESSION_CACHE).get(self.site.name)
+        if saved:
+            age = datetime.now(timezone.utc) - datetime.fromisoformat(saved["created_at"])
+            if age.total_seconds() < self.site.session_ttl:
+                for cookie in saved["cookies"]:
+                    self.jar.set_cookie(Cookie(**cookie))
+                self.jar.clear_expired_cookies()
+                self.headers, self.created_at = saved["headers"], saved["created_at"]
+                return
+        self.bootstrap()
+
+    def bootstrap(self) -> None:
+        """New session: preset cookies, then the site's session hook."""
+        self.jar.clear()
+        host = urllib.parse.urlsplit(self.site.page_url(self.site.pagination.start)).hostname
+        for name, value in self.site.cookies.items():
+            self.jar.set_cookie(preset_cookie(name, value, host))
+        self.headers = self.site.session(self.get) if self.site.session else {}
+        self.created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.fresh = True
+        self.generation += 1
+        metrics.incr(self.site.name, "session_bootstraps")
+        self.save()
+
+    def rejected(self, err: urllib.error.HTTPError, generation: int) -> bool:
+        """If err means the session a request was sent with (its generation)
+        went stale, make sure there is a newer one and return True so the
+        request is retried. A session bootstrapped this run is final."""
+        if not self.persistent or err.code not in SESSION_REJECTED:
+            return False
+        with self._lock:
+            if generation != self.generation:   # a concurrent request already renewed it
+                return True
+            if self.fresh:
+                return False
+            self.bootstrap()
+            return True
+
+    def save(self) -> None:
+        """Write the jar (including cookies the server rotated) and headers."""
+        if not self.persistent:
+            return
+        sessions = _load_sessions(SESSION_CACHE)
+        sessions[self.site.name] = {
+            "created_at": self.created_at,
+            "headers": self.headers,
+            "cookies": [_cookie_dict(c) for c in self.jar],
+        }
+        SESSION_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with open(SESSION_CACHE, "w", encoding="utf-8") as f:
+            json.dump(sessions, f, indent=2, sort_keys=True)
+            f.write("\n")
+
+
+# --- page health ---
+# A parser that no longer matches the markup does not raise, it returns
+# fewer rows or none, and pagination carries on to the last page. Health
+# checks every parsed page against the site's last healthy run, kept in
+# HEALTH_CACHE, and raises ParserDrift at the first page that fails:
+#   - a page with no products, or a page before the last with fewer than
+#     MIN_PAGE_SHARE of the usual products per page
+#   - once MIN_HEALTH_ROWS rows are in, a share of rows with a price or an
+#     id (the first CSV field) below MIN_FIELD_SHARE of the usual share;
+#     with no history yet, only a share of zero fails
+# finish() then compares the run's total with the last healthy run's
+# (MIN_RUN_SHARE), before any CSV is written. A failure flags the site in
+# HEALTH_CACHE and the previous CSV stays; a healthy run becomes the new
+# baseline. To accept a site's new normal, delete its entry.
+
+HEALTH_CACHE = Path(__file__).parent.parent / "data" / "cache" / "health.json"
+MIN_PAGE_SHARE = 0.5
+MIN_FIELD_SHARE = 0.5
+MIN_RUN_SHARE = 0.5
+MIN_HEALTH_ROWS = 20
+
+
+class ParserDrift(ValueError):
+    """A page or run whose products look nothing like the site's history."""
+
+
+_health_lock = threading.Lock()
+
+
+def _load_health(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Health:
+    """One run's page checks for a site; check() and finish() raise ParserDrift."""
+
+    def __init__(self, site: "Site"):
+        self.site = site
+        with _health_lock:
+            self.baseline = _load_health(HEALTH_CACHE).get(site.name, {})
+        self.counts: list[int] = []     # products per page, pages before the last
+        self.rows = self.priced = self.identified = 0
+        self._lock = threading.Lock()
+
+    def _expected(self) -> float | None:
+        """Usual products per page, scaled to the page size negotiated this run."""
+        per_page = self.baseline.get("per_page")
+        size, saved = self.site.page_size and self.site.page_size.value, self.baseline.get("page_size")
+        if per_page and size and saved:
+            return per_page * size / saved
+        return per_page
+
+    def check(self, page, products: list[dict], last: bool) -> None:
+        """Check one parsed page; last is whether pagination ends with it."""
+        id_field = self.site.fields[0]
+        with self._lock:
+            if not products:
+                self.fail(f"page {page}: no products")
+            expected = self._expected()
+            if not last:
+                if expected and len(products) < MIN_PAGE_SHARE * expected:
+                    self.fail(f"page {page}: {len(products)} products, usually {expected:.0f}")
+                self.counts.append(len(products))
+            self.rows += len(products)
+            self.priced += sum(1 for p in products if p.get("price_azn"))
+            self.identified += sum(1 for p in products if p.get(id_field))
+            if self.rows < MIN_HEALTH_ROWS:
+                return
+            for name, count in (("price", self.priced), ("id", self.identified)):
+                share, usual = count / self.rows, self.baseline.get(f"{name}_share")
+                if share == 0 or (usual and share < MIN_FIELD_SHARE * usual):
+                    self.fail(f"page {page}: {share:.0%} of rows have a {name}"
+                              + (f", usually {usual:.0%}" if usual else ""))
+
+    def finish(self, total: int) -> None:
+        """Check the run's product total; a healthy run becomes the baseline."""
+        before = self.baseline.get("products")
+        if before and total < MIN_RUN_SHARE * before:
+            self.fail(f"{total} products, {before} last run")
+        counts = self.counts or [total]
+        self._save({
+            "per_page": statistics.median(counts),
+            "page_size": self.site.page_size.value if self.site.page_size else None,
+            "price_share": round(self.priced / self.rows, 3) if self.rows else None,
+            "id_share": round(self.identified / self.rows, 3) if self.rows else None,
+            "products": total,
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        })
+
+    def fail(self, reason: str):
+        """Flag the site and raise ParserDrift."""
+        metrics.incr(self.site.name, "health_failures")
+        self._save({**self.baseline, "flagged": reason,
+                    "flagged_at": datetime.now(timezone.utc).isoformat(timespec="seconds")})
+        raise ParserDrift(f"{self.site.name}: {reason}")
+
+    def _save(self, entry: dict) -> None:
+        with _health_lock:
+            health = _load_health(HEALTH_CACHE)
+            health[self.site.name] = entry
+            HEALTH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            tmp = HEALTH_CACHE.with_suffix(f".tmp{os.getpid()}")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(health, f, indent=2, sort_keys=True)
+                f.write("\n")
+            os.replace(tmp, HEALTH_CACHE)       # readers in other threads or processes never see half a file
+
+
+# --- in-run dedup ---
+# When the catalog changes during a crawl, offset and page-number paging
+# shift: an insert pushes a product onto the next page too (a duplicate), a
+# removal pulls one back onto a page already fetched (a skip). Dedup keeps
+# each product's first occurrence in page order, keyed by the site's natural
+# id (the first CSV field). It holds a 64-bit fingerprint per id mapped to
+# the earliest page position it was seen at. When pages arrive out of order
+# (crawl.py), an earlier page can claim a product a later page already kept;
+# the later copy is retracted when the pages are assembled, so a parallel
+# run keeps exactly what a sequential one does. Past DEDUP_SPILL ids the
+# fingerprints move to a temporary SQLite file behind an in-memory Bloom
+# filter, which answers the common "never seen" case without touching the
+# file, so memory stays bounded however large a catalog grows.
+# Skips cannot be seen directly; a listing total short of the unique count
+# (Pagination.total), or else pages before the last that came back shorter
+# than the median page, less the duplicates, estimate them.
+
+BLOOM_ERROR = 0.001
+DEDUP_SPILL = 1_000_000         # ids held in memory (~100 MB) before spilling to disk
+
+
+def _fingerprint(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big", signed=True)
+
+
+class Bloom:
+    """Bloom filter over 64-bit fingerprints, sized for capacity at BLOOM_ERROR."""
+
+    def __init__(self, capacity: int, error: float = BLOOM_ERROR):
+        self.size = max(64, math.ceil(-capacity * math.log(error) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def add(self, fp: int) -> bool:
+        """Add fp; True if it may have been added before."""
+        h1, h2 = (fp >> 32) & 0xFFFFFFFF, fp & 0xFFFFFFFF | 1      # double hashing
+        present = True
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.size
+            if not self.bits[bit >> 3] & (1 << (bit & 7)):
+                present = False
+                self.bits[bit >> 3] |= 1 << (bit & 7)
+        return present
+
+
+class Dedup:
+    """One run's seen ids for a site; add() may be called from several threads."""
+
+    def __init__(self, site: "Site"):
+        self.site = site
+        self.field = site.fields[0]
+        self.first_seen: dict[int, int] = {}    # fingerprint -> earliest page position
+        self.bloom = self.db = None
+        self.retracted: set[tuple[int, int]] = set()      # (page position, fingerprint)
+        self.fetched: dict[int, int] = {}       # page position -> products on it, before dedup
+        self.duplicates = 0
+        self.expected: int | None = None        # listing total from page 1, if the site reports one
+        self._lock = threading.Lock()
+
+    def _claim(self, fp: int, seq: int) -> int | None:
+        """Record fp at seq if that is its earliest position; returns the previous one."""
+        if self.db is None:
+            before = self.first_seen.get(fp)
+            if before is None or seq < before:
+                self.first_seen[fp] = seq
+                if len(self.first_seen) > DEDUP_SPILL:
+                    self._spill()
+            return before
+        before = None
+        if self.bloom.add(fp):
+            row = self.db.execute("SELECT seq FROM seen WHERE fp = ?", (fp,)).fetchone()
+            before = row[0] if row else None
+        if before is None or seq < before:
+            self.db.execute("INSERT OR REPLACE INTO seen VALUES (?, ?)", (fp, seq))
+        return before
+
+    def _spill(self) -> None:
+        """Move the fingerprints to SQLite behind a Bloom filter."""
+        self.bloom = Bloom(max(4 * len(self.first_seen), self.expected or 0))
+        self.db = sqlite3.connect("", check_same_thread=False)     # "": private temp file
+        self.db.execute("CREATE TABLE seen (fp INTEGER PRIMARY KEY, seq INTEGER NOT NULL)")
+        self.db.executemany("INSERT INTO seen VALUES (?, ?)", self.first_seen.items())
+        for fp in self.first_seen:
+            self.bloom.add(fp)
+        self.first_seen = {}
+        metrics.incr(self.site.name, "dedup_spills")
+
+    def add(self, seq: int, products: list[dict]) -> list[dict]:
+        """The products of the page at position seq not already kept from an earlier page."""
+        kept = []
+        with self._lock:
+            for product in products:
+                key = product.get(self.field)
+                if not key:
+                    kept.append(product)        # no id, nothing to match on
+                    continue
+                fp = _fingerprint(str(key))
+                before = self._claim(fp, seq)
+                if before is not None and before <= seq:
+                    self.duplicates += 1
+                    continue
+                if before is not None:          # a later page kept it first
+                    self.retracted.add((before, fp))
+                    self.duplicates += 1
+                kept.append(product)
+            self.fetched[seq] = len(products)
+        return kept
+
+    def assemble(self, pages: dict[int, list[dict]]) -> list[dict]:
+        """Kept products in page order, without retracted copies."""
+        if not self.retracted:
+            return [p for _, products in sorted(pages.items()) for p in products]
+        return [p for seq, products in sorted(pages.items()) for p in products
+                if not p.get(self.field) or (seq, _fingerprint(str(p[self.field]))) not in self.retracted]
+
+    def report(self, unique: int) -> int:
+        """Record duplicates and likely skips in metrics; returns the skip estimate."""
+        if self.expected is not None:
+            skips = max(self.expected - unique, 0)
+        else:
+            # pages that came back short, as served; a product missing from one
+            # page that turned up again on another was dropped as a duplicate
+            counts = [n for seq, n in self.fetched.items() if seq != max(self.fetched)]
+            usual = statistics.median(counts) if counts else 0
+            skips = max(round(sum(max(usual - n, 0) for n in counts)) - self.duplicates, 0)
+        metrics.incr(self.site.name, "duplicates_dropped", self.duplicates)
+        metrics.incr(self.site.name, "likely_skips", skips)
+        if self.duplicates or skips:
+            print(f"  dedup: {self.duplicates} duplicates dropped" + (f", ~{skips} products likely skipped" if skips else ""))
+        if self.db is not None:
+            self.db.close()
+        return skips
+
+
+# --- parse cache ---
+# An unchanged listing page parses to the same rows, so Site.parse results
+# are cached per site by the SHA-256 of the response body, in
+# PARSE_CACHE/<site>.json.gz. The file carries a parser version (a hash of
+# the adapter module, this engine and the bs4 version) and is ignored whole
+# when that differs, so editing a parser invalidates it. Each run rewrites
+# the file with just the pages it fetched, so it stays the size of the
+# listing.
+
+PARSE_CACHE = Path(__file__).parent.parent / "data" / "cache" / "parse"
+
+
+@functools.lru_cache(maxsize=None)
+def parser_version(module: str) -> str:
+    """Hash of an adapter module's source, this engine's source and bs4's version."""
+    digest = hashlib.sha256(bs4_version.encode())
+    for path in (getattr(sys.modules.get(module), "__file__", None), __file__):
+        if path:
+            digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+class ParseCache:
+    """Site.parse through a cache of last run's results, keyed by body hash."""
+
+    def __init__(self, site: "Site"):
+        self.site = site
+        self.path = PARSE_CACHE / f"{site.name}.json.gz"
+        self.version = parser_version(site.parse.__module__)
+        self.previous = self._load()
+        self.pages: dict[str, list] = {}
+
+    def _load(self) -> dict:
+        try:
+            with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return cache["pages"] if cache.get("version") == self.version else {}
+
+    def parse(self, body: str | bytes) -> tuple[list[dict], object]:
+        key = hashlib.sha256(body if isinstance(body, bytes) else body.encode("utf-8")).hexdigest()
+        hit = self.pages.get(key) or self.previous.get(key)
+        if hit is None:
+            products, cursor = self.site.parse(body)
+        else:
+            metrics.incr(self.site.name, "parse_cache_hits")
+            products, cursor = [dict(p) for p in hit[0]], hit[1]
+        self.pages[key] = [products, cursor]
+        return products, cursor
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8", compresslevel=6) as f:
+            json.dump({"version": self.version, "pages": self.pages}, f, ensure_ascii=False,
+                      separators=(",", ":"))
+
+
+# --- detail pages ---
+# enrich.py fetches product detail pages for listings that came without
+# specs. detail_specs() reads the spec text most shops put in one of three
+# places: a JSON-LD Product (its additionalProperty name/value pairs, else
+# its description), two-cell table rows, or <dl> dt/dd pairs. Only those
+# elements are parsed (SoupStrainer). Adapters with other markup set
+# Site.detail. Results are kept in detail_cache.DetailCache, which combine.py
+# reads without importing the engine.
+
+_DETAIL_STRAINER = SoupStrainer(["script", "table", "dl"])
+
+
+def _ld_products(data) -> list[dict]:
+    """Product objects anywhere in a JSON-LD document (lists, @graph)."""
+    if isinstance(data, list):
+        return [p for item in data for p in _ld_products(item)]
+    if not isinstance(data, dict):
+        return []
+    kind = data.get("@type")
+    found = [data] if kind == "Product" or (isinstance(kind, list) and "Product" in kind) else []
+    return found + _ld_products(data.get("@graph", []))
+
+
+def detail_specs(html: str) -> str:
+    """Spec text of a product detail page, "Name: value; Name: value"."""
+    soup = BeautifulSoup(html, "html.parser", parse_only=_DETAIL_STRAINER)
+    pairs: list[tuple[str, str]] = []
+    description = ""
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for product in _ld_products(data):
+            for prop in product.get("additionalProperty") or []:
+                if isinstance(prop, dict) and prop.get("name") and prop.get("value") not in (None, ""):
+                    pairs.append((str(prop["name"]), str(prop["value"])))
+            description = description or str(product.get("description") or "")
+    if not pairs:
+        for row in soup.select("table tr"):
+            cells = row.find_all(["th", "td"], recursive=False)
+            if len(cells) == 2:
+                pairs.append((cells[0].get_text(" ", strip=True), cells[1].get_text(" ", strip=True)))
+        for dt in soup.select("dl > dt"):
+            dd = dt.find_next_sibling("dd")
+            if dd:
+                pairs.append((dt.get_text(" ", strip=True), dd.get_text(" ", strip=True)))
+    specs = "; ".join(f"{name.rstrip(':')}: {value}" for name, value in pairs if name and value)
+    return specs or " ".join(unescape(description).split())
+
+
+# --- crawl ---
+
+class SiteRun:
+    """One site's state for a run: cookie jar and session, parse cache and
+    archive index. load(page) fetches and parses one page and may be called
+    from several threads at once (crawl.py does). A run of another kind
+    (enrich.py's "detail") archives under runs/<site>.<kind>/, so archive.py
+    reparse keeps finding the listing runs, and host picks its Throttle.
+    Such a run only fetches (get): no parse cache, health or dedup state."""
+
+    def __init__(self, site: Site, host: str | None = None, kind: str = "page", run: str | None = None):
+        self.site = site
+        self.kind = kind
+        jar = CookieJar()
+        self.opener = new_opener(jar)
+        self.archive = archive.Run(site.name if kind == "page" else f"{site.name}.{kind}", started=run)
+        self.session = Session(site, jar, lambda url, **kw: fetch(
+            site, url, self.opener, record=functools.partial(self.archive.store, "session"), **kw))
+        self.session.start()
+        self.throttle = throttle_for(site, host)
+        listing = kind == "page"
+        self.cache = ParseCache(site) if listing else None
+        self.health = Health(site) if listing else None
+        self.dedup = Dedup(site) if listing else None
+
+    def get(self, url: str, data: bytes | None, seq: int | None = None) -> str | bytes:
+        """fetch() with session renewal, and retries of 429 / 5xx / network
+        errors (up to MAX_RETRIES, backing off), every outcome fed to the
+        host's Throttle. seq goes to the archive index with the body."""
+        site = self.site
+        retries = 0
+        while True:
+            generation, headers = self.session.generation, self.session.headers
+            start = time.perf_counter()
+            try:
+                body = fetch(site, url, self.opener, data=data, headers={**site.headers, **headers},
+                             decode=not site.raw, record=functools.partial(self.archive.store, self.kind, seq=seq))
+            except urllib.error.HTTPError as e:
+                if self.session.rejected(e, generation):
+                    continue
+                if e.code not in RETRY_STATUSES:
+                    raise
+                self.throttle.failure("rate_limited" if e.code == 429 else "server_error")
+                if retries == MAX_RETRIES:
+                    raise
+                wait = retry_after(e) or 0.0
+            except (urllib.error.URLError, TimeoutError, ConnectionError):
+                self.throttle.failure("network_error")
+                if retries == MAX_RETRIES:
+                    raise
+                wait = 0.0
+            else:
+                self.throttle.success(time.perf_counter() - start, self.kind)
+                return body
+            retries += 1
+            metrics.incr(site.name, "retries")
+            metrics.sleep(site.name, max(wait, self.throttle.interval * 2 ** retries))
+
+    def load(self, page, fallback: bool = True, seq: int | None = None) -> tuple[list[dict], object]:
+        """Fetch and parse the page at output position seq; on an HTTP error
+        retry site.fallback_url unless fallback is off (page-size probes: the
+        size was refused, not the URL)."""
+        site = self.site
+        data = site.page_data(page) if site.page_data else None
+        try:
+            body = self.get(site.page_url(page), data, seq)
+        except urllib.error.HTTPError:
+            if not (fallback and site.fallback_url):
+                raise
+            body = self.get(site.fallback_url(page), data, seq)
+        start = time.perf_counter()
+        products, cursor = self.cache.parse(body)
+        metrics.record_parse(site.name, time.perf_counter() - start, len(products))
+        if site.on_cursor:
+            site.on_cursor(cursor)      # parse may have been skipped (ParseCache hit)
+        return products, cursor
+
+    def first(self) -> tuple[list[dict], object]:
+        """Load the first page, negotiating the page size if the site has one."""
+        if self.site.page_size:
+            products, cursor = negotiate_page_size(self.site, lambda: self.load(self.site.pagination.start, False, 0))
+        else:
+            products, cursor = self.load(self.site.pagination.start, seq=0)
+        self.dedup.expected = self.site.pagination.total(cursor)
+        return products, cursor
+
+    def finish(self, products: list[dict]) -> None:
+        """End-of-run checks on the assembled products: health total, dedup report."""
+        self.health.finish(len(products))
+        self.dedup.report(len(products))
+
+    def close(self) -> None:
+        """Save the session, parse cache and throttle for the next run."""
+        self.session.save()
+        if self.cache and self.cache.pages:     # a run that parsed no listing page keeps the last cache
+            self.cache.save()
+        self.throttle.save()
+
+
+def next_pages(site: Site, page, seq: int, cursor) -> list[tuple[object, int]]:
+    """Pages that parsed page (at output position seq) makes known, with
+    their positions: the first page's plan(), else the next() page."""
+    if seq == 0:
+        remaining = site.pagination.plan(page, cursor)
+        if remaining:
+            return list(zip(remaining, range(1, len(remaining) + 1)))
+    following = site.pagination.next(page, cursor)
+    return [] if following is None else [(following, seq + 1)]
+
+
+def scrape(site: Site) -> list[dict]:
+    """Fetch and parse every listing page of a site, one page at a time."""
+    print(f"Starting scrape — {site.name} ({type(site.pagination).__name__})")
+    site_run = SiteRun(site)
+
+    try:
+        all_products: list[dict] = []
+        page = site.pagination.start
+        print(f"  Fetching page {page} ...", end=" ", flush=True)
+        products, cursor = site_run.first()
+        if site.page_size:
+            print(f"[size {site.page_size.value}]", end=" ")
+        remaining = site.pagination.plan(page, cursor)
+        site_run.health.check(page, products, not remaining and site.pagination.next(page, cursor) is None)
+        all_products.extend(site_run.dedup.add(0, products))
+        print(f"got {len(products)} products  (total: {len(all_products)})")
+
+        for n, page in enumerate(remaining, 2):
+            metrics.sleep(site.name, site_run.throttle.interval)
+            print(f"  Fetching page {n}/{len(remaining) + 1} ...", end=" ", flush=True)
+            products, cursor = site_run.load(page, seq=n - 1)
+            site_run.health.check(page, products, n == len(remaining) + 1)
+            all_products.extend(site_run.dedup.add(n - 1, products))
+            print(f"got {len(products)} products  (total: {len(all_products)})")
+
+        seq = 0
+        if not remaining:
+            while (page := site.pagination.next(page, cursor)) is not None:
+                metrics.sleep(site.name, site_run.throttle.interval)
+                print(f"  Fetching page {page} ...", end=" ", flush=True)
+                seq += 1
+                products, cursor = site_run.load(page, seq=seq)
+                site_run.health.check(page, products, site.pagination.next(page, cursor) is None)
+                all_products.extend(site_run.dedup.add(seq, products))
+                print(f"got {len(products)} products  (total: {len(all_products)})")
+
+        site_run.finish(all_products)
+    finally:
+        site_run.close()     # a drift or failed request still keeps what was learned
+    return all_products
+
+
+def save_csv(products: list[dict], path: Path, fields: list[str]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(products)
+    print(f"\nSaved {len(products)} rows -> {path}")
+
+
+def run(site: Site) -> list[dict]:
+    """Scrape a site, write its CSV and export its run metrics, also for a
+    run that fails (health_failures matter most there)."""
+    error = None
+    try:
+        products = scrape(site)
+        save_csv(products, site.output, site.fields)
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        metrics.export(site.name, error=error)
+    return products
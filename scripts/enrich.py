@@ -0,0 +1,187 @@
+"""
+Opt-in enrichment: specs from product detail pages.
+Fetches the detail page of every listing whose card carries no specs and
+keeps the spec text it shows.
+
+Rows come from data/data.csv (so run combine.py first). A row is skipped
+when its URL was fetched within --ttl-days, or when another listing of the
+same matched model (product_key, see matching.py) has fresh specs: those
+are copied instead. Of several listings of one model still missing specs,
+only one page is fetched and the rest share its specs. Everything goes to
+detail_cache.DetailCache (data/cache/details.jsonl) as it arrives; combine.py
+fills empty specs from there, and this script re-runs combine at the end.
+
+Pages go through crawl.py's scheduler: per-host queues under each host's
+engine.Throttle, --workers threads in total, so detail pages keep to the
+same politeness caps as listings (the same Throttle when they share a host).
+A page that fails is noted in the cache and not retried for
+FAILURE_BACKOFF, doubling with each failure up to --ttl-days, so the next
+run tries another page of its model meanwhile. A site whose pages keep
+failing (MAX_FAILURES) is dropped for the run.
+
+Usage:
+  python3 scripts/enrich.py                         # every site, rows without specs
+  python3 scripts/enrich.py notecomp birmarket --limit 500
+"""
+
+import argparse
+import csv
+import importlib
+import threading
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+import combine
+import engine
+import metrics
+from crawl import SITES, WORKERS, Crawl, Host, Task
+from detail_cache import DetailCache
+
+DETAIL_TTL = timedelta(days=30)
+FAILURE_BACKOFF = timedelta(hours=6)
+MAX_FAILURES = 20
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def select(rows: list[dict], cache: DetailCache, sites: list[str],
+           ttl: timedelta = DETAIL_TTL) -> tuple[dict[str, list[tuple[str, str]]], list[dict]]:
+    """Pages to fetch, grouped by product_key as [(site, url), ...] (the first
+    is fetched, the rest share its specs), and cache entries for listings
+    whose model already has fresh specs."""
+    now = _now()
+    cutoff = (datetime.now(timezone.utc) - ttl).isoformat(timespec="seconds")
+    fresh = {url: e for url, e in cache.entries.items() if e["at"] >= cutoff}
+    backing_off = {url for url, e in cache.entries.items() if e.get("retry_at", "") > now}
+    by_model = {e["product_key"]: e for e in fresh.values() if e["specs"] and e.get("product_key")}
+    stems = {label: stem for stem, label in combine.SOURCES.items()}
+
+    groups: dict[str, list[tuple[str, str]]] = defaultdict(list)
+    copies = []
+    for row in rows:
+        site, url, key = stems.get(row["source"]), row["url"], row["product_key"]
+        if row["specs"] or site not in sites or not url or url in fresh or url in backing_off:
+            continue
+        if key in by_model:
+            copies.append({"url": url, "site": site, "product_key": key, "specs": by_model[key]["specs"],
+                           "at": _now(), "via": by_model[key]["url"]})
+        elif (site, url) not in groups[key or url]:
+            groups[key or url].append((site, url))
+    return groups, copies
+
+
+class DetailCrawl(Crawl):
+    """crawl.Crawl over detail pages: task.page is the URL, queued by its own host."""
+
+    def __init__(self, sites: list[engine.Site], cache: DetailCache, workers: int = WORKERS,
+                 ttl: timedelta = DETAIL_TTL):
+        super().__init__(sites, workers)
+        self.cache = cache
+        self.ttl = ttl                          # longest failure backoff
+        self.keys: dict[str, str] = {}          # url -> product_key
+        self.failures: Counter[str] = Counter()
+        self.fetched = 0
+        self._runs_lock = threading.Lock()
+
+    def fetch(self, pages: list[tuple[str, str, str]]) -> None:
+        """Fetch (site, url, product_key) pages into the cache."""
+        for _, url, key in pages:
+            self.keys[url] = key
+        self._run([Task(site, url, n) for n, (site, url, _) in enumerate(pages)])
+
+    def _host(self, task: Task) -> Host:
+        site = self.sites[task.site]
+        name = urllib.parse.urlsplit(task.page).hostname or engine.host_of(site)
+        if name not in self.hosts:
+            self.hosts[name] = Host(name, engine.throttle_for(site, name))
+        return self.hosts[name]
+
+    def _site_run(self, site: engine.Site, host: str) -> engine.SiteRun:
+        with self._runs_lock:       # not under self.cond: starting a session may fetch
+            key = f"{site.name}@{host}"
+            if key not in self.site_runs:
+                self.site_runs[key] = engine.SiteRun(site, host, kind="detail")
+            return self.site_runs[key]
+
+    def _load(self, task: Task) -> list[Task]:
+        site = self.sites[task.site]
+        body = self._site_run(site, urllib.parse.urlsplit(task.page).hostname or "").get(task.page, None)
+        html = body.decode("utf-8", "replace") if isinstance(body, bytes) else body
+        start = time.perf_counter()
+        specs = (site.detail or engine.detail_specs)(html)
+        metrics.record_parse(site.name, time.perf_counter() - start, 1 if specs else 0)
+        self.cache.add({"url": task.page, "site": site.name, "product_key": self.keys.get(task.page, ""),
+                        "specs": specs, "at": _now()})
+        with self.cond:
+            self.fetched += 1
+            if self.fetched % 100 == 0:
+                print(f"  {self.fetched} detail pages")
+        return []
+
+    def _fail(self, task: Task, err: Exception) -> None:
+        """Back the page off in the cache; drop the site's remaining pages after MAX_FAILURES."""
+        previous = self.cache.entries.get(task.page, {})
+        tries = previous.get("failures", 0) + 1
+        backoff = min(FAILURE_BACKOFF * 2 ** (tries - 1), self.ttl)
+        self.cache.add({"url": task.page, "site": task.site, "product_key": self.keys.get(task.page, ""),
+                        "specs": previous.get("specs", ""), "at": previous.get("at", ""),   # stale specs stay usable
+                        "error": f"{type(err).__name__}: {err}", "failures": tries,
+                        "retry_at": (datetime.now(timezone.utc) + backoff).isoformat(timespec="seconds")})
+        with self.cond:
+            self.failures[task.site] += 1
+            failures = self.failures[task.site]
+        if failures == MAX_FAILURES:
+            print(f"  {task.site}: {failures} detail pages failed, skipping the rest")
+            super()._fail(task, err)
+
+
+def enrich(sites: list[str], limit: int | None = None, workers: int = WORKERS,
+           ttl: timedelta = DETAIL_TTL) -> int:
+    """Fetch missing specs for sites' listings; returns the cache entries added."""
+    with open(combine.OUTPUT, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    cache = DetailCache()
+    groups, copies = select(rows, cache, sites, ttl)
+    pages = [(group[0][0], group[0][1], key) for key, group in groups.items()][:limit]
+    print(f"{len(pages)} detail pages to fetch, {len(copies)} listings share a matched model's specs")
+
+    for entry in copies:
+        cache.add(entry)
+    crawl = DetailCrawl([importlib.import_module(name).SITE for name in sites], cache, workers, ttl)
+    start = time.perf_counter()
+    crawl.fetch(pages)
+    print(f"Fetched {crawl.fetched}/{len(pages)} in {time.perf_counter() - start:.1f} s")
+
+    shared = 0
+    for key, group in groups.items():
+        first = cache.entries.get(group[0][1])
+        if first is None or not first["specs"]:
+            continue        # failed (backed off) or no specs: the next run tries another of the group's pages
+        for site, url in group[1:]:
+            cache.add({"url": url, "site": site, "product_key": key, "specs": first["specs"],
+                       "at": first["at"], "via": first["url"]})
+            shared += 1
+    cache.compact()
+    for name in sorted({site for site, _, _ in pages}):
+        metrics.export(name)
+    return len(copies) + crawl.fetched + shared
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("sites", nargs="*", default=SITES)
+    ap.add_argument("--limit", type=int, help="most detail pages to fetch this run")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--ttl-days", type=float, default=DETAIL_TTL.days, help="refetch pages older than this")
+    args = ap.parse_args()
+
+    if enrich(args.sites, args.limit, args.workers, timedelta(days=args.ttl_days)):
+        combine.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,513 @@
+"""
+Offline listing-page fixtures for benchmarks.
+Renders every site's listing responses (full HTML pages, AJAX fragments or
+JSON bodies, exactly as each scraper's fetch functions return them) from the
+rows already stored in data/<site>.csv, using the markup each parse_products
+expects: kontakt/mgstore data-gtm cards, bakuelectronics __NEXT_DATA__,
+brothers' single page with duplicate grid/list sections, and so on.
+Pagination markup is rendered too, so the pages can also drive engine.scrape
+through a mock server.
+
+Recorded responses take precedence: any benchmarks/fixtures/<site>/page_NNN.*
+files are used as-is instead of rendered pages.
+
+Run directly to write rendered fixtures for all sites to benchmarks/fixtures/.
+"""
+
+import csv
+import hashlib
+import json
+import sys
+import zlib
+from html import escape
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+DATA_DIR = ROOT / "data"
+FIXTURE_DIR = ROOT / "benchmarks" / "fixtures"
+
+# Products per listing page, as served by each site (brothers: one page).
+PAGE_SIZES = {
+    "soliton":          15,
+    "kontakt":          24,
+    "aztechshop":       20,
+    "irshad":           9,
+    "notecomp":         20,
+    "mgstore":          24,
+    "bakuelectronics":  18,
+    "techbar":          24,
+    "birmarket":        24,
+    "compstore":        24,
+    "ctrl":             12,
+    "brothers":         None,
+    "qiymeti":          28,
+    "icomp":            24,
+    "mimelon":          24,
+    "bytelecom":        12,
+}
+SITES = list(PAGE_SIZES)
+
+
+def _num(value: str) -> float | None:
+    try:
+        return float(value) if value not in ("", None) else None
+    except ValueError:
+        return None
+
+
+def _path(url: str) -> str:
+    """'https://brothers.az/product_read/1/x' -> '/product_read/1/x'"""
+    return "/" + url.split("/", 3)[3] if url.count("/") >= 3 else url
+
+
+def _fmt(value: float | None, spec: str) -> str:
+    return format(value, spec) if value is not None else ""
+
+
+def _az(value: float) -> str:
+    """1799.99 -> '1.799,99' (Azerbaijani thousands/decimal separators)."""
+    return f"{value:,.2f}".replace(",", " ").replace(".", ",").replace(" ", ".")
+
+
+# --- page shell ---
+# Real listing pages carry a few hundred KB of navigation, inline scripts and
+# footer around the product grid; parsers pay for it, so fixtures do too.
+
+_NAV = "".join(
+    f'<li class="menu-item"><a href="/catalog/{i}">Kateqoriya {i}</a>'
+    f'<ul class="sub-menu">'
+    + "".join(f'<li><a href="/catalog/{i}/{j}">Alt kateqoriya {i}.{j}</a></li>' for j in range(8))
+    + "</ul></li>"
+    for i in range(40)
+)
+_SCRIPTS = "".join(
+    f'<script>window.__cfg{i} = {json.dumps({"id": i, "keys": list(range(40))})};</script>'
+    for i in range(20)
+)
+
+
+def _shell(title: str, body: str, head: str = "") -> str:
+    return (
+        f'<!DOCTYPE html><html lang="az"><head><meta charset="utf-8">'
+        f"<title>{escape(title)}</title>{head}{_SCRIPTS}</head><body>"
+        f'<header><nav><ul class="menu">{_NAV}</ul></nav></header>'
+        f'<main class="content">{body}</main>'
+        f'<footer><ul class="footer-links">{_NAV}</ul></footer></body></html>'
+    )
+
+
+# --- per-site renderers: (rows, page, last_page, total) -> response body ---
+
+def _soliton(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        href = escape(_path(r["url"]))
+        sale = ""
+        if r["discount_percent"]:
+            sale = (
+                f'<div class="saleStar"><span class="percent">{r["discount_percent"]}</span>'
+                f'<span class="moneydif"><span class="amount">-{r["discount_amount_azn"]}</span></span></div>'
+            )
+        monthly = "".join(
+            f'<div class="monthlyPayment" data-month="{m}"><span class="amount">{r[f"monthly_{m}_azn"]}</span> AZN</div>'
+            for m in ("6", "12", "18") if r[f"monthly_{m}_azn"]
+        )
+        offers = "".join(
+            f'<div class="offer"><span class="label">{escape(o)}</span></div>'
+            for o in r["special_offers"].split(" | ") if o
+        )
+        cards.append(
+            f'<div class="product-item" data-title="{escape(r["title"])}" data-price="{r["price_azn"]}" '
+            f'data-brandid="{r["brand_id"]}" data-position="{r["position"]}" data-filters="{r["data_filters"]}">'
+            f'<a class="thumbHolder" href="{href}"><img src="/img/{r["product_id"]}.jpg" alt=""></a>{sale}'
+            f'<a class="prodTitle" href="{href}">{escape(r["title"])}</a>'
+            f'<div class="prodPrice"><span class="price">{r["price_azn"]} AZN</span>'
+            f'<span class="creditPrice">{r["credit_price_azn"]} AZN</span></div>{monthly}'
+            f'<div class="specialOffers">{offers}</div>'
+            f'<span class="icon compare" data-item-id="{r["product_id"]}"></span></div>'
+        )
+    return json.dumps({"html": "".join(cards), "totalCount": total, "hasMore": page < last_page})
+
+
+def _magento(rows, page, last_page, total):
+    """kontakt.az / mgstore.az: data-gtm JSON + prodItem__prices."""
+    cards = []
+    for r in rows:
+        gtm = {
+            "item_name": r["title"], "item_brand": r["brand"], "price": _num(r["price_azn"]),
+            "discount": _num(r["discount_azn"]), "item_category": r["category"],
+            "item_category2": r["category2"], "item_category3": r["category3"],
+        }
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        prices = (f"<i>{_az(old)} ₼</i>" if old else "") + (f"<b>{_az(price)} ₼</b>" if price else "")
+        cards.append(
+            f'<div class="product-item" id="{r["product_id"]}" data-sku="{r["sku"]}" '
+            f"data-gtm='{escape(json.dumps(gtm, ensure_ascii=False), quote=False)}'>"
+            f'<a class="prodItem__img" href="{escape(r["url"])}"><img src="/media/{r["sku"]}.jpg" alt=""></a>'
+            f'<div class="prodItem__wrapText"><p>{escape(r["specs"])}</p></div>'
+            f'<div class="prodItem__prices">{prices}</div>'
+            f'<button class="action tocart" type="button">Səbətə at</button></div>'
+        )
+    pager = "".join(f'<li class="item"><a href="?p={p}">{p}</a></li>' for p in range(1, last_page + 1))
+    return _shell("Notbuklar", f'<div class="products">{"".join(cards)}</div>'
+                                f'<ul class="pages-items">{pager}</ul>')
+
+
+def _aztechshop(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        if old:
+            attrs = f'data-price="{old}" data-special="{price}" data-diff="-{r["discount_azn"]}"'
+        else:
+            attrs = f'data-price="{price or 0}" data-special="0" data-diff="0"'
+        cards.append(
+            f'<div class="product-thumb uni-item"><a class="product-thumb__image" href="{escape(r["url"])}">'
+            f'<img src="/image/{r["product_id"]}.webp" alt=""></a>'
+            f'<a class="product-thumb__name" href="{escape(r["url"])}">{escape(r["title"])}</a>'
+            f'<div class="product-thumb__description">{escape(r["description"])}</div>'
+            f'<div class="product-thumb__price" {attrs}>{price} ₼</div>'
+            f'<div class="qty-indicator"><span class="qty-indicator__text">{escape(r["availability"])}</span></div>'
+            f'<button class="add_to_cart" data-pid="{r["product_id"]}">Səbətə</button></div>'
+        )
+    pager = "".join(f'<li><a href="/noutbuklar/?page={p}">{p}</a></li>' for p in range(1, last_page + 1))
+    return _shell("Noutbuklar", "".join(cards) + f'<ul class="pagination">{pager}</ul>')
+
+
+def _irshad(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        old_el = f'<span class="old-price">{old:.2f} AZN</span>' if old else ""
+        labels = ""
+        if r["availability"]:
+            labels += f'<span class="product__label product__label--light-purple">{escape(r["availability"])}</span>'
+        rest = r["labels"][len(r["availability"]):].strip() if r["availability"] else r["labels"]
+        if rest:
+            labels += f'<span class="product__label product__label--orange">{escape(rest)}</span>'
+        monthly = f'<div class="ppl-price">{r["monthly_payment_azn"]} AZN</div>' if r["monthly_payment_azn"] else ""
+        cards.append(
+            f'<div class="product product-{zlib.crc32(r["product_code"].encode()) % 10**6}_x">'
+            f'<div class="product__labels">{labels}</div>'
+            f'<a class="product__name" href="{escape(r["url"])}">{escape(r["title"])}</a>'
+            f'<div class="product__price__current">{old_el}<span class="new-price">{_fmt(price, ".2f")} AZN</span></div>'
+            f'{monthly}<a class="basket_button" data-code="{r["product_code"]}" href="#">Səbətə</a></div>'
+        )
+    more = f'<button id="loadMore" data-page="{page + 1}">Daha çox</button>' if page < last_page else ""
+    return "".join(cards) + more
+
+
+def _irshad_main() -> str:
+    return _shell("Notbuklar", "", head='<meta name="csrf-token" content="fixture-csrf-token">')
+
+
+def _notecomp(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        pid = r["product_id"]
+        if old:
+            prices = (f'<span class="price-new special_no_format_{pid}">{price:,.0f}AZN</span>'
+                      f'<span class="price-old">{old:,.0f}AZN</span>')
+        else:
+            prices = f'<span class="price_no_format_{pid}">{price:,.0f}AZN</span>' if price else ""
+        pct = f'<span class="procent-skidka">{r["discount_percent"]}</span>' if r["discount_percent"] else ""
+        new = '<span class="sticker-ns newproduct">Yeni</span>' if r["is_new"] == "True" else ""
+        cards.append(
+            f'<div class="product-layout"><div class="product-thumb">{new}{pct}'
+            f'<div class="image"><a href="{escape(r["url"])}"><img src="/image/{pid}.jpg" alt=""></a></div>'
+            f'<div class="product-name"><a href="{escape(r["url"])}">{escape(r["title"])}</a></div>'
+            f'<p class="price">{prices}</p>'
+            f"<button onclick=\"wishlist.add('{pid}');\">♡</button></div></div>"
+        )
+    pager = "".join(f'<li><a href="/noutbuklar?page={p}">{p}</a></li>' for p in range(1, last_page + 1))
+    return _shell("Noutbuklar", "".join(cards) + f'<ul class="pagination">{pager}</ul>')
+
+
+def _bakuelectronics(rows, page, last_page, total):
+    items = []
+    for r in rows:
+        discount = _num(r["discount_azn"])
+        items.append({
+            "id": int(r["product_id"]), "product_code": r["product_code"], "name": r["title"],
+            "slug": r["url"].rsplit("/", 1)[-1], "price": _num(r["price_azn"]),
+            "discounted_price": _num(r["discounted_price_azn"]), "discount": discount or 0,
+            "perMonth": {"price": _num(r["monthly_payment_azn"]), "month": int(r["installment_months"] or 0)},
+            "rate": r["rating"], "reviewCount": r["review_count"], "quantity": r["quantity"],
+            "is_online": r["is_online"] == "True",
+            "image": f"/images/{r['product_code']}.webp",
+            "attributes": [{"name": f"attr{i}", "value": f"value {i}"} for i in range(12)],
+        })
+    next_data = {
+        "props": {"pageProps": {
+            "products": {"products": {"items": items, "total": total, "size": PAGE_SIZES["bakuelectronics"]}},
+            "filters": [{"id": i, "name": f"Filter {i}", "options": list(range(30))} for i in range(25)],
+            "menu": [{"id": i, "title": f"Menu {i}", "slug": f"menu-{i}"} for i in range(120)],
+        }},
+        "page": "/catalog/[...slug]", "query": {"page": str(page)}, "buildId": "fixture",
+    }
+    script = f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(next_data, ensure_ascii=False)}</script>'
+    return _shell("Noutbuklar", '<div id="__next"></div>' + script)
+
+
+def _woo_price(old: float | None, price: float | None, fmt) -> str:
+    amount = lambda v: f'<span class="woocommerce-Price-amount amount"><bdi>{fmt(v)}</bdi></span>'
+    if old and price:
+        return f'<span class="price"><del>{amount(old)}</del> <ins>{amount(price)}</ins></span>'
+    return f'<span class="price">{amount(price)}</span>' if price else ""
+
+
+def _techbar(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        labels = "".join(f'<span class="product-label">{escape(l)}</span>' for l in r["labels"].split(" | ") if l)
+        specs = f'<div class="wd-desc">{escape(r["specs"])}</div>' if r["specs"] else ""
+        cards.append(
+            f'<div class="wd-product product-grid-item" data-id="{r["product_id"]}">'
+            f'<div class="product-labels">{labels}</div>'
+            f'<a class="product-image-link" href="{escape(r["url"])}"><img src="/wp-content/{r["product_id"]}.jpg" alt=""></a>'
+            f'<h2 class="woocommerce-loop-product__title">{escape(r["title"])}</h2>{specs}'
+            f'{_woo_price(old, price, lambda v: f"{v:,.2f}&nbsp;₼")}</div>'
+        )
+    pager = "".join(f'<a class="page-numbers" href="/noutbuklar/page/{p}/">{p}</a>' for p in range(1, last_page + 1))
+    return _shell("Noutbuklar", "".join(cards) + f"<nav>{pager}</nav>")
+
+
+def _birmarket(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        old_el = f'<span class="line-through">{old:,.2f} ₼</span>'.replace(",", " ") if old else ""
+        disc = f'<div class="MPProductItem-Discount">{r["discount_percent"]}</div>' if r["discount_percent"] else ""
+        cards.append(
+            f'<div class="MPProductItem" data-product-id="{r["product_id"]}">{disc}'
+            f'<a href="{escape(_path(r["url"]))}"><img src="/img/{r["product_id"]}.png" alt="">'
+            f'<span class="MPTitle">{escape(r["title"])}</span></a>'
+            f'<span class="flex flex-col">{old_el}<span>{_fmt(price, ",.2f").replace(",", " ")} ₼</span></span></div>'
+        )
+    pager = "".join(f'<a href="/categories/16-noutbuklar?page={p}">{p}</a>' for p in range(1, last_page + 1))
+    return _shell("Noutbuklar", "".join(cards) + f'<div class="pagination">{pager}</div>')
+
+
+def _compstore(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price = _num(r["price_azn"])
+        badge = f'<div class="product-badge">{r["monthly_payment_azn"]}₼ ayda</div>' if r["monthly_payment_azn"] else ""
+        cards.append(
+            f'<li class="product"><article class="product-inner" data-id="{r["product_id"]}">{badge}'
+            f'<a href="{escape(_path(r["url"]))}"><img src="/upload/{r["product_id"]}.jpg" alt=""></a>'
+            f'<h5><a href="{escape(_path(r["url"]))}">{escape(r["title"])}</a></h5>'
+            f'<p class="product-excerpt"><a href="{escape(_path(r["url"]))}">{escape(r["specs"])}</a></p>'
+            f'<span class="final-price">{_fmt(price, ",.0f")}</span> ₼</article></li>'
+        )
+    pager = "".join(f'<li><a href="?action=yes&amp;s={p}">{p}</a></li>' for p in range(1, last_page + 1))
+    return _shell("Noutbuklar", f'<ul class="products">{"".join(cards)}</ul><ul class="pagination">{pager}</ul>')
+
+
+def _ctrl(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        sale = f'<div class="labels"><div class="onsale">{r["discount_percent"]}</div></div>' if r["discount_percent"] else ""
+        cards.append(
+            f'<li class="product type-product post-{r["product_id"]} status-publish">{sale}'
+            f'<a class="product-loop-title" href="{escape(r["url"])}">'
+            f'<h3 class="woocommerce-loop-product__title">{escape(r["title"])}</h3></a>'
+            f'{_woo_price(old, price, lambda v: f"{v:.2f}".replace(".", ",") + "&nbsp;₼")}</li>'
+        )
+    pager = "".join(f'<li><a href="https://ctrl.az/product-tag/notebooklar/page/{p}/">{p}</a></li>'
+                    for p in range(1, last_page + 1))
+    return f'<ul class="products">{"".join(cards)}</ul><ul class="page-numbers">{pager}</ul>'
+
+# brothers.az repeats action buttons and a quick-view modal in every card,
+# which is most of its ~10 MB page weight.
+_BROTHERS_ACTIONS = (
+    '<div class="action_links"><ul>'
+    + "".join(f'<li class="action_{i}"><a href="#" title="Action {i}" data-toggle="tooltip">'
+              f'<i class="icon icon-{i}"></i></a></li>' for i in range(6))
+    + '</ul></div><div class="modal fade" tabindex="-1"><div class="modal-dialog"><div class="modal-content">'
+    + "".join(f'<div class="modal_row row-{i}"><span class="modal_label">Xüsusiyyət {i}</span>'
+              f'<span class="modal_value">—</span></div>' for i in range(40))
+    + "</div></div></div>"
+)
+
+
+def _brothers(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price = _num(r["price_azn"])
+        price_el = f'<span class="current_price">{price:,.0f} ₼</span>' if price is not None else ""
+        label = f'<div class="label_product"><span class="label_sale">{escape(r["label"])}</span></div>' if r["label"] else ""
+        name = f'<h3 class="product_name"><a href="{escape(_path(r["url"]))}">{escape(r["title"])}</a></h3>'
+        cards.append(
+            f'<article class="single_product"><figure><div class="product_thumb">'
+            f'<a class="primary_img" href="{escape(_path(r["url"]))}"><img src="/uploads/{r["product_id"]}.jpg" alt=""></a>'
+            f'{label}</div>'
+            f'<div class="grid_content">{name}<div class="price_box">{price_el}</div></div>'
+            f'<div class="list_content">{name}<div class="price_box">{price_el}</div>'
+            f'<div class="product_desc"><p>{escape(r["title"])}</p></div></div>'
+            f'{_BROTHERS_ACTIONS}</figure></article>'
+        )
+    return _shell("Notebooklar", "".join(cards))
+
+
+
+def _qiymeti(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price = _num(r["price_azn"])
+        price_text = f"{price:,.2f}".replace(",", " ").replace(".", ",") if price else ""
+        cards.append(
+            f'<div class="product" data-product-id="{r["product_id"]}">'
+            f'<div class="thumbnail"><a href="{escape(r["url"])}"><img src="/img/{r["product_id"]}.jpg" alt=""></a></div>'
+            f'<div class="name"><a href="{escape(r["url"])}">{escape(r["title"])}</a></div>'
+            f'<div class="specifications">{escape(r["specs"])}</div>'
+            f'<div class="min-price">{price_text} AZN</div></div>'
+        )
+    pager = "".join(f'<a class="page-numbers" href="#">{p}</a>' for p in range(1, last_page + 1))
+    return "".join(cards) + f'<div class="pagination">{pager}</div>'
+
+
+def _icomp(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        sale = f'<span class="sale-price">{old:.0f}</span>' if old else ""
+        cards.append(
+            f'<div class="product" data-id="{r["product_id"]}">'
+            f'<a href="{escape(_path(r["url"]))}"><img src="/upload/{r["product_id"]}.jpg" alt=""></a>'
+            f'<h3><a href="{escape(_path(r["url"]))}">{escape(r["title"])}</a></h3>'
+            f'<div class="product-excerpt"><a href="{escape(_path(r["url"]))}">{escape(r["specs"])}</a></div>'
+            f'<div class="prices">{sale}<span class="final-price">{_fmt(price, ".0f")}</span></div></div>'
+        )
+    pager = "".join(f'<li><a href="?action=yes&amp;s={p}">{p}</a></li>' for p in range(1, last_page + 1))
+    return _shell("Noutbuklar", "".join(cards) + f'<ul class="pagination">{pager}</ul>')
+
+
+def _mimelon(rows, page, last_page, total):
+    cards = ['<div class="product owl-item-slide hide product_example"><h5 class="product-caption-title"></h5></div>']
+    for r in rows:
+        price = _num(r["price_azn"])
+        label = f'<div class="product-label">{escape(r["label"])}</div>' if r["label"] else ""
+        cards.append(
+            f'<div class="product owl-item-slide">{label}'
+            f'<a class="dataLayerProductClick" data-id="{r["product_id"]}" href="{escape(_path(r["url"]))}">'
+            f'<img src="/uploads/{r["product_id"]}.jpg" alt="">'
+            f'<h5 class="product-caption-title">{escape(r["title"])}</h5></a>'
+            f'<span class="product-caption-price-new">{_fmt(price, ".0f")}m</span></div>'
+        )
+    pager = "".join(f'<a href="/az/notebooklar/{p}" data-ci-pagination-page="{p}">{p}</a>' for p in range(1, last_page + 1))
+    return _shell("Notebooklar", "".join(cards) + f'<div class="pagination main-pagination">{pager}</div>')
+
+
+def _bytelecom(rows, page, last_page, total):
+    cards = []
+    for r in rows:
+        price, old = _num(r["price_azn"]), _num(r["old_price_azn"])
+        old_el = f'<h6 class="discount-price">₼ {old:,.2f}</h6>' if old else ""
+        badges = "".join(f'<div class="badge-item"><p>{escape(b)}</p></div>' for b in r["badges"].split(" | ") if b)
+        cards.append(
+            f'<div class="product">{badges}'
+            f'<button class="favourite-product" wire:click="toggleWishlist({r["product_id"]})">♡</button>'
+            f'<a class="product-name" href="{escape(_path(r["url"]))}">{escape(r["title"])}</a>'
+            f'{old_el}<h5 class="price">₼ {_fmt(price, ",.2f")}</h5></div>'
+        )
+    pager = "".join(f'<li><button wire:click="gotoPage({p}, \'page\')">{p}</button></li>' for p in range(1, last_page + 1))
+    return _shell("Noutbuklar", "".join(cards) + f'<ul class="pagination">{pager}</ul>')
+
+
+RENDERERS = {
+    "soliton":          _soliton,
+    "kontakt":          _magento,
+    "aztechshop":       _aztechshop,
+    "irshad":           _irshad,
+    "notecomp":         _notecomp,
+    "mgstore":          _magento,
+    "bakuelectronics":  _bakuelectronics,
+    "techbar":          _techbar,
+    "birmarket":        _birmarket,
+    "compstore":        _compstore,
+    "ctrl":             _ctrl,
+    "brothers":         _brothers,
+    "qiymeti":          _qiymeti,
+    "icomp":            _icomp,
+    "mimelon":          _mimelon,
+    "bytelecom":        _bytelecom,
+}
+
+
+def site_rows(site: str, scale: int = 1) -> list[dict]:
+    """Rows of data/<site>.csv, repeated `scale` times with distinct ids/titles."""
+    with open(DATA_DIR / f"{site}.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    if scale <= 1:
+        return rows
+    out = []
+    for n in range(scale):
+        for r in rows:
+            copy = dict(r)
+            if n:
+                for key in ("product_id", "product_code"):
+                    if copy.get(key, "").isdigit():
+                        copy[key] = str(int(copy[key]) + n * 10_000_000)
+                    elif copy.get(key):
+                        copy[key] = f"{copy[key]}x{n}"
+                copy["title"] = f"{copy['title']} #{n}"
+                copy["url"] = f"{copy['url']}-{n}"
+            out.append(copy)
+    return out
+
+
+def render_pages(site: str, scale: int = 1) -> list[str]:
+    """Render every listing response for a site, page 1 first."""
+    rows = site_rows(site, scale)
+    size = PAGE_SIZES[site] or len(rows) or 1
+    chunks = [rows[i:i + size] for i in range(0, len(rows), size)] or [[]]
+    render = RENDERERS[site]
+    return [render(chunk, n, len(chunks), len(rows)) for n, chunk in enumerate(chunks, 1)]
+
+
+def next_data_route(page: str) -> str:
+    """bakuelectronics: the /_next/data/ JSON body for a rendered HTML page."""
+    start = page.index('type="application/json">') + len('type="application/json">')
+    next_data = json.loads(page[start:page.index("</script>", start)])
+    return json.dumps({"pageProps": next_data["props"]["pageProps"], "__N_SSP": True}, ensure_ascii=False)
+
+
+def landing_page(site: str) -> str | None:
+    """Session-bootstrap page fetched before listing pages (irshad's CSRF page)."""
+    return _irshad_main() if site == "irshad" else None
+
+
+def load_pages(site: str, scale: int = 1) -> list[str]:
+    """Recorded responses from FIXTURE_DIR/<site>/ if present, else rendered pages."""
+    recorded = sorted((FIXTURE_DIR / site).glob("page_*")) if scale == 1 else []
+    if recorded:
+        return [p.read_text(encoding="utf-8") for p in recorded]
+    return render_pages(site, scale)
+
+
+def digest(pages: list[str]) -> str:
+    """Short content hash of a fixture set, stored alongside benchmark baselines."""
+    h = hashlib.blake2b(digest_size=8)
+    for body in pages:
+        h.update(body.encode("utf-8"))
+    return h.hexdigest()
+
+
+def write_fixtures(sites: list[str]) -> None:
+    for site in sites:
+        out_dir = FIXTURE_DIR / site
+        out_dir.mkdir(parents=True, exist_ok=True)
+        pages = render_pages(site)
+        ext = "json" if site == "soliton" else "html"
+        for n, body in enumerate(pages, 1):
+            (out_dir / f"page_{n:03d}.{ext}").write_text(body, encoding="utf-8")
+        size = sum(len(b.encode("utf-8")) for b in pages)
+        print(f"  {site:18s} {len(pages):>3} pages  {size / 1e6:6.2f} MB -> {out_dir}")
+
+
+if __name__ == "__main__":
+    write_fixtures(sys.argv[1:] or SITES)
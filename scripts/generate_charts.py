@@ -3,7 +3,6 @@ Business Intelligence Charts — Azerbaijan Laptop Market
 Reads data/data.csv and saves all charts to charts/.
 """
 
-import csv
 import re
 import statistics
 from collections import Counter, defaultdict
@@ -15,6 +14,9 @@ import matplotlib.pyplot as plt
 import matplotlib.ticker as mticker
 import numpy as np
 
+import combine
+from matching import assign_product_keys
+
 # ── Paths ────────────────────────────────────────────────────────────────────
 ROOT = Path(__file__).parent.parent
 DATA_FILE = ROOT / "data" / "data.csv"
@@ -55,16 +57,11 @@ plt.rcParams.update({
 BRANDS = ["ASUS","HP","Lenovo","Acer","MSI","Dell","Apple"]
 
 # ── Load data ────────────────────────────────────────────────────────────────
-def load():
-    rows = list(csv.DictReader(open(DATA_FILE, encoding="utf-8")))
-    priced = []
-    for r in rows:
-        try:
-            p = float(r["price_azn"])
-            if p > 0:
-                priced.append((r["source"], p, r))
-        except:
-            pass
+def load(path: Path = DATA_FILE):
+    rows = combine.load(path)       # numeric columns already typed and checked
+    if rows and "product_key" not in rows[0]:
+        assign_product_keys(rows)   # data.csv written before product matching
+    priced = [(r["source"], r["price_azn"], r) for r in rows if r["price_azn"]]
     return rows, priced
 
 def detect_brand(title: str) -> str:
@@ -279,13 +276,9 @@ def chart_discounts(priced):
     src_disc   = defaultdict(list)
 
     for src, p, r in priced:
-        try:
-            d  = float(r["discount_azn"])
-            op = float(r["old_price_azn"])
-            if d > 0 and op > 0:
-                src_disc[src].append(d / op * 100)
-        except:
-            pass
+        d, op = r["discount_azn"], r["old_price_azn"]
+        if d and op:
+            src_disc[src].append(d / op * 100)
 
     # Only retailers that have discounts
     disc_srcs = sorted(src_disc.keys(), key=lambda s: statistics.mean(src_disc[s]))
@@ -320,16 +313,25 @@ def chart_discounts(priced):
 # ════════════════════════════════════════════════════════════════════════════
 def chart_price_spread(priced):
     def clean(t):
-        return re.sub(r"\s+", " ", t.lower().strip())
+        return re.sub(r"\s+", " ", t.strip())
 
-    title_map = defaultdict(lambda: defaultdict(list))
+    key_map = defaultdict(lambda: defaultdict(list))
+    key_title = {}
     for src, p, r in priced:
-        title_map[clean(r["title"])][src].append(p)
+        key = r["product_key"]
+        if not key:
+            continue
+        key_map[key][src].append(p)
+        # Label each product with its shortest listing title
+        title = clean(r["title"])
+        if key not in key_title or len(title) < len(key_title[key]):
+            key_title[key] = title
 
     spreads = []
-    for title, src_prices_d in title_map.items():
+    for key, src_prices_d in key_map.items():
         if len(src_prices_d) < 3:
             continue
+        title = key_title[key]
         mins = {s: min(ps) for s, ps in src_prices_d.items()}
         mn, mx = min(mins.values()), max(mins.values())
         if mn > 0:
@@ -442,21 +444,26 @@ def chart_price_heatmap(priced):
 # ════════════════════════════════════════════════════════════════════════════
 # Main
 # ════════════════════════════════════════════════════════════════════════════
+CHARTS = [
+    chart_catalog_size,
+    chart_price_positioning,
+    chart_price_distribution,
+    chart_brand_share,
+    chart_brand_price,
+    chart_brand_segments,
+    chart_discounts,
+    chart_price_spread,
+    chart_retailer_brand_mix,
+    chart_price_heatmap,
+]
+
 if __name__ == "__main__":
     print(f"Loading {DATA_FILE} ...")
     rows, priced = load()
     print(f"  {len(rows)} total rows, {len(priced)} with valid prices\n")
 
     print("Generating charts:")
-    chart_catalog_size(priced)
-    chart_price_positioning(priced)
-    chart_price_distribution(priced)
-    chart_brand_share(priced)
-    chart_brand_price(priced)
-    chart_brand_segments(priced)
-    chart_discounts(priced)
-    chart_price_spread(priced)
-    chart_retailer_brand_mix(priced)
-    chart_price_heatmap(priced)
+    for chart in CHARTS:
+        chart(priced)
 
     print(f"\nAll charts saved to {CHARTS_DIR}/")
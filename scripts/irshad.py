@@ -6,25 +6,22 @@ Pagination driven by #loadMore[data-page] — stops when button is absent.
 Saves all products to data/irshad.csv.
 """
 
-import csv
 import re
-import time
-import urllib.request
-from http.cookiejar import CookieJar
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import engine
 
 BASE_URL = "https://irshad.az"
 MAIN_URL = f"{BASE_URL}/az/notbuk-planset-ve-komputer-texnikasi/notbuklar"
 AJAX_URL = f"{BASE_URL}/az/list-products/notbuk-planset-ve-komputer-texnikasi/notbuklar"
 OUTPUT = Path(__file__).parent.parent / "data" / "irshad.csv"
+CARD = "div.product"
 
-USER_AGENT = (
-    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-    "AppleWebKit/537.36 (KHTML, like Gecko) "
-    "Chrome/144.0.0.0 Safari/537.36"
-)
+HEADERS = {
+    "Accept": "*/*",
+    "X-Requested-With": "XMLHttpRequest",
+    "Referer": MAIN_URL,
+}
 
 CSV_FIELDS = [
     "product_code",
@@ -39,43 +36,33 @@ CSV_FIELDS = [
 ]
 
 
-def make_session() -> tuple[urllib.request.OpenerDirector, str]:
-    """Return (opener_with_cookies, csrf_token) by loading the main page."""
-    cj = CookieJar()
-    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cj))
-
-    req = urllib.request.Request(
-        MAIN_URL,
-        headers={
-            "User-Agent": USER_AGENT,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-        },
-    )
-    with opener.open(req, timeout=30) as r:
-        html = r.read().decode("utf-8")
-
-    soup = BeautifulSoup(html, "html.parser")
-    meta = soup.find("meta", attrs={"name": "csrf-token"})
-    csrf = meta["content"] if meta else ""
-    return opener, csrf
-
-
-def fetch_page(opener: urllib.request.OpenerDirector, csrf: str, page: int) -> str:
-    url = f"{AJAX_URL}?q=&price_from=&price_to=&sort=first_pinned&page={page}"
-    req = urllib.request.Request(
-        url,
-        headers={
-            "User-Agent": USER_AGENT,
-            "Accept": "*/*",
-            "Accept-Language": "en-US,en;q=0.9",
-            "X-CSRF-TOKEN": csrf,
-            "X-Requested-With": "XMLHttpRequest",
-            "Referer": MAIN_URL,
-        },
-    )
-    with opener.open(req, timeout=30) as r:
-        return r.read().decode("utf-8")
+# <meta name="csrf-token" ...> in the main page's <head>; read with a regex
+# instead of parsing the whole page.
+CSRF_META_RE = re.compile(r"""<meta\s((?:[^>"']|"[^"]*"|'[^']*')*?\bname\s*=\s*["']csrf-token["'](?:[^>"']|"[^"]*"|'[^']*')*)>""")
+
+
+def csrf_headers(get) -> dict:
+    """Load the main page (setting session cookies) and return its CSRF header."""
+    m = CSRF_META_RE.search(get(MAIN_URL))
+    return {"X-CSRF-TOKEN": engine.tag_attrs(m.group(1)).get("content", "") if m else ""}
+
+
+def page_url(page: int) -> str:
+    return f"{AJAX_URL}?q=&price_from=&price_to=&sort=first_pinned&page={page}"
+
+
+# Opening tag of the #loadMore button; its attributes are read straight from
+# the fragment rather than from a second soup of the whole response.
+LOAD_MORE_RE = re.compile(
+    r"""<[a-zA-Z][\w-]*\s((?:[^>"']|"[^"]*"|'[^']*')*?\bid\s*=\s*["']loadMore["'](?:[^>"']|"[^"]*"|'[^']*')*)>"""
+)
+
+
+def next_page(html: str) -> int | None:
+    """Page number on the #loadMore button; None when the button is absent."""
+    m = LOAD_MORE_RE.search(html)
+    page = engine.tag_attrs(m.group(1)).get("data-page") if m else None
+    return int(page) if page else None
 
 
 def parse_price(text: str) -> float | None:
@@ -95,10 +82,9 @@ def parse_price(text: str) -> float | None:
 
 
 def parse_products(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
     products = []
 
-    for card in soup.select("div.product"):
+    for card in engine.cards(html, CARD):
         # --- product code ---
         # Use the first basket button's data-code (selected / primary variant)
         basket_btn = card.select_one("a.basket_button[data-code]")
@@ -182,47 +168,23 @@ def parse_products(html: str) -> list[dict]:
     return products
 
 
-def scrape_all() -> list[dict]:
-    print(f"Starting scrape — {AJAX_URL}")
-    print("  Initialising session (fetching CSRF token) ...", end=" ", flush=True)
-    opener, csrf = make_session()
-    print("done")
+def parse_page(html: str) -> tuple[list[dict], int | None]:
+    """Products and the next page number (the Cursor cursor)."""
+    return parse_products(html), next_page(html)
 
-    all_products: list[dict] = []
-    page = 1
 
-    while True:
-        print(f"  Fetching page {page} ...", end=" ", flush=True)
-        html = fetch_page(opener, csrf, page)
-        soup = BeautifulSoup(html, "html.parser")
-
-        page_products = parse_products(html)
-        all_products.extend(page_products)
-
-        # Check for next page
-        load_more = soup.select_one("#loadMore")
-        next_page = load_more.get("data-page") if load_more else None
-
-        print(f"got {len(page_products)} products  (total: {len(all_products)})  next={next_page}")
-
-        if not next_page:
-            break
-
-        page = int(next_page)
-        time.sleep(0.6)
-
-    return all_products
-
-
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} rows -> {path}")
+SITE = engine.Site(
+    name="irshad",
+    page_url=page_url,
+    parse=parse_page,
+    pagination=engine.Cursor(),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    session=csrf_headers,
+    delay=0.6,
+)
 
 
 if __name__ == "__main__":
-    products = scrape_all()
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
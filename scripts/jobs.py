@@ -0,0 +1,324 @@
+"""
+Scrape jobs shared through one SQLite file, for any number of worker
+processes on the machine that holds the file. The table runs in WAL mode,
+whose readers and writers coordinate through shared memory next to the
+database; that only works on a local filesystem, so workers on other
+machines must not open it over NFS or SMB.
+
+  enqueue   starts a run: one page-1 job per site
+  work      claims jobs, fetches and parses them with the site adapters
+  status    job counts per site and state
+  collect   writes each finished site's CSV, products in page order
+
+Every job is one listing page: (run, site, seq, page), seq being the page's
+position in the site's output. A worker that finishes a page inserts the
+jobs it makes known (engine.next_pages), so pagination spreads over workers
+like crawl.py spreads it over threads. A claimed job is leased for LEASE_S
+seconds and the worker heartbeats to extend it; if the worker dies, the
+lease runs out and another worker takes the job. A job that fails
+MAX_ATTEMPTS times is marked failed and its site is left out of collect. A
+page that fails its engine.Health check fails at once, with every queued
+job of its site: retrying would not un-drift the markup.
+
+Hosts are paced across all workers: a job is only claimed while its host
+has fewer leased jobs than its concurrency cap and its next_start has
+passed. Each worker publishes its engine.Throttle's caps for the hosts it
+works on, so the table follows what the hosts tolerate.
+
+Usage:
+  python3 scripts/jobs.py enqueue                   # all sites
+  python3 scripts/jobs.py work --until-idle &       # as many as you like, on this host
+  python3 scripts/jobs.py status
+  python3 scripts/jobs.py collect
+"""
+
+import argparse
+import importlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import engine
+import metrics
+from crawl import SITES
+
+JOBS_DB = Path(__file__).parent.parent / "data" / "jobs" / "jobs.sqlite"
+LEASE_S = 60.0
+MAX_ATTEMPTS = 3
+POLL_S = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run         TEXT PRIMARY KEY,
+    created_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hosts (
+    host        TEXT PRIMARY KEY,
+    concurrency INTEGER NOT NULL,
+    interval    REAL NOT NULL,
+    next_start  REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY,
+    run         TEXT NOT NULL,
+    site        TEXT NOT NULL,
+    host        TEXT NOT NULL,
+    seq         INTEGER NOT NULL,
+    page        TEXT NOT NULL,          -- JSON page value
+    page_size   INTEGER,                -- negotiated on page 1, reused by the rest
+    state       TEXT NOT NULL DEFAULT 'queued',     -- queued, leased, done, failed
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    error       TEXT,
+    products    TEXT,                   -- JSON rows once done
+    total       INTEGER,                -- listing total the page reported, if the site reports one
+    UNIQUE (run, site, seq)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, host);
+"""
+
+
+def connect(path: Path | None = None) -> sqlite3.Connection:
+    path = path or JOBS_DB
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # explicit BEGIN / COMMIT; a connection may be handed to another thread, never shared
+    db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+    db.row_factory = sqlite3.Row
+    db.execute("PRAGMA journal_mode=WAL")
+    db.executescript(SCHEMA)
+    if "total" not in {row["name"] for row in db.execute("PRAGMA table_info(jobs)")}:
+        db.execute("ALTER TABLE jobs ADD COLUMN total INTEGER")     # table made before it had the column
+    return db
+
+
+def adapter(name: str) -> engine.Site:
+    return importlib.import_module(name).SITE
+
+
+# --- coordinator ---
+
+def enqueue(db: sqlite3.Connection, sites: list[engine.Site]) -> str:
+    """Start a run with a page-1 job per site; returns the run id."""
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+    db.execute("BEGIN IMMEDIATE")
+    db.execute("INSERT INTO runs VALUES (?, ?)", (run, datetime.now(timezone.utc).isoformat(timespec="seconds")))
+    for site in sites:
+        host = engine.host_of(site)
+        db.execute("INSERT OR IGNORE INTO hosts (host, concurrency, interval) VALUES (?, 1, ?)", (host, site.delay))
+        db.execute("INSERT INTO jobs (run, site, host, seq, page) VALUES (?, ?, ?, 0, ?)",
+                   (run, site.name, host, json.dumps(site.pagination.start)))
+    db.execute("COMMIT")
+    return run
+
+
+def latest_run(db: sqlite3.Connection) -> str | None:
+    row = db.execute("SELECT run FROM runs ORDER BY run DESC LIMIT 1").fetchone()
+    return row["run"] if row else None
+
+
+def status(db: sqlite3.Connection, run: str) -> dict[str, dict[str, int]]:
+    """Job counts per site and state."""
+    counts: dict[str, dict[str, int]] = {}
+    for row in db.execute("SELECT site, state, COUNT(*) AS n FROM jobs WHERE run = ? GROUP BY site, state", (run,)):
+        counts.setdefault(row["site"], {})[row["state"]] = row["n"]
+    return counts
+
+
+def collect(db: sqlite3.Connection, run: str) -> dict[str, list[dict]]:
+    """Products in page order, repeats dropped (engine.Dedup), for every site
+    of the run whose jobs are all done and whose pages and total pass
+    engine.Health."""
+    results = {}
+    for name, states in status(db, run).items():
+        if set(states) != {"done"}:
+            continue
+        rows = db.execute("SELECT page, page_size, products, total FROM jobs WHERE run = ? AND site = ? ORDER BY seq",
+                          (run, name)).fetchall()
+        site = adapter(name)
+        if site.page_size and rows[-1]["page_size"]:
+            site.page_size.value = rows[-1]["page_size"]
+        health, dedup = engine.Health(site), engine.Dedup(site)
+        dedup.expected = rows[0]["total"]
+        products: list[dict] = []
+        try:
+            for n, row in enumerate(rows, 1):
+                page_products = json.loads(row["products"])
+                health.check(json.loads(row["page"]), page_products, n == len(rows))
+                products.extend(dedup.add(n - 1, page_products))
+            health.finish(len(products))
+            dedup.report(len(products))
+        except engine.ParserDrift as e:
+            print(f"  {e}")
+            continue
+        results[name] = products
+    return results
+
+
+# --- worker ---
+
+class Worker:
+    """Claims jobs from the table and runs them until told to stop."""
+
+    def __init__(self, db_path: Path | None = None, name: str | None = None):
+        self.db_path = db_path or JOBS_DB
+        self.db = connect(self.db_path)
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+        self.site_runs: dict[tuple[str, str], engine.SiteRun] = {}     # by (run, site)
+        self.job_id: int | None = None
+        self._stop = threading.Event()
+
+    def claim(self) -> sqlite3.Row | None:
+        """Lease the next job whose host has capacity, if any."""
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            job = self.db.execute("""
+                SELECT j.* FROM jobs j JOIN hosts h ON h.host = j.host
+                WHERE (j.state = 'queued' OR (j.state = 'leased' AND j.lease_until < :now))
+                  AND h.next_start <= :now
+                  AND (SELECT COUNT(*) FROM jobs k
+                       WHERE k.host = j.host AND k.state = 'leased' AND k.lease_until >= :now) < h.concurrency
+                ORDER BY j.run, j.id LIMIT 1
+            """, {"now": now}).fetchone()
+            if job is not None:
+                # the leased row, so job["attempts"] counts this try
+                job = self.db.execute("UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?,"
+                                      " attempts = attempts + 1 WHERE id = ? RETURNING *",
+                                      (self.name, now + LEASE_S, job["id"])).fetchone()
+                self.db.execute("UPDATE hosts SET next_start = ? + interval WHERE host = ?", (now, job["host"]))
+            self.db.execute("COMMIT")
+        except BaseException:
+            self.db.execute("ROLLBACK")
+            raise
+        return job
+
+    def _heartbeat(self) -> None:
+        db = connect(self.db_path)
+        while not self._stop.wait(LEASE_S / 3):
+            if self.job_id is not None:
+                db.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ?",
+                           (time.time() + LEASE_S, self.job_id, self.name))
+        db.close()
+
+    def run_job(self, job: sqlite3.Row) -> None:
+        site = adapter(job["site"])
+        page = json.loads(job["page"])
+        try:
+            key = job["run"], job["site"]
+            if key not in self.site_runs:
+                # one archive index per run and site, shared by every worker
+                self.site_runs[key] = engine.SiteRun(site, run=job["run"])
+            site_run = self.site_runs[key]
+            if job["seq"] == 0:
+                products, cursor = site_run.first()
+            else:
+                if site.page_size and job["page_size"]:
+                    site.page_size.value = job["page_size"]
+                products, cursor = site_run.load(page, seq=job["seq"])
+            follow = engine.next_pages(site, page, job["seq"], cursor)
+            last_seq = self.db.execute("SELECT MAX(seq) FROM jobs WHERE run = ? AND site = ?",
+                                       (job["run"], job["site"])).fetchone()[0]
+            site_run.health.check(page, products, not follow and job["seq"] >= last_seq)
+        except engine.ParserDrift as e:
+            self.db.execute("UPDATE jobs SET state = 'failed', error = ?, lease_until = NULL"
+                            " WHERE run = ? AND site = ? AND (id = ? OR state = 'queued')",
+                            (str(e), job["run"], job["site"], job["id"]))
+            print(f"  {e}; site stopped")
+            return
+        except Exception as e:
+            state = "failed" if job["attempts"] >= MAX_ATTEMPTS else "queued"
+            self.db.execute("UPDATE jobs SET state = ?, error = ?, lease_until = NULL WHERE id = ? AND worker = ?",
+                            (state, f"{type(e).__name__}: {e}", job["id"], self.name))
+            print(f"  {job['site']} page {page}: {state} after attempt {job['attempts']}: {e}")
+            return
+
+        page_size = site.page_size.value if site.page_size else None
+        throttle = site_run.throttle
+        self.db.execute("BEGIN IMMEDIATE")
+        done = self.db.execute("UPDATE jobs SET state = 'done', products = ?, total = ?, error = NULL,"
+                               " lease_until = NULL WHERE id = ? AND worker = ? AND state = 'leased'",
+                               (json.dumps(products, ensure_ascii=False), site.pagination.total(cursor),
+                                job["id"], self.name)).rowcount
+        if done:        # else the lease ran out and another worker has the job
+            for next_page, seq in follow:
+                self.db.execute("INSERT OR IGNORE INTO jobs (run, site, host, seq, page, page_size)"
+                                " VALUES (?, ?, ?, ?, ?, ?)",
+                                (job["run"], job["site"], job["host"], seq, json.dumps(next_page), page_size))
+            self.db.execute("UPDATE hosts SET concurrency = ?, interval = ? WHERE host = ?",
+                            (throttle.concurrency, throttle.interval, job["host"]))
+        self.db.execute("COMMIT")
+        print(f"  {job['site']:16s} page {page}: {len(products)} products")
+
+    def pending(self) -> int:
+        """Jobs not yet finished, in any run."""
+        return self.db.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'leased')").fetchone()[0]
+
+    def work(self, until_idle: bool = False) -> None:
+        heartbeat = threading.Thread(target=self._heartbeat, daemon=True)
+        heartbeat.start()
+        try:
+            while True:
+                job = self.claim()
+                if job is None:
+                    if until_idle and not self.pending():
+                        break
+                    time.sleep(POLL_S)
+                    continue
+                self.job_id = job["id"]
+                self.run_job(job)
+                self.job_id = None
+        finally:
+            self._stop.set()
+            for site_run in self.site_runs.values():
+                site_run.close()
+            for name in sorted({site for _, site in self.site_runs}):
+                metrics.export(name)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--db", type=Path, default=JOBS_DB)
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("enqueue", help="start a run")
+    p.add_argument("sites", nargs="*", default=SITES)
+    p = sub.add_parser("work", help="claim and run jobs")
+    p.add_argument("--until-idle", action="store_true", help="exit once no job is queued or leased")
+    p.add_argument("--name", help="worker name (default host:pid:thread)")
+    for name in ("status", "collect"):
+        p = sub.add_parser(name)
+        p.add_argument("--run", help="run id (default: latest)")
+    args = ap.parse_args()
+
+    db = connect(args.db)
+    if args.command == "enqueue":
+        print(enqueue(db, [adapter(name) for name in args.sites]))
+        return
+    if args.command == "work":
+        Worker(args.db, args.name).work(args.until_idle)
+        return
+
+    run = args.run or latest_run(db)
+    if run is None:
+        raise SystemExit("no runs")
+    if args.command == "status":
+        print(f"run {run}")
+        for site, states in sorted(status(db, run).items()):
+            print(f"  {site:16s} " + "  ".join(f"{state} {n}" for state, n in sorted(states.items())))
+        return
+    results = collect(db, run)
+    for site_name in status(db, run):
+        if site_name in results:
+            site = adapter(site_name)
+            engine.save_csv(results[site_name], site.output, site.fields)
+        else:
+            print(f"  {site_name}: not finished, CSV left as is")
+
+
+if __name__ == "__main__":
+    main()
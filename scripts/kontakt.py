@@ -4,28 +4,18 @@ URL pattern: https://kontakt.az/notbuk-ve-kompyuterler/komputerler/notbuklar?p={
 Saves all products to data/kontakt.csv.
 """
 
-import csv
 import json
-import re
-import time
-import urllib.parse
-import urllib.request
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import engine
+import metrics
 
 BASE_URL = "https://kontakt.az"
 CATEGORY_URL = f"{BASE_URL}/notbuk-ve-kompyuterler/komputerler/notbuklar"
 OUTPUT = Path(__file__).parent.parent / "data" / "kontakt.csv"
+CARD = "div.product-item"
 
 HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/144.0.0.0 Safari/537.36"
-    ),
-    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    "Accept-Language": "en-US,en;q=0.9",
     "Referer": BASE_URL,
 }
 
@@ -58,140 +48,143 @@ def parse_price(text: str) -> float | None:
         return None
 
 
-def fetch_page(page: int) -> str:
-    url = f"{CATEGORY_URL}?p={page}"
-    req = urllib.request.Request(url, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return r.read().decode("utf-8")
+def page_url(page: int) -> str:
+    return f"{CATEGORY_URL}?p={page}"
 
 
-def get_last_page(soup: BeautifulSoup) -> int:
+def get_last_page(html: str) -> int:
     """Return the last page number from pagination."""
-    page_links = soup.select(".pages-items .item a")
-    max_page = 1
-    for link in page_links:
-        href = link.get("href", "")
-        m = re.search(r"[?&]p=(\d+)", href)
-        if m:
-            max_page = max(max_page, int(m.group(1)))
-    return max_page
+    return engine.max_page(html, ".pages-items .item a", pattern=r"[?&]p=(\d+)")
+
+
+# --- card values ---
+# Every field comes from the card's own attributes (id, data-sku, data-gtm)
+# plus four small elements; scan_card reads them from the raw markup and
+# dom_card is the BeautifulSoup fallback. Both return the same raw values.
+
+def scan_card(raw: str) -> dict:
+    card = engine.element(raw)
+    if "data-gtm" not in card.attrs:
+        raise engine.ScanError("no data-gtm")
+    img_link = engine.select_one(raw, "a.prodItem__img", card)
+    prices = engine.select_one(raw, ".prodItem__prices", card)
+    old_tag = engine.select_one(raw, "i", prices) if prices else None
+    cur_tag = engine.select_one(raw, "b", prices) if prices else None
+    specs_el = engine.select_one(raw, ".prodItem__wrapText", card)
+    return {
+        "attrs": card.attrs,
+        "href": img_link.attrs.get("href") if img_link else None,
+        "old": engine.text(raw, old_tag) if old_tag else None,
+        "cur": engine.text(raw, cur_tag) if cur_tag else None,
+        "specs": engine.text(raw, specs_el, " ") if specs_el else "",
+    }
+
+
+def dom_card(card) -> dict:
+    img_link = card.select_one("a.prodItem__img")
+    prices = card.select_one(".prodItem__prices")
+    old_tag = prices.select_one("i") if prices else None
+    cur_tag = prices.select_one("b") if prices else None
+    specs_el = card.select_one(".prodItem__wrapText")
+    return {
+        "attrs": card.attrs,
+        "href": img_link.get("href") if img_link else None,
+        "old": old_tag.get_text(strip=True) if old_tag else None,
+        "cur": cur_tag.get_text(strip=True) if cur_tag else None,
+        "specs": specs_el.get_text(" ", strip=True) if specs_el else "",
+    }
+
+
+def build_row(values: dict) -> dict:
+    attrs = values["attrs"]
+
+    # --- GTM data (most fields) ---
+    gtm_raw = attrs.get("data-gtm", "{}")
+    try:
+        gtm = json.loads(gtm_raw)
+    except json.JSONDecodeError:
+        gtm = {}
+
+    product_id = attrs.get("id", "")
+    sku = attrs.get("data-sku", "")
+    title = gtm.get("item_name", "")
+    brand = gtm.get("item_brand", "")
+    price_gtm = gtm.get("price")          # current price from GTM
+    discount_gtm = gtm.get("discount")    # discount amount from GTM
+    category = gtm.get("item_category", "")
+    category2 = gtm.get("item_category2", "")
+    category3 = gtm.get("item_category3", "")
+
+    # --- URL ---
+    url = values["href"] or ""
+
+    # --- Prices from DOM (more reliable display values) ---
+    old_price_azn = parse_price(values["old"]) if values["old"] is not None else None
+    price_azn = parse_price(values["cur"]) if values["cur"] is not None else None
+
+    # Fallback to GTM price if DOM parsing fails
+    if price_azn is None and price_gtm is not None:
+        try:
+            price_azn = float(price_gtm)
+        except (ValueError, TypeError):
+            pass
+
+    # Discount: prefer GTM value, else compute from prices
+    discount_azn = None
+    if discount_gtm is not None:
+        try:
+            discount_azn = float(discount_gtm)
+        except (ValueError, TypeError):
+            pass
+    elif old_price_azn and price_azn:
+        discount_azn = round(old_price_azn - price_azn, 2)
+
+    return {
+        "product_id": product_id,
+        "sku": sku,
+        "title": title,
+        "brand": brand,
+        "url": url,
+        "price_azn": price_azn,
+        "old_price_azn": old_price_azn,
+        "discount_azn": discount_azn,
+        "specs": values["specs"],
+        "category": category,
+        "category2": category2,
+        "category3": category3,
+    }
 
 
 def parse_products(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
     products = []
 
-    for card in soup.select("div.product-item"):
-        # --- GTM data (most fields) ---
-        gtm_raw = card.get("data-gtm", "{}")
+    for raw in engine.card_slices(html, CARD):
         try:
-            gtm = json.loads(gtm_raw)
-        except json.JSONDecodeError:
-            gtm = {}
-
-        product_id = card.get("id", "")
-        sku = card.get("data-sku", "")
-        title = gtm.get("item_name", "")
-        brand = gtm.get("item_brand", "")
-        price_gtm = gtm.get("price")          # current price from GTM
-        discount_gtm = gtm.get("discount")    # discount amount from GTM
-        category = gtm.get("item_category", "")
-        category2 = gtm.get("item_category2", "")
-        category3 = gtm.get("item_category3", "")
-
-        # --- URL ---
-        img_link = card.select_one("a.prodItem__img")
-        url = img_link["href"] if img_link and img_link.get("href") else ""
-
-        # --- Prices from DOM (more reliable display values) ---
-        prices_div = card.select_one(".prodItem__prices")
-        old_price_azn = None
-        price_azn = None
-        if prices_div:
-            old_tag = prices_div.select_one("i")
-            cur_tag = prices_div.select_one("b")
-            if old_tag:
-                old_price_azn = parse_price(old_tag.get_text(strip=True))
-            if cur_tag:
-                price_azn = parse_price(cur_tag.get_text(strip=True))
-
-        # Fallback to GTM price if DOM parsing fails
-        if price_azn is None and price_gtm is not None:
-            try:
-                price_azn = float(price_gtm)
-            except (ValueError, TypeError):
-                pass
-
-        # Discount: prefer GTM value, else compute from prices
-        discount_azn = None
-        if discount_gtm is not None:
-            try:
-                discount_azn = float(discount_gtm)
-            except (ValueError, TypeError):
-                pass
-        elif old_price_azn and price_azn:
-            discount_azn = round(old_price_azn - price_azn, 2)
-
-        # --- Specs ---
-        specs_el = card.select_one(".prodItem__wrapText")
-        specs = specs_el.get_text(" ", strip=True) if specs_el else ""
-
-        products.append({
-            "product_id": product_id,
-            "sku": sku,
-            "title": title,
-            "brand": brand,
-            "url": url,
-            "price_azn": price_azn,
-            "old_price_azn": old_price_azn,
-            "discount_azn": discount_azn,
-            "specs": specs,
-            "category": category,
-            "category2": category2,
-            "category3": category3,
-        })
+            values = scan_card(raw)
+        except engine.ScanError:
+            metrics.incr(SITE.name, "parse_fallbacks")
+            values = dom_card(engine.cards(raw, CARD)[0])
+        products.append(build_row(values))
 
     return products
 
 
-def scrape_all() -> list[dict]:
-    print(f"Starting scrape — {CATEGORY_URL}")
-
-    # Fetch page 1 to determine last page
-    print("  Fetching page 1 (discovering pagination) ...", end=" ", flush=True)
-    html = fetch_page(1)
-    soup = BeautifulSoup(html, "html.parser")
-    last_page = get_last_page(soup)
-    print(f"last page = {last_page}")
-
-    all_products: list[dict] = []
-
-    # Parse page 1 we already fetched
-    page_products = parse_products(html)
-    all_products.extend(page_products)
-    print(f"  Page 1: {len(page_products)} products  (total: {len(all_products)})")
-
-    # Fetch remaining pages
-    for page in range(2, last_page + 1):
-        time.sleep(0.6)  # polite delay
-        print(f"  Fetching page {page}/{last_page} ...", end=" ", flush=True)
-        html = fetch_page(page)
-        page_products = parse_products(html)
-        all_products.extend(page_products)
-        print(f"got {len(page_products)} products  (total: {len(all_products)})")
-
-    return all_products
+def parse_page(html: str) -> tuple[list[dict], int]:
+    """Products and the last page number (the PageNumbers cursor)."""
+    return parse_products(html), get_last_page(html)
 
 
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} rows -> {path}")
+SITE = engine.Site(
+    name="kontakt",
+    page_url=page_url,
+    parse=parse_page,
+    pagination=engine.PageNumbers(),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    delay=0.6,
+)
 
 
 if __name__ == "__main__":
-    products = scrape_all()
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
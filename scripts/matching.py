@@ -0,0 +1,314 @@
+"""
+Near-duplicate product matching across retailers.
+Normalises each listing title into model tokens (brand, model codes, part
+number, CPU, RAM/SSD), blocks candidate pairs on brand + model token and
+scores them with IDF-weighted overlap. Matched listings are clustered and
+every row gets a stable 'product_key' that cross-retailer analytics can
+group on.
+
+Run directly to print the largest cross-retailer clusters in data/data.csv.
+"""
+
+import csv
+import hashlib
+import math
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from specs import extract
+
+DATA_FILE = Path(__file__).parent.parent / "data" / "data.csv"
+
+BRANDS = [
+    "asus", "hp", "lenovo", "acer", "msi", "dell", "apple", "huawei",
+    "samsung", "microsoft", "gigabyte", "xiaomi", "honor", "razer", "lg",
+    "toshiba", "fujitsu", "chuwi", "infinix", "tecno", "prestigio",
+]
+
+# Retailer-specific shorthand expanded to the manufacturer's wording,
+# e.g. soliton.az writes "LENOVO IPS3" for "Lenovo IdeaPad Slim 3".
+ALIASES = {
+    "ip": "ideapad",
+    "ip1": "ideapad 1",
+    "ip3": "ideapad 3",
+    "ip5": "ideapad 5",
+    "ips1": "ideapad slim 1",
+    "ips3": "ideapad slim 3",
+    "ips5": "ideapad slim 5",
+    "tb": "thinkbook",
+    "proobok": "probook",
+}
+
+# Words that describe the listing rather than the product.
+STOPWORDS = {
+    "notbuk", "noutbuk", "notbuku", "noutbuku", "nobutk", "oyun", "laptop", "notebook",
+    "gaming", "pc", "with", "and", "the", "for", "inch", "display", "ekran",
+    "processor", "prosessor", "graphics", "card", "ram", "ssd", "hdd", "emmc",
+    "ddr4", "ddr5", "lpddr4", "lpddr4x", "lpddr5", "lpddr5x", "gb", "tb",
+    "intel", "amd", "core", "ryzen", "nvidia", "geforce", "rtx", "gtx",
+    "radeon", "windows", "win", "dos", "freedos", "free", "home", "pro64",
+    "black", "silver", "grey", "gray", "blue", "gold", "white", "green",
+    "starlight", "midnight", "space", "rəsmi", "zəmanət", "gümüşü", "qara",
+    "boz", "new", "yeni", "in", "a", "s",
+}
+
+# Listings are paired within blocks of one brand and one model token. A block
+# larger than this (a series name, a screen size) is too common to say two
+# listings are one product and is not used, so the pairs per listing stay
+# bounded however large the catalog grows.
+MAX_BLOCK = 50
+
+# Minimum IDF-weighted overlap for two listings to be the same product.
+MATCH_THRESHOLD = 0.6
+
+DASHES_RE = re.compile(r"[‐-―−]")
+NOISE_RE = re.compile(r"[®™©\"″]")
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-._][a-z0-9]+)*")
+PAREN_RE = re.compile(r"\(([^()]*)\)")
+# Part numbers written without parentheses: ASUS '90NB13Y1-M00X70',
+# Lenovo machine-type models '82XQ00JPRK' / '21SK007URT'.
+BARE_PART_RES = [
+    re.compile(r"\b(90n[a-z0-9]{5,6}-m[a-z0-9]{5})\b"),
+    re.compile(r"\b((?:8[0-3]|2[01])[a-z0-9]{2}\d{2}[a-z0-9]{4})\b"),
+]
+
+CPU_RES = [
+    re.compile(r"\b(i[3579])[\s-]*(\d{4,5}[a-z]{0,2})\b"),
+    re.compile(r"\b(?:ryzen\s*|r)([3579])[\s-]*(\d{4}[a-z]{0,2})\b"),
+    re.compile(r"\b(?:core\s*)?(ultra\s*[579])\s*(\d{3}[a-z]{0,2})\b"),
+]
+SLASH_CONFIG_RE = re.compile(r"/\s*(\d{1,2})\s*(?:gb)?\s*/\s*(\d{3,4}|[124]\s*tb)\b")
+GB_RE = re.compile(r"\b(\d{1,4})\s*(gb|tb)\b")
+
+
+def extract_config(text: str) -> dict:
+    """Pull CPU model, RAM and storage out of a title via specs.extract.
+
+    Missing parts are None; the CPU model is lowercased so that case
+    differences between retailers do not count as a conflict.
+    """
+    spec = extract(text)
+    cpu = spec["cpu_model"].lower() if spec["cpu_model"] else None
+    return {"cpu": cpu, "ram_gb": spec["ram_gb"], "ssd_gb": spec["ssd_gb"]}
+
+
+def normalize_title(title: str) -> dict:
+    """Turn a raw listing title into matching features.
+
+    Returns {"brand", "part", "tokens", "cpu", "ram_gb", "ssd_gb"} where
+    'tokens' is the set of model tokens (series words and model codes, with
+    hyphenated codes also split into their parts).
+    """
+    text = DASHES_RE.sub("-", title.lower())
+    text = NOISE_RE.sub(" ", text)
+
+    # --- manufacturer part number ---
+    part = ""
+    for inner in PAREN_RE.findall(text):
+        inner = inner.strip()
+        if re.fullmatch(r"[a-z0-9][a-z0-9.\-/#_]{4,}", inner) and re.search(r"\d", inner) \
+                and re.search(r"[a-z]", inner):
+            part = inner
+            break
+    if not part:
+        for rx in BARE_PART_RES:
+            m = rx.search(text)
+            if m:
+                part = m.group(1)
+                break
+    part = re.sub(r"[^a-z0-9]", "", part)
+
+    config = extract_config(text)
+
+    # --- model tokens ---
+    model_text = GB_RE.sub(" ", SLASH_CONFIG_RE.sub(" ", text))
+    words = []
+    for tok in TOKEN_RE.findall(model_text):
+        words.extend(ALIASES.get(tok, tok).split())
+
+    brand = ""
+    tokens = set()
+    for tok in words:
+        if not brand and tok in BRANDS:
+            brand = tok
+            continue
+        if tok in STOPWORDS or tok in BRANDS:
+            continue
+        compact = re.sub(r"[-._]", "", tok)
+        if compact == part:
+            continue
+        tokens.add(compact)
+        if compact != tok:
+            for piece in re.split(r"[-._]", tok):
+                if len(piece) >= 3 and re.search(r"\d", piece) and re.search(r"[a-z]", piece):
+                    tokens.add(piece)
+
+    # CPU and memory are compared as attributes, not as overlap tokens.
+    for rx in CPU_RES:
+        for m in rx.finditer(text):
+            tokens.discard(m.group(0).replace(" ", "").replace("-", ""))
+            tokens.discard(m.group(2))
+
+    return {"brand": brand, "part": part, "tokens": tokens, **config}
+
+
+def _conflict(a: dict, b: dict) -> bool:
+    """True if two feature dicts (or cluster summaries) cannot be one product."""
+    for key in ("brand", "part", "cpu", "ram_gb", "ssd_gb"):
+        if a.get(key) and b.get(key) and a[key] != b[key]:
+            return True
+    return False
+
+
+def _signature(feat: dict) -> str:
+    parts = [feat["brand"], feat["part"], " ".join(sorted(feat["tokens"]))]
+    parts += [str(feat[k] or "") for k in ("cpu", "ram_gb", "ssd_gb")]
+    return "|".join(parts)
+
+
+def _anchor(summary: dict, feats: list[dict]) -> str:
+    """What identifies a cluster's product, independent of which listings it has.
+
+    The brand and manufacturer part number when the cluster has one, which
+    fixes the configuration; else the brand, the model tokens every listing
+    shares, CPU, RAM and SSD. A listing joining or leaving the cluster leaves
+    the key alone unless it brings the first part number or changes what the
+    listings without one have in common.
+    """
+    if summary["part"]:
+        return f"{summary['brand']}|#{summary['part']}"
+    model = " ".join(sorted(set.intersection(*(f["tokens"] for f in feats))))
+    return "|".join([summary["brand"], model] + [str(summary[k] or "") for k in ("cpu", "ram_gb", "ssd_gb")])
+
+
+def match_products(titles: list[str]) -> list[str]:
+    """Return a product_key for every title (empty string for empty titles).
+
+    Listings end up with the same key when their IDF-weighted token overlap
+    reaches MATCH_THRESHOLD, or when they carry the same part number, and no
+    attribute (brand, part number, CPU, RAM, SSD) contradicts the rest of
+    the cluster. Keys do not depend on input order.
+    """
+    feats = [normalize_title(t) if t.strip() else None for t in titles]
+    live = [i for i, f in enumerate(feats) if f is not None]
+    # Canonical processing order so that clustering is input-order independent
+    live.sort(key=lambda i: (_signature(feats[i]), titles[i]))
+    order = {i: rank for rank, i in enumerate(live)}
+
+    # --- blocks (brand, token) + IDF over the whole catalog ---
+    postings: dict[str, list[int]] = defaultdict(list)
+    blocks: dict[tuple[str, str], list[int]] = defaultdict(list)
+    for i in live:
+        for tok in feats[i]["tokens"]:
+            postings[tok].append(i)
+            blocks[feats[i]["brand"], tok].append(i)
+        if feats[i]["part"]:
+            postings["#" + feats[i]["part"]].append(i)
+
+    n = max(len(live), 1)
+    idf = {tok: math.log(1 + n / len(ids)) for tok, ids in postings.items()}
+
+    def weight(f: dict) -> float:
+        return sum(idf[t] for t in f["tokens"])
+
+    weights = {i: weight(feats[i]) for i in live}
+
+    # --- candidate pairs: accumulate shared weight over rare tokens ---
+    pairs = []
+    for i in live:
+        fi = feats[i]
+        if fi["part"]:
+            for j in postings["#" + fi["part"]]:
+                if order[j] > order[i] and not _conflict(fi, feats[j]):
+                    pairs.append((1.0, i, j))
+
+        shared: dict[int, float] = defaultdict(float)
+        for tok in fi["tokens"]:
+            ids = blocks[fi["brand"], tok]
+            if len(ids) > MAX_BLOCK:
+                continue
+            for j in ids:
+                if order[j] > order[i]:
+                    shared[j] += idf[tok]
+        for j, inter in shared.items():
+            fj = feats[j]
+            if _conflict(fi, fj):
+                continue
+            # Part numbers that differ were rejected above; when only one
+            # side has one, score on model tokens alone.
+            denom = min(weights[i], weights[j]) * 0.5 + max(weights[i], weights[j]) * 0.5
+            score = inter / denom if denom else 0.0
+            if score >= MATCH_THRESHOLD:
+                pairs.append((score, i, j))
+
+    # --- cluster: strongest pairs first, refuse merges that contradict ---
+    parent = {i: i for i in live}
+    summary = {
+        i: {k: feats[i][k] for k in ("brand", "part", "cpu", "ram_gb", "ssd_gb")}
+        for i in live
+    }
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    pairs.sort(key=lambda p: (-p[0], order[p[1]], order[p[2]]))
+    for _, i, j in pairs:
+        ri, rj = find(i), find(j)
+        if ri == rj or _conflict(summary[ri], summary[rj]):
+            continue
+        if order[rj] < order[ri]:
+            ri, rj = rj, ri
+        parent[rj] = ri
+        for k, v in summary[rj].items():
+            if not summary[ri][k]:
+                summary[ri][k] = v
+
+    # --- stable key per cluster: hash of its model anchor ---
+    members: dict[int, list[int]] = defaultdict(list)
+    for i in live:
+        members[find(i)].append(i)
+
+    keys = [""] * len(titles)
+    anchors = {root: _anchor(summary[root], [feats[i] for i in ids]) for root, ids in members.items()}
+    taken = defaultdict(list)
+    for root, anchor in anchors.items():
+        taken[anchor].append(root)
+    for root, ids in members.items():
+        anchor = anchors[root]
+        if len(taken[anchor]) > 1:      # clusters the anchor cannot tell apart
+            anchor += "|" + min(_signature(feats[i]) for i in ids)
+        key = hashlib.blake2b(anchor.encode("utf-8"), digest_size=6).hexdigest()
+        for i in ids:
+            keys[i] = key
+    return keys
+
+
+def assign_product_keys(rows: list[dict]) -> None:
+    """Set row['product_key'] in place for a list of unified rows."""
+    keys = match_products([r.get("title", "") for r in rows])
+    for row, key in zip(rows, keys):
+        row["product_key"] = key
+
+
+if __name__ == "__main__":
+    with open(DATA_FILE, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assign_product_keys(rows)
+
+    groups = defaultdict(list)
+    for r in rows:
+        if r["product_key"]:
+            groups[r["product_key"]].append(r)
+
+    multi = {k: g for k, g in groups.items() if len({r["source"] for r in g}) >= 2}
+    print(f"{len(rows)} rows -> {len(groups)} products, "
+          f"{len(multi)} on 2+ retailers, "
+          f"{sum(1 for g in multi.values() if len({r['source'] for r in g}) >= 3)} on 3+")
+    for key, g in sorted(multi.items(), key=lambda kv: -len({r["source"] for r in kv[1]}))[:15]:
+        print(f"\n  {key}  ({len({r['source'] for r in g})} retailers)")
+        for r in g[:6]:
+            print(f"    {r['source']:20s} {r['title'][:90]}")
@@ -0,0 +1,249 @@
+"""
+Per-site scrape instrumentation.
+The scraping engine (engine.py) times every request and page parse and routes
+polite delays through here, so every run records:
+
+  - request latency (histogram), request count, errors
+  - bytes downloaded (compressed, as on the wire) and decoded
+  - parse time per page (histogram), pages and products parsed
+  - time spent in polite sleeps vs. active time
+  - named event counters (incr), e.g. parse_fallbacks
+
+export(site) is called at the end of each scraper run (engine.run). It appends one JSON
+line per run to data/metrics/runs.jsonl and rewrites
+data/metrics/<site>.prom in Prometheus text format, ready for a
+node_exporter textfile collector.
+"""
+
+import contextlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+METRICS_DIR = Path(__file__).parent.parent / "data" / "metrics"
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PARSE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+COUNTER_HELP = {
+    "parse_fallbacks": "Cards the attribute scan could not read, parsed via the DOM instead.",
+    "page_size_rejected": "Page-size probes the server rejected (HTTP error or empty page).",
+    "page_size_truncated": "Page-size probes the server answered with fewer products than asked.",
+    "archive_objects_written": "Response bodies new to the archive (others were already stored).",
+    "parse_cache_hits": "Pages whose body was unchanged since the last run; parse skipped.",
+    "retries": "Requests retried after a 429, a 5xx or a network error.",
+    "throttle_decreases": "Times the host's adaptive limit was halved.",
+    "throttle_rate_limited": "Limit halvings caused by HTTP 429.",
+    "throttle_server_error": "Limit halvings caused by HTTP 5xx.",
+    "throttle_network_error": "Limit halvings caused by timeouts or connection errors.",
+    "throttle_latency": "Limit halvings caused by a latency spike.",
+    "session_bootstraps": "New sessions started (none saved, saved one expired, or rejected).",
+    "duplicates_dropped": "Products seen again on a later page of the same run (catalog shifted), dropped.",
+    "dedup_spills": "Runs whose dedup set outgrew memory and moved to disk behind a Bloom filter.",
+    "likely_skips": "Products the listing total says exist but the run never saw.",
+    "health_failures": "Pages or runs that failed a health check; the site is flagged and its CSV kept.",
+}
+
+# Set by benchmarks: sleeps are still recorded but not performed.
+skip_sleeps = False
+
+_lock = threading.Lock()
+_sites: dict[str, dict] = {}
+
+
+def _histogram(buckets: tuple) -> dict:
+    return {"buckets": list(buckets), "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+
+
+def _observe(hist: dict, value: float) -> None:
+    for i, bound in enumerate(hist["buckets"]):
+        if value <= bound:
+            hist["counts"][i] += 1
+            break
+    hist["sum"] += value
+    hist["count"] += 1
+
+
+def _site(site: str) -> dict:
+    """Return the metric record for a site, starting its run clock."""
+    rec = _sites.get(site)
+    if rec is None:
+        rec = _sites[site] = {
+            "started": time.perf_counter(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "requests": 0,
+            "errors": 0,
+            "bytes": 0,
+            "decoded_bytes": 0,
+            "latency": _histogram(LATENCY_BUCKETS),
+            "pages": 0,
+            "products": 0,
+            "parse": _histogram(PARSE_BUCKETS),
+            "sleeps": 0,
+            "sleep_s": 0.0,
+            "counters": {},
+        }
+    return rec
+
+
+# --- recording ---
+
+@contextlib.contextmanager
+def request(site: str):
+    """Time one request: request count, latency and errors."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        with _lock:
+            _site(site)["errors"] += 1
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            rec = _site(site)
+            rec["requests"] += 1
+            _observe(rec["latency"], elapsed)
+
+
+def read(site: str, resp) -> bytes:
+    """resp.read(), counting the bytes downloaded (still compressed)."""
+    body = resp.read()
+    with _lock:
+        _site(site)["bytes"] += len(body)
+    return body
+
+
+def decoded(site: str, size: int) -> None:
+    """Record a response body's size after Content-Encoding is undone."""
+    with _lock:
+        _site(site)["decoded_bytes"] += size
+
+
+def record_parse(site: str, seconds: float, products: int) -> None:
+    """Record one parsed page."""
+    with _lock:
+        rec = _site(site)
+        rec["pages"] += 1
+        rec["products"] += products
+        _observe(rec["parse"], seconds)
+
+
+def incr(site: str, name: str, n: int = 1) -> None:
+    """Bump a named event counter, e.g. parse_fallbacks."""
+    with _lock:
+        counters = _site(site)["counters"]
+        counters[name] = counters.get(name, 0) + n
+
+
+def sleep(site: str, seconds: float) -> None:
+    """Polite delay between requests, recorded separately from active time."""
+    with _lock:
+        rec = _site(site)
+        rec["sleeps"] += 1
+        rec["sleep_s"] += seconds
+    if not skip_sleeps:
+        time.sleep(seconds)
+
+
+# --- reporting ---
+
+def summary(site: str) -> dict:
+    """Flat summary of a site's run so far."""
+    with _lock:
+        rec = _site(site)
+        wall = time.perf_counter() - rec["started"]
+        sleep_s = rec["sleep_s"] if not skip_sleeps else 0.0
+        fetch_s = rec["latency"]["sum"]
+        parse_s = rec["parse"]["sum"]
+        return {
+            "site": site,
+            "started_at": rec["started_at"],
+            "wall_s": round(wall, 3),
+            "active_s": round(wall - sleep_s, 3),
+            "sleep_s": round(rec["sleep_s"], 3),
+            "sleeps": rec["sleeps"],
+            "fetch_s": round(fetch_s, 3),
+            "parse_s": round(parse_s, 3),
+            "other_s": round(max(wall - sleep_s - fetch_s - parse_s, 0.0), 3),
+            "requests": rec["requests"],
+            "errors": rec["errors"],
+            "bytes": rec["bytes"],
+            "decoded_bytes": rec["decoded_bytes"],
+            "compression_ratio": round(rec["decoded_bytes"] / rec["bytes"], 2) if rec["bytes"] else 0,
+            "pages": rec["pages"],
+            "products": rec["products"],
+            "products_per_page": round(rec["products"] / rec["pages"], 1) if rec["pages"] else 0,
+            "latency_mean_s": round(fetch_s / rec["requests"], 4) if rec["requests"] else 0,
+            "parse_mean_s": round(parse_s / rec["pages"], 4) if rec["pages"] else 0,
+            "latency_hist": dict(zip(map(str, rec["latency"]["buckets"]), rec["latency"]["counts"])),
+            "parse_hist": dict(zip(map(str, rec["parse"]["buckets"]), rec["parse"]["counts"])),
+            "counters": dict(rec["counters"]),
+        }
+
+
+def _prom_histogram(lines: list[str], name: str, help_text: str, site: str, hist: dict) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    cumulative = 0
+    for bound, count in zip(hist["buckets"], hist["counts"]):
+        cumulative += count
+        lines.append(f'{name}_bucket{{site="{site}",le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{site="{site}",le="+Inf"}} {hist["count"]}')
+    lines.append(f'{name}_sum{{site="{site}"}} {hist["sum"]:.6f}')
+    lines.append(f'{name}_count{{site="{site}"}} {hist["count"]}')
+
+
+def prometheus_text(site: str) -> str:
+    s = summary(site)
+    with _lock:
+        rec = _site(site)
+        lines: list[str] = []
+        _prom_histogram(lines, "scrape_request_duration_seconds",
+                        "Listing request latency including body download.", site, rec["latency"])
+        _prom_histogram(lines, "scrape_parse_duration_seconds",
+                        "Time to parse one listing page.", site, rec["parse"])
+    counters = [
+        ("scrape_requests_total", "Listing requests made.", s["requests"]),
+        ("scrape_request_errors_total", "Listing requests that raised.", s["errors"]),
+        ("scrape_response_bytes_total", "Response body bytes downloaded (compressed).", s["bytes"]),
+        ("scrape_response_decoded_bytes_total", "Response body bytes after decompression.", s["decoded_bytes"]),
+        ("scrape_pages_total", "Listing pages parsed.", s["pages"]),
+        ("scrape_products_total", "Products parsed.", s["products"]),
+        ("scrape_sleep_seconds_total", "Time spent in polite delays.", s["sleep_s"]),
+        ("scrape_active_seconds_total", "Run time excluding polite delays.", s["active_s"]),
+    ]
+    for name, value in sorted(s["counters"].items()):
+        counters.append((f"scrape_{name}_total", COUNTER_HELP.get(name, f"{name} events."), value))
+    for name, help_text, value in counters:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f'{name}{{site="{site}"}} {value}']
+    return "\n".join(lines) + "\n"
+
+
+def export(site: str, metrics_dir: Path | None = None, error: BaseException | None = None) -> dict:
+    """Append the run summary to runs.jsonl and write <site>.prom (in METRICS_DIR
+    by default). A run that stopped on error is exported too, marked with it."""
+    metrics_dir = metrics_dir or METRICS_DIR
+    s = summary(site)
+    if error is not None:
+        s["error"] = f"{type(error).__name__}: {error}"
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    with open(metrics_dir / "runs.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps(s) + "\n")
+    (metrics_dir / f"{site}.prom").write_text(prometheus_text(site), encoding="utf-8")
+    print(f"  metrics: {s['requests']} requests, {s['bytes'] / 1e6:.2f} MB "
+          f"({s['decoded_bytes'] / 1e6:.2f} MB decoded), "
+          f"fetch {s['fetch_s']:.1f} s, parse {s['parse_s']:.1f} s, sleep {s['sleep_s']:.1f} s "
+          f"-> {metrics_dir}")
+    return s
+
+
+def reset(site: str | None = None) -> None:
+    """Forget recorded metrics for one site (or all)."""
+    with _lock:
+        if site is None:
+            _sites.clear()
+        else:
+            _sites.pop(site, None)
@@ -8,24 +8,16 @@ Last page parsed from div.pagination page-numbers text (max numeric value).
 Saves all products to data/qiymeti.csv.
 """
 
-import csv
-import re
-import time
-import urllib.request
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import engine
 
 BASE_URL = "https://qiymeti.net"
 AJAX_URL = f"{BASE_URL}/wp-admin/admin-ajax.php"
 OUTPUT = Path(__file__).parent.parent / "data" / "qiymeti.csv"
+CARD = "div.product[data-product-id]"
 
 HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/144.0.0.0 Safari/537.36"
-    ),
     "Accept": "text/plain, */*; q=0.01",
     "Accept-Language": "en-GB,en-US;q=0.9,en;q=0.8",
     "X-Requested-With": "XMLHttpRequest",
@@ -42,24 +34,17 @@ CSV_FIELDS = [
 ]
 
 
-def fetch_page(page: int) -> str:
-    url = (
+def page_url(page: int) -> str:
+    return (
         f"{AJAX_URL}?sehife={page}"
         "&action=print_filters_and_products"
         "&product_type=notebook"
     )
-    req = urllib.request.Request(url, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=30) as r:
-        return r.read().decode("utf-8")
 
 
-def get_last_page(soup: BeautifulSoup) -> int:
-    max_page = 1
-    for el in soup.select("div.pagination a.page-numbers, div.pagination span.page-numbers"):
-        txt = el.get_text(strip=True)
-        if txt.isdigit():
-            max_page = max(max_page, int(txt))
-    return max_page
+def get_last_page(html: str) -> int:
+    return engine.max_page(html, "div.pagination a.page-numbers, div.pagination span.page-numbers",
+                           attr=None, pattern=r"^(\d+)$")
 
 
 def parse_price(text: str) -> float | None:
@@ -81,11 +66,10 @@ def parse_price(text: str) -> float | None:
         return None
 
 
-def parse_products(html: str) -> tuple[list[dict], BeautifulSoup]:
-    soup = BeautifulSoup(html, "html.parser")
+def parse_products(html: str) -> list[dict]:
     products = []
 
-    for card in soup.select("div.product[data-product-id]"):
+    for card in engine.cards(html, CARD):
         product_id = card.get("data-product-id", "")
 
         # --- title & URL ---
@@ -111,42 +95,25 @@ def parse_products(html: str) -> tuple[list[dict], BeautifulSoup]:
             "specs": specs,
         })
 
-    return products, soup
+    return products
 
 
-def scrape_all() -> list[dict]:
-    print(f"Starting scrape — {AJAX_URL}")
+def parse_page(html: str) -> tuple[list[dict], int]:
+    """Products and the last page number (the PageNumbers cursor)."""
+    return parse_products(html), get_last_page(html)
 
-    print("  Fetching page 1 (discovering pagination) ...", end=" ", flush=True)
-    html = fetch_page(1)
-    page_products, soup = parse_products(html)
-    last_page = get_last_page(soup)
-    print(f"last page = {last_page}")
 
-    all_products: list[dict] = []
-    all_products.extend(page_products)
-    print(f"  Page 1: {len(page_products)} products  (total: {len(all_products)})")
-
-    for page in range(2, last_page + 1):
-        time.sleep(0.5)
-        print(f"  Fetching page {page}/{last_page} ...", end=" ", flush=True)
-        html = fetch_page(page)
-        page_products, _ = parse_products(html)
-        all_products.extend(page_products)
-        print(f"got {len(page_products)} products  (total: {len(all_products)})")
-
-    return all_products
-
-
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} rows -> {path}")
+SITE = engine.Site(
+    name="qiymeti",
+    page_url=page_url,
+    parse=parse_page,
+    pagination=engine.PageNumbers(),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    delay=0.5,
+)
 
 
 if __name__ == "__main__":
-    products = scrape_all()
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
@@ -0,0 +1,288 @@
+"""
+Refresh scheduler: re-scrapes each site about as often as its data changes.
+
+Every time data/<site>.csv changes (a scheduled refresh, or any manual run
+of a scraper, crawl.py or jobs.py collect) it is compared with the copy
+kept from the previous observation, rows matched on product_id /
+product_code / url. The share of listings added, removed or changed over
+the hours between the two snapshots gives the site's change rate, assuming
+each listing changes independently at a steady rate:
+
+  rate = -ln(1 - changed share) / hours       pooled over the last HISTORY observations,
+                                              plus a PRIOR_HOURS pseudo-observation at PRIOR_RATE
+
+A refresh costs the requests the site's last run made (data/metrics). The
+plan spends a daily request budget where it buys the most freshness: with
+n listings changing at rate r and a refresh costing c requests, stale
+listing-hours are lowest for the interval
+
+  interval = k * sqrt(c / (n * r))
+
+k chosen so the refreshes fit the budget, each interval kept within
+MIN_INTERVAL_H..MAX_INTERVAL_H. High-churn sites are refreshed often,
+static and costly ones rarely. After each refresh data.csv is rebuilt
+and its changes go to the feed (changes.py).
+
+  data/schedule/state.json          per site: snapshot time and rows, last refresh, cost, history
+  data/schedule/plan.json           the current plan, rewritten on every change
+  data/schedule/snapshots/<site>.csv
+
+Usage:
+  python3 scripts/schedule.py plan                  # rates, intervals, next runs
+  python3 scripts/schedule.py run                   # daemon: refresh sites as they fall due
+  python3 scripts/schedule.py run --once --budget 500
+"""
+
+import argparse
+import csv
+import importlib
+import json
+import math
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import changes
+import combine
+import engine
+import metrics
+from crawl import SITES, Crawl
+
+SCHEDULE_DIR = Path(__file__).parent.parent / "data" / "schedule"
+DATA_DIR = Path(__file__).parent.parent / "data"
+BUDGET = 1000                   # requests per day, all sites together
+MIN_INTERVAL_H = 1.0
+MAX_INTERVAL_H = 7 * 24.0
+HISTORY = 20                    # observations kept per site
+PRIOR_RATE = 1 / 24             # per hour, for a site with little history
+PRIOR_HOURS = 12.0
+DEFAULT_COST = 10               # requests, for a site never run
+MAX_SLEEP_S = 15 * 60           # the daemon re-checks for outside changes this often
+
+
+def _stamp(t: float) -> str:
+    return datetime.fromtimestamp(t, timezone.utc).isoformat(timespec="seconds")
+
+
+def load_state(root: Path | None = None) -> dict:
+    try:
+        with open((root or SCHEDULE_DIR) / "state.json", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: dict, root: Path | None = None) -> None:
+    root = root or SCHEDULE_DIR
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / "state.json", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+# --- change rate ---
+
+def _keyed(path: Path) -> dict[str, dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    return {row.get("product_id") or row.get("product_code") or row.get("url", ""): row for row in rows}
+
+
+def changed_share(old: Path, new: Path) -> tuple[float, int]:
+    """Share of listings added, removed or changed between two CSVs, and the new row count."""
+    before, after = _keyed(old), _keyed(new)
+    keys = before.keys() | after.keys()
+    changed = sum(1 for k in keys if before.get(k) != after.get(k))
+    return (changed / len(keys) if keys else 0.0), len(after)
+
+
+def observe(site: str, state: dict, root: Path | None = None, data_dir: Path | None = None) -> bool:
+    """Record a change in data/<site>.csv since the last snapshot; True if there was one."""
+    root = root or SCHEDULE_DIR
+    csv_path = (data_dir or DATA_DIR) / f"{site}.csv"
+    if not csv_path.exists():
+        return False
+    entry = state.setdefault(site, {"history": []})
+    mtime = csv_path.stat().st_mtime
+    if entry.get("snapshot_at") == mtime:
+        return False
+    snapshot = root / "snapshots" / f"{site}.csv"
+    if snapshot.exists() and entry.get("snapshot_at"):
+        share, rows = changed_share(snapshot, csv_path)
+        entry["history"] = (entry["history"] + [{
+            "at": _stamp(mtime),
+            "hours": round((mtime - entry["snapshot_at"]) / 3600, 4),
+            "rows": rows,
+            "changed": round(share, 4),
+        }])[-HISTORY:]
+    else:
+        rows = len(_keyed(csv_path))
+    entry["rows"] = rows        # listings in the latest snapshot; plan() needs them before any history
+    entry["last_run"] = max(entry.get("last_run", 0), mtime)   # also picks up runs made outside the scheduler
+    entry["snapshot_at"] = mtime
+    snapshot.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(csv_path, snapshot)
+    return True
+
+
+def change_rate(history: list[dict]) -> float:
+    """Listing changes per listing-hour, pooled over history and the prior."""
+    events = sum(-math.log(1 - min(h["changed"], 0.99)) for h in history if h["hours"] > 0)
+    hours = sum(h["hours"] for h in history if h["hours"] > 0)
+    return (events + PRIOR_RATE * PRIOR_HOURS) / (hours + PRIOR_HOURS)
+
+
+def _last_costs() -> dict[str, int]:
+    """Requests of each site's latest exported run."""
+    costs = {}
+    try:
+        with open(metrics.METRICS_DIR / "runs.jsonl", encoding="utf-8") as f:
+            for line in f:
+                run = json.loads(line)
+                if run.get("requests") and "error" not in run:     # a failed run stopped early
+                    costs[run["site"]] = run["requests"]
+    except OSError:
+        pass
+    return costs
+
+
+# --- plan ---
+
+def plan(state: dict, sites: list[str], budget: float = BUDGET, now: float | None = None) -> list[dict]:
+    """Refresh interval and next run per site, spending budget requests per day."""
+    now = now or time.time()
+    costs = _last_costs()
+    rows = []
+    for site in sites:
+        entry = state.get(site, {"history": []})
+        history = entry["history"]
+        rows.append({
+            "site": site,
+            "rate": change_rate(history),
+            "cost": entry.get("cost") or costs.get(site) or DEFAULT_COST,
+            "listings": max(entry.get("rows") or (history[-1]["rows"] if history else 1), 1),
+            "last_run": entry.get("last_run"),
+        })
+
+    # k from the sites whose interval is not clamped; repeat while clamping moves the budget
+    per_hour = budget / 24
+    fixed: dict[str, float] = {}
+    for _ in range(len(rows)):
+        free = [r for r in rows if r["site"] not in fixed]
+        spare = per_hour - sum(r["cost"] / fixed[r["site"]] for r in rows if r["site"] in fixed)
+        if not free:
+            break
+        k = sum(math.sqrt(r["cost"] * r["listings"] * r["rate"]) for r in free) / max(spare, 1e-9)
+        clamped = False
+        for r in free:
+            r["interval_h"] = k * math.sqrt(r["cost"] / (r["listings"] * r["rate"]))
+            if not MIN_INTERVAL_H <= r["interval_h"] <= MAX_INTERVAL_H:
+                fixed[r["site"]] = min(max(r["interval_h"], MIN_INTERVAL_H), MAX_INTERVAL_H)
+                clamped = True
+        if not clamped:
+            break
+    for r in rows:
+        r["interval_h"] = fixed.get(r["site"], r["interval_h"])
+        r["next_run"] = now if r["last_run"] is None else r["last_run"] + r["interval_h"] * 3600
+    return sorted(rows, key=lambda r: r["next_run"])
+
+
+def write_plan(rows: list[dict], budget: float, root: Path | None = None) -> None:
+    root = root or SCHEDULE_DIR
+    root.mkdir(parents=True, exist_ok=True)
+    out = {
+        "updated_at": _stamp(time.time()),
+        "budget_per_day": budget,
+        "requests_per_day": round(sum(r["cost"] * 24 / r["interval_h"] for r in rows), 1),
+        "sites": [{
+            "site": r["site"],
+            "change_rate_per_day": round(r["rate"] * 24, 4),
+            "listings": r["listings"],
+            "cost_requests": r["cost"],
+            "interval_h": round(r["interval_h"], 2),
+            "last_run": _stamp(r["last_run"]) if r["last_run"] else None,
+            "next_run": _stamp(r["next_run"]),
+        } for r in rows],
+    }
+    with open(root / "plan.json", "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2)
+        f.write("\n")
+
+
+def print_plan(rows: list[dict], budget: float) -> None:
+    spent = sum(r["cost"] * 24 / r["interval_h"] for r in rows)
+    print(f"{'site':16s} {'changes/day':>11s} {'listings':>8s} {'cost':>5s} {'every':>8s}  next run")
+    for r in rows:
+        print(f"{r['site']:16s} {r['rate'] * 24:11.3f} {r['listings']:8d} {r['cost']:5d} "
+              f"{r['interval_h']:7.1f}h  {_stamp(r['next_run'])}")
+    print(f"\n{spent:.0f} of {budget:.0f} requests/day")
+
+
+# --- daemon ---
+
+def refresh(names: list[str], state: dict) -> None:
+    """Crawl the due sites together, write their CSVs and record what changed."""
+    sites = [importlib.import_module(name).SITE for name in names]
+    crawl = Crawl(sites)
+    results = crawl.run()
+    for site in sites:
+        state[site.name]["last_run"] = time.time()      # a failed site waits its interval too
+        run = metrics.export(site.name, error=crawl.errors.get(site.name))
+        if site.name in results:
+            engine.save_csv(results[site.name], site.output, site.fields)
+            state[site.name]["cost"] = run["requests"]
+            observe(site.name, state)
+        metrics.reset(site.name)
+
+
+def run(sites: list[str], budget: float, once: bool = False) -> None:
+    state = load_state()
+    while True:
+        for site in sites:
+            observe(site, state)
+        rows = plan(state, sites, budget)
+        write_plan(rows, budget)
+        save_state(state)
+        now = time.time()
+        due = [r["site"] for r in rows if r["next_run"] <= now]
+        if due:
+            print(f"\n{_stamp(now)}  refreshing {', '.join(due)}")
+            for site in due:
+                state.setdefault(site, {"history": []})
+            refresh(due, state)
+            combine.main()
+            changes.update()
+            save_state(state)
+            continue
+        if once:
+            return
+        wait = min(rows[0]["next_run"] - now, MAX_SLEEP_S)
+        print(f"{_stamp(now)}  next: {rows[0]['site']} at {_stamp(rows[0]['next_run'])}")
+        time.sleep(wait)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--budget", type=float, default=BUDGET, help="requests per day (default %(default)s)")
+    ap.add_argument("--sites", nargs="+", default=SITES)
+    sub = ap.add_subparsers(dest="command", required=True)
+    sub.add_parser("plan", help="print change rates, intervals and next run times")
+    p = sub.add_parser("run", help="refresh sites as they fall due")
+    p.add_argument("--once", action="store_true", help="refresh the sites due now, then exit")
+    args = ap.parse_args()
+
+    if args.command == "run":
+        run(args.sites, args.budget, args.once)
+        return
+    state = load_state()
+    for site in args.sites:
+        observe(site, state)
+    save_state(state)
+    rows = plan(state, args.sites, args.budget)
+    write_plan(rows, args.budget)
+    print_plan(rows, args.budget)
+
+
+if __name__ == "__main__":
+    main()
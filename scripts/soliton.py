@@ -3,29 +3,22 @@ Scraper for soliton.az laptops (sectionID=66).
 Saves all products to data/soliton.csv.
 """
 
-import csv
 import json
-import time
 import urllib.parse
-import urllib.request
 from pathlib import Path
 
-from bs4 import BeautifulSoup
+import engine
+import metrics
 
 BASE_URL = "https://soliton.az"
 AJAX_URL = f"{BASE_URL}/ajax-requests.php"
 SECTION_ID = "66"
-LIMIT = 15
 OUTPUT = Path(__file__).parent.parent / "data" / "soliton.csv"
+CARD = "div.product-item"
 
 HEADERS = {
     "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
     "X-Requested-With": "XMLHttpRequest",
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/144.0.0.0 Safari/537.36"
-    ),
     "Referer": f"{BASE_URL}/az/komputer-ve-aksesuarlar/notbuklar/",
     "Origin": BASE_URL,
 }
@@ -48,137 +41,180 @@ CSV_FIELDS = [
 ]
 
 
-def fetch_page(offset: int) -> dict:
-    payload = urllib.parse.urlencode({
+# The site's own "load more" button asks for 15.
+PAGE_SIZE = engine.PageSize((120, 60, 30, 15))
+
+
+def page_data(offset: int) -> bytes:
+    return urllib.parse.urlencode({
         "action": "loadProducts",
         "sectionID": SECTION_ID,
         "brandID": "0",
         "offset": str(offset),
-        "limit": str(LIMIT),
+        "limit": str(PAGE_SIZE.value),
         "sorting": "",
     }).encode()
 
-    req = urllib.request.Request(AJAX_URL, data=payload, headers=HEADERS)
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        return json.loads(resp.read().decode("utf-8"))
-
-
-def parse_products(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
-    products = []
-
-    for card in soup.select("div.product-item"):
-        # --- data attributes ---
-        title = card.get("data-title", "").strip()
-        price_raw = card.get("data-price", "")
-        brand_id = card.get("data-brandid", "")
-        position = card.get("data-position", "")
-        data_filters = card.get("data-filters", "").strip()
 
+def parse_page(body: str) -> tuple[list[dict], tuple[bool, int]]:
+    """Parse one JSON listing response ({"html": ..., "hasMore": ...}) into
+    products and the Offset cursor (hasMore, totalCount)."""
+    data = json.loads(body)
+    return parse_products(data["html"]), (data.get("hasMore", False), data.get("totalCount", 0))
+
+
+# --- card values ---
+# Title, price, brand, position and filters are data-* attributes of the card
+# itself; the rest are a handful of small elements. scan_card reads them from
+# the raw markup and dom_card is the BeautifulSoup fallback; both return the
+# same raw values.
+
+def scan_card(raw: str) -> dict:
+    card = engine.element(raw)
+    if "data-title" not in card.attrs or "data-price" not in card.attrs:
+        raise engine.ScanError("no data-title/data-price")
+    compare_span = engine.select_one(raw, "span.icon.compare", card)
+    link = engine.select_one(raw, "a.prodTitle", card) or engine.select_one(raw, "a.thumbHolder", card)
+    credit_span = engine.select_one(raw, ".prodPrice .creditPrice", card)
+    sale_star = engine.select_one(raw, ".saleStar", card)
+    pct = engine.select_one(raw, ".percent", sale_star) if sale_star else None
+    amt = engine.select_one(raw, ".moneydif .amount", sale_star) if sale_star else None
+    monthly = []
+    for mp in engine.select(raw, ".monthlyPayment", card):
+        amt_span = engine.select_one(raw, ".amount", mp)
+        monthly.append((mp.attrs.get("data-month", ""), engine.text(raw, amt_span) if amt_span else None))
+    return {
+        "attrs": card.attrs,
+        "product_id": compare_span.attrs.get("data-item-id", "") if compare_span else "",
+        "href": link.attrs.get("href") if link else None,
+        "credit": engine.text(raw, credit_span) if credit_span else None,
+        "sale": sale_star is not None,
+        "percent": engine.text(raw, pct) if pct else "",
+        "amount": engine.text(raw, amt) if amt else None,
+        "monthly": monthly,
+        "offers": [engine.text(raw, o) for o in engine.select(raw, ".specialOffers .offer .label", card)],
+    }
+
+
+def dom_card(card) -> dict:
+    compare_span = card.select_one("span.icon.compare")
+    link = card.select_one("a.prodTitle") or card.select_one("a.thumbHolder")
+    credit_span = card.select_one(".prodPrice .creditPrice")
+    sale_star = card.select_one(".saleStar")
+    pct = sale_star.select_one(".percent") if sale_star else None
+    amt = sale_star.select_one(".moneydif .amount") if sale_star else None
+    monthly = []
+    for mp in card.select(".monthlyPayment"):
+        amt_span = mp.select_one(".amount")
+        monthly.append((mp.get("data-month", ""), amt_span.get_text(strip=True) if amt_span else None))
+    return {
+        "attrs": card.attrs,
+        "product_id": compare_span.get("data-item-id", "") if compare_span else "",
+        "href": link.get("href") if link else None,
+        "credit": credit_span.get_text(strip=True) if credit_span else None,
+        "sale": sale_star is not None,
+        "percent": pct.get_text(strip=True) if pct else "",
+        "amount": amt.get_text(strip=True) if amt else None,
+        "monthly": monthly,
+        "offers": [s.get_text(strip=True) for s in card.select(".specialOffers .offer .label")],
+    }
+
+
+def build_row(values: dict) -> dict:
+    # --- data attributes ---
+    attrs = values["attrs"]
+    title = attrs.get("data-title", "").strip()
+    price_raw = attrs.get("data-price", "")
+    brand_id = attrs.get("data-brandid", "")
+    position = attrs.get("data-position", "")
+    data_filters = attrs.get("data-filters", "").strip()
+
+    try:
+        price_azn = float(price_raw) if price_raw else None
+    except ValueError:
+        price_azn = None
+
+    # --- product id & url ---
+    product_id = values["product_id"]
+    url = (BASE_URL + values["href"]) if values["href"] else ""
+
+    # --- credit price ---
+    credit_price_azn = None
+    if values["credit"] is not None:
+        credit_text = values["credit"].replace("AZN", "").strip()
         try:
-            price_azn = float(price_raw) if price_raw else None
+            credit_price_azn = float(credit_text)
         except ValueError:
-            price_azn = None
-
-        # --- product id & url ---
-        compare_span = card.select_one("span.icon.compare")
-        product_id = compare_span.get("data-item-id", "") if compare_span else ""
-
-        link = card.select_one("a.prodTitle") or card.select_one("a.thumbHolder")
-        url = (BASE_URL + link["href"]) if link and link.get("href") else ""
-
-        # --- credit price ---
-        credit_span = card.select_one(".prodPrice .creditPrice")
-        credit_price_azn = None
-        if credit_span:
-            credit_text = credit_span.get_text(strip=True).replace("AZN", "").strip()
+            pass
+
+    # --- discount ---
+    discount_percent = ""
+    discount_amount_azn = None
+    if values["sale"]:
+        discount_percent = values["percent"]
+        if values["amount"] is not None:
             try:
-                credit_price_azn = float(credit_text)
+                discount_amount_azn = float(values["amount"].replace("-", "").strip())
             except ValueError:
                 pass
 
-        # --- discount ---
-        discount_percent = ""
-        discount_amount_azn = None
-        sale_star = card.select_one(".saleStar")
-        if sale_star:
-            pct = sale_star.select_one(".percent")
-            discount_percent = pct.get_text(strip=True) if pct else ""
-            amt = sale_star.select_one(".moneydif .amount")
-            if amt:
-                try:
-                    discount_amount_azn = float(amt.get_text(strip=True).replace("-", "").strip())
-                except ValueError:
-                    pass
-
-        # --- monthly payments ---
-        monthly = {}
-        for mp in card.select(".monthlyPayment"):
-            month = mp.get("data-month", "")
-            amt_span = mp.select_one(".amount")
-            if month and amt_span:
-                try:
-                    monthly[month] = float(amt_span.get_text(strip=True))
-                except ValueError:
-                    pass
-
-        # --- special offers ---
-        offers = [s.get_text(strip=True) for s in card.select(".specialOffers .offer .label")]
-        special_offers = " | ".join(offers)
-
-        products.append({
-            "product_id": product_id,
-            "title": title,
-            "brand_id": brand_id,
-            "url": url,
-            "price_azn": price_azn,
-            "credit_price_azn": credit_price_azn,
-            "discount_percent": discount_percent,
-            "discount_amount_azn": discount_amount_azn,
-            "monthly_6_azn": monthly.get("6", ""),
-            "monthly_12_azn": monthly.get("12", ""),
-            "monthly_18_azn": monthly.get("18", ""),
-            "special_offers": special_offers,
-            "position": position,
-            "data_filters": data_filters,
-        })
-
-    return products
-
-
-def scrape_all() -> list[dict]:
-    print(f"Starting scrape — sectionID={SECTION_ID}, limit={LIMIT}")
-    all_products: list[dict] = []
-    offset = 0
+    # --- monthly payments ---
+    monthly = {}
+    for month, amount in values["monthly"]:
+        if month and amount is not None:
+            try:
+                monthly[month] = float(amount)
+            except ValueError:
+                pass
 
-    while True:
-        print(f"  Fetching offset={offset} ...", end=" ", flush=True)
-        resp = fetch_page(offset)
-        total = resp.get("totalCount", "?")
-        has_more = resp.get("hasMore", False)
+    # --- special offers ---
+    special_offers = " | ".join(values["offers"])
+
+    return {
+        "product_id": product_id,
+        "title": title,
+        "brand_id": brand_id,
+        "url": url,
+        "price_azn": price_azn,
+        "credit_price_azn": credit_price_azn,
+        "discount_percent": discount_percent,
+        "discount_amount_azn": discount_amount_azn,
+        "monthly_6_azn": monthly.get("6", ""),
+        "monthly_12_azn": monthly.get("12", ""),
+        "monthly_18_azn": monthly.get("18", ""),
+        "special_offers": special_offers,
+        "position": position,
+        "data_filters": data_filters,
+    }
 
-        page_products = parse_products(resp["html"])
-        all_products.extend(page_products)
-        print(f"got {len(page_products)} products  (total so far: {len(all_products)}/{total})")
 
-        if not has_more:
-            break
+def parse_products(html: str) -> list[dict]:
+    products = []
 
-        offset += LIMIT
-        time.sleep(0.5)  # polite delay
+    for raw in engine.card_slices(html, CARD):
+        try:
+            values = scan_card(raw)
+        except engine.ScanError:
+            metrics.incr(SITE.name, "parse_fallbacks")
+            values = dom_card(engine.cards(raw, CARD)[0])
+        products.append(build_row(values))
 
-    return all_products
+    return products
 
 
-def save_csv(products: list[dict], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writeheader()
-        writer.writerows(products)
-    print(f"\nSaved {len(products)} rows -> {path}")
+SITE = engine.Site(
+    name="soliton",
+    page_url=lambda offset: AJAX_URL,
+    page_data=page_data,
+    parse=parse_page,
+    pagination=engine.Offset(lambda: PAGE_SIZE.value),
+    fields=CSV_FIELDS,
+    output=OUTPUT,
+    headers=HEADERS,
+    page_size=PAGE_SIZE,
+    delay=0.5,
+)
 
 
 if __name__ == "__main__":
-    products = scrape_all()
-    save_csv(products, OUTPUT)
+    engine.run(SITE)
@@ -0,0 +1,300 @@
+"""
+Structured spec extraction from listing titles and spec text.
+Turns free text such as 'i3-1315U/8/256', 'RAM 32GB DDR5/SSD 1TB' or
+'15.6 inç ekran ölçüsü, Intel Core i7 prosessor seriyası' into typed columns:
+
+  cpu_family, cpu_model, ram_gb, ssd_gb, gpu, screen_in
+
+All patterns are compiled once at import. Results are cached by a hash of
+the input string, in memory and optionally on disk between combine runs
+(see load_cache / save_cache), so repeated titles and unchanged spec text
+are never re-parsed.
+
+Run directly to print field coverage per source for data/data.csv.
+"""
+
+import csv
+import hashlib
+import itertools
+import json
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+DATA_FILE = Path(__file__).parent.parent / "data" / "data.csv"
+
+SPEC_FIELDS = ["cpu_family", "cpu_model", "ram_gb", "ssd_gb", "gpu", "screen_in"]
+
+# Bump when any pattern changes so on-disk caches are discarded.
+EXTRACTOR_VERSION = 1
+
+RAM_SIZES = {2, 4, 6, 8, 12, 16, 18, 20, 24, 32, 36, 40, 48, 64, 96, 128}
+
+# ── Text clean-up ────────────────────────────────────────────────────────────
+DASHES_RE = re.compile(r"[‐-―−]")
+QUOTES_RE = re.compile(r"[″”“]|''")
+NOISE_RE = re.compile(r"[®™©]")
+
+# ── CPU ──────────────────────────────────────────────────────────────────────
+# Each entry: (pattern, family template, model template). Templates are
+# str.format()ed with the match groups; the first matching pattern wins.
+CPU_PATTERNS = [
+    (re.compile(r"\b(?:apple\s+)?(m[1-5])(?:\s+(pro|max|ultra))?\b(?=.*\b(?:apple|macbook)\b)"
+                r"|\b(?:apple|macbook)\b.*?\b(m[1-5])(?:\s+(pro|max|ultra))?\b"),
+     "apple", None),
+    (re.compile(r"\bsnapdragon\s+x\s*(elite|plus)?(?:\s+(x1[ep]?)[\s-]*(\d{2})[\s-]*(\d{3}))?"),
+     "snapdragon", None),
+    (re.compile(r"\b(?:core\s+)?ultra\s*([579])\s*[\s-]?(\d{3}[a-z]{0,2})\b"),
+     "Core Ultra {0}", "Core Ultra {0} {1}"),
+    (re.compile(r"\bu([579])[\s-](\d{3}[a-z]?)\b"),
+     "Core Ultra {0}", "Core Ultra {0} {1}"),
+    (re.compile(r"\bi([3579])\s*[\s-]?\s*(\d{4,5}(?:g\d|[a-z]{0,2})|n\d{3})\b"),
+     "Core i{0}", "Core i{0}-{1}"),
+    (re.compile(r"\bryzen\s+ai\s+(?:max\+?\s+)?([579])\s*(?:pro\s+)?(\d{3})\b"),
+     "Ryzen AI {0}", "Ryzen AI {0} {1}"),
+    (re.compile(r"\b(?:ryzen|r)\s*([3579])[\s-]*(?:pro\s+)?(\d{3,4}[a-z]{0,2})\b"),
+     "Ryzen {0}", "Ryzen {0} {1}"),
+    (re.compile(r"\b(?:intel\s+(?:core\s+)?|core\s+)([357])\s+(\d{3}[a-z]{0,2})\b"),
+     "Core {0}", "Core {0} {1}"),
+    (re.compile(r"\bcel(?:eron)?(?:\s+(?:silver|gold))?[\s-]*([a-z]?\d{3,4}[a-z]?)?\b"),
+     "Celeron", "Celeron {0}"),
+    (re.compile(r"\b(pentium|athlon)(?:\s+(?:silver|gold))?(?:\s+([a-z]?\d{3,4}[a-z]?))?\b"),
+     "{0}", "{0} {1}"),
+    (re.compile(r"\b(?:intel\s+)?n(50|95|97|100|150|200|300|305|355)\b"),
+     "Intel N", "N{0}"),
+    (re.compile(r"\b(?:intel\s+)?core\s*(?:i|™\s*i)?([3579])\b|\bi([3579])\b(?=\s*[/,|]|\s+(?:processor|prosessor))"),
+     "Core i{0}", None),
+    (re.compile(r"\b(?:core\s+)?ultra\s*([579])\b"),
+     "Core Ultra {0}", None),
+    (re.compile(r"\b(?:amd\s+)?ryzen\s*([3579])\b|\br([3579])/"),
+     "Ryzen {0}", None),
+    # soliton shorthand for Intel Core 3/5/7: 'C7/16/512'
+    (re.compile(r"\bc([357])/"),
+     "Core {0}", None),
+]
+
+# ── Memory & storage ─────────────────────────────────────────────────────────
+SIZE = r"(\d{1,4})\s*(gb|tb)"
+# soliton-style shorthand: 'i3-1315U/8/256', 'i7/16/512', 'C3/8/128'
+SLASH_CONFIG_RE = re.compile(r"/\s*(\d{1,3})\s*(?:gb)?\s*/\s*(\d{3,4}|[124])\s*(gb|tb)?\b")
+RAM_RES = [
+    re.compile(r"\bram\s*:?\s*(\d{1,3})\s*gb\b"),
+    re.compile(r"\b(\d{1,3})\s*gb\s*(?:unified\s+)?(?:ram|memory|(?:lp)?ddr\d?x?)\b"),
+    re.compile(r"\b(?:lp)?ddr\dx?\s*(\d{1,3})\s*gb\b"),
+    re.compile(r"\b(\d{1,3})\s*gb\s*/\s*\d{3,4}\s*gb\b"),
+]
+SSD_RES = [
+    re.compile(r"\bssd\s*:?\s*" + SIZE + r"\b"),
+    re.compile(r"\b" + SIZE + r"\s*(?:(?:pcie|m\.2|nvme|gen\s*\d|g\d|4\.0)\s*)*(?:ssd|nvme)\b"),
+    re.compile(r"\b\d{1,3}\s*gb\s*/\s*" + SIZE + r"\b"),
+]
+SIZE_RE = re.compile(r"\b" + SIZE + r"\b")
+GPU_MEMORY_CONTEXT_RE = re.compile(r"(?:rtx|gtx|mx|rx|radeon|arc|quadro|gddr\d?)\s*[\w ]{0,8}$")
+HDD_AFTER_RE = re.compile(r"^\s*(?:hdd|sata|emmc)")
+
+# ── GPU ──────────────────────────────────────────────────────────────────────
+GPU_PATTERNS = [
+    (re.compile(r"\b(rtx|gtx)\s*a?(\d{3,4})\s*(ti|super)?\b"), "{0} {1} {2}"),
+    (re.compile(r"\bradeon\s+(rx\s*\d{4}[a-z]{0,2})\b"), "Radeon {0}"),
+    (re.compile(r"\b(?:geforce\s+)?mx\s*(\d{3})\b"), "MX{0}"),
+    (re.compile(r"\barc\s+(a\d{3}m|\d{3}v|graphics)?"), "Arc {0}"),
+    (re.compile(r"\bradeon\s+(\d{3}m|vega\s*\d{1,2}|graphics)?"), "Radeon {0}"),
+    (re.compile(r"\biris\s*x[eᵉ]?"), "Iris Xe"),
+    (re.compile(r"\badreno\b"), "Adreno"),
+    (re.compile(r"\buhd(?:\s+graphics)?(?:\s+(\d{3}))?\b"), "UHD {0}"),
+]
+
+# ── Screen ───────────────────────────────────────────────────────────────────
+SCREEN_RE = re.compile(r"\b(1\d(?:[.,]\d{1,2})?)\s*(?:\"|-?\s*inch|-?\s*inç|\s*düym)")
+
+
+def _clean(text: str) -> str:
+    text = NOISE_RE.sub(" ", text.lower())
+    text = QUOTES_RE.sub('"', text)
+    return DASHES_RE.sub("-", text)
+
+
+def _size_gb(value: str, unit: str | None) -> int:
+    size = int(value)
+    if unit == "tb" or (unit is None and size <= 4):
+        return size * 1024
+    return size
+
+
+def _canon(text: str) -> str:
+    """'rtx 4070 ti' -> 'RTX 4070 Ti', 'vega 8' -> 'Vega 8', '1315u' -> '1315U'."""
+    words = []
+    for w in text.split():
+        if w == "ti":
+            words.append("Ti")
+        elif len(w) <= 3 or any(c.isdigit() for c in w):
+            words.append(w.upper())
+        else:
+            words.append(w.title())
+    return " ".join(words)
+
+
+def _cpu(text: str) -> tuple[str | None, str | None]:
+    for rx, family, model in CPU_PATTERNS:
+        m = rx.search(text)
+        if not m:
+            continue
+        if family == "apple":
+            chip = (m.group(1) or m.group(3)).upper()
+            tier = m.group(2) or m.group(4)
+            return f"Apple {chip}", f"{chip} {tier.title()}" if tier else chip
+        if family == "snapdragon":
+            tier, gen, a, b = m.groups()
+            fam = "Snapdragon X" + (f" {tier.title()}" if tier else "")
+            return fam, (f"{gen.upper()}-{a}-{b}" if gen else None)
+        groups = [_canon(g) for g in m.groups() if g]
+        if not groups:
+            return family, None
+        mod = model.format(*groups) if model and len(groups) == model.count("{") else None
+        return family.format(*groups), mod
+    return None, None
+
+
+def _ram_ssd(text: str) -> tuple[int | None, int | None]:
+    ram = ssd = None
+    m = SLASH_CONFIG_RE.search(text)
+    if m and int(m.group(1)) in RAM_SIZES:
+        ram = int(m.group(1))
+        ssd = _size_gb(m.group(2), m.group(3))
+
+    if ram is None:
+        for rx in RAM_RES:
+            m = rx.search(text)
+            if m and int(m.group(1)) in RAM_SIZES:
+                ram = int(m.group(1))
+                break
+    if ssd is None:
+        for rx in SSD_RES:
+            m = rx.search(text)
+            if m:
+                ssd = _size_gb(m.group(1), m.group(2))
+                break
+
+    # Fallback: bare sizes, skipping GPU memory ('RTX 4050 6GB') and HDDs
+    if ram is None or ssd is None:
+        for m in SIZE_RE.finditer(text):
+            size = _size_gb(m.group(1), m.group(2))
+            if GPU_MEMORY_CONTEXT_RE.search(text[max(0, m.start() - 16):m.start()]):
+                continue
+            if HDD_AFTER_RE.match(text[m.end():]):
+                continue
+            if ram is None and size in RAM_SIZES and size < 128:
+                ram = size
+            elif ssd is None and size >= 128:
+                ssd = size
+    return ram, ssd
+
+
+def _gpu(text: str) -> str | None:
+    for rx, template in GPU_PATTERNS:
+        m = rx.search(text)
+        if m:
+            groups = [_canon((g or "").replace("graphics", "")) for g in m.groups()]
+            return " ".join(template.format(*groups).split())
+    return None
+
+
+def _screen(text: str) -> float | None:
+    for m in SCREEN_RE.finditer(text):
+        size = float(m.group(1).replace(",", "."))
+        if 10 <= size <= 19:
+            return size
+    return None
+
+
+_cache: dict[str, dict] = {}
+
+
+def _key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def extract(text: str) -> dict:
+    """Extract typed spec fields from one string. Missing fields are None."""
+    if not text:
+        return dict.fromkeys(SPEC_FIELDS)
+    key = _key(text)
+    hit = _cache.get(key)
+    if hit is not None:
+        return dict(hit)
+
+    t = _clean(text)
+    cpu_family, cpu_model = _cpu(t)
+    ram_gb, ssd_gb = _ram_ssd(t)
+    result = {
+        "cpu_family": cpu_family,
+        "cpu_model": cpu_model,
+        "ram_gb": ram_gb,
+        "ssd_gb": ssd_gb,
+        "gpu": _gpu(t),
+        "screen_in": _screen(t),
+    }
+    _cache[key] = result
+    return dict(result)
+
+
+def extract_row(title: str, specs: str) -> dict:
+    """Merge fields from the specs text (preferred) and the title."""
+    from_specs = extract(specs)
+    from_title = extract(title)
+    out = {}
+    for f in SPEC_FIELDS:
+        out[f] = from_specs[f] if from_specs[f] is not None else from_title[f]
+    # A model from the title beats a bare family from the specs text
+    if from_specs["cpu_model"] is None and from_title["cpu_model"] is not None:
+        out["cpu_family"] = from_title["cpu_family"]
+        out["cpu_model"] = from_title["cpu_model"]
+    return out
+
+
+def load_cache(path: Path) -> None:
+    """Load a cache written by save_cache; ignored if missing or stale."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return
+    if saved.get("version") == EXTRACTOR_VERSION:
+        _cache.update(saved.get("entries", {}))
+
+
+def cache_size() -> int:
+    return len(_cache)
+
+
+def cache_entries(start: int = 0) -> dict[str, dict]:
+    """Cache entries from the start-th on, in the order they were added."""
+    return dict(itertools.islice(_cache.items(), start, None))
+
+
+def merge_cache(entries: dict[str, dict]) -> None:
+    """Add entries from another process's cache_entries()."""
+    _cache.update(entries)
+
+
+def save_cache(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"version": EXTRACTOR_VERSION, "entries": _cache}, f, separators=(",", ":"))
+
+
+if __name__ == "__main__":
+    with open(DATA_FILE, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+
+    filled = defaultdict(Counter)
+    totals = Counter()
+    for r in rows:
+        totals[r["source"]] += 1
+        for k, v in extract_row(r["title"], r["specs"]).items():
+            if v is not None:
+                filled[r["source"]][k] += 1
+
+    print(f"{'source':20s}" + "".join(f"{f:>12s}" for f in SPEC_FIELDS))
+    for src, n in totals.items():
+        print(f"{src:20s}" + "".join(f"{filled[src][f] / n * 100:11.0f}%" for f in SPEC_FIELDS))
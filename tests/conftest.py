@@ -0,0 +1,71 @@
+"""
+Shared fixtures: the scripts/ modules on sys.path, every on-disk cache and
+output redirected to a temp dir, and the offline fixture server from
+bench_pipeline.py with each adapter pointed at it.
+"""
+
+import copy
+import importlib
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import archive  # noqa: E402
+import bench_pipeline  # noqa: E402
+import detail_cache  # noqa: E402
+import engine  # noqa: E402
+import metrics  # noqa: E402
+from fixtures import SITES, render_pages  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def sandbox(tmp_path, monkeypatch):
+    """Caches, archive and metrics under tmp_path; no polite sleeps."""
+    cache = tmp_path / "cache"
+    monkeypatch.setattr(engine, "PAGE_SIZE_CACHE", cache / "page_sizes.json")
+    monkeypatch.setattr(engine, "THROTTLE_CACHE", cache / "throttle.json")
+    monkeypatch.setattr(engine, "SESSION_CACHE", cache / "sessions.json")
+    monkeypatch.setattr(engine, "HEALTH_CACHE", cache / "health.json")
+    monkeypatch.setattr(engine, "PARSE_CACHE", cache / "parse")
+    monkeypatch.setattr(detail_cache, "DETAIL_CACHE", cache / "details.jsonl")
+    monkeypatch.setattr(archive, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(metrics, "METRICS_DIR", tmp_path / "metrics")
+    monkeypatch.setattr(metrics, "skip_sleeps", True)
+    monkeypatch.setattr(engine, "_throttles", {})       # each test loads its own throttle.json
+    metrics.reset()
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def _server():
+    pages = {site: render_pages(site, 1) for site in SITES}
+    server = bench_pipeline.FixtureServer(copy.deepcopy(pages), 0.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for site in SITES:
+        bench_pipeline.point_at(importlib.import_module(site), f"{server.base}/{site}")
+    yield server, pages
+    server.shutdown()
+
+
+@pytest.fixture
+def server(_server, sandbox):
+    """The fixture server, its pages restored after the test; site outputs go to the sandbox."""
+    server, pages = _server
+    outputs = {}
+    for site in SITES:
+        adapter = importlib.import_module(site).SITE
+        outputs[site] = adapter.output
+        adapter.output = sandbox / f"{site}.csv"
+    yield server
+    server.pages.clear()
+    server.pages.update(copy.deepcopy(pages))
+    for site, output in outputs.items():
+        importlib.import_module(site).SITE.output = output
+
+
+def site(name: str) -> engine.Site:
+    return importlib.import_module(name).SITE
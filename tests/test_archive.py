@@ -0,0 +1,47 @@
+import contextlib
+import io
+import json
+
+import pytest
+
+import archive
+import engine
+import metrics
+from conftest import site
+
+BODY = "<div class='product-item'>Lenovo IdeaPad ₼</div>".encode() * 10
+
+
+@pytest.mark.parametrize("zstd", [True, False])
+def test_a_body_is_stored_once_under_its_hash(tmp_path, monkeypatch, zstd):
+    if not zstd:
+        monkeypatch.setattr(archive, "zstandard", None)
+    elif archive.zstandard is None:
+        pytest.skip("zstandard not installed")
+    sha, new = archive.put(BODY, tmp_path)
+    assert new and archive.put(BODY, tmp_path) == (sha, False)
+    assert archive.get(sha, tmp_path) == BODY
+    assert len(list((tmp_path / "objects").glob("*/*"))) == 1
+
+
+def test_pages_fall_back_to_fetch_order_without_seq(tmp_path):
+    index = tmp_path / "old.jsonl"
+    listing = [{"kind": "page", "sha256": str(n)} for n in range(3)]
+    index.write_text("\n".join(json.dumps(e) for e in [listing[0], {"kind": "session"}, *listing[1:]]))
+    assert archive.pages(index) == list(enumerate(listing))
+
+
+def test_an_unchanged_listing_adds_only_an_index(server):
+    kontakt = site("kontakt")
+    with contextlib.redirect_stdout(io.StringIO()):
+        products = engine.scrape(kontakt)
+        pages = metrics.summary("kontakt")["pages"]
+        metrics.reset()
+        assert engine.scrape(kontakt) == products
+    assert "archive_objects_written" not in metrics.summary("kontakt")["counters"]
+
+    stats = archive.stats()
+    assert (stats["runs"], stats["responses"], stats["objects"]) == (2, 2 * pages, pages)
+    assert stats["unique_body_bytes"] * 2 == stats["body_bytes"]
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert all(archive.reparse(kontakt, index) == products for index in archive.runs("kontakt"))
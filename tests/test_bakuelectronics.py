@@ -0,0 +1,51 @@
+import contextlib
+import io
+
+import bakuelectronics
+import engine
+import metrics
+
+
+def test_data_route_used_when_page_1_comes_from_the_parse_cache(server, monkeypatch):
+    urls = []
+    page_url = bakuelectronics.SITE.page_url
+    monkeypatch.setattr(bakuelectronics.SITE, "page_url", lambda page: urls.append(page_url(page)) or urls[-1])
+
+    runs = []
+    for _ in range(2):
+        # a fresh process: no build ID until page 1 is read
+        monkeypatch.setattr(bakuelectronics, "build_id", None)
+        monkeypatch.setattr(bakuelectronics, "use_data_route", True)
+        urls.clear()
+        metrics.reset()
+        with contextlib.redirect_stdout(io.StringIO()):
+            products = engine.scrape(bakuelectronics.SITE)
+        runs.append((products, [u for u in urls if "/_next/data/" not in u],
+                     metrics.summary("bakuelectronics")["counters"].get("parse_cache_hits", 0)))
+
+    (first, html_first, _), (second, html_second, hits_second) = runs
+    assert hits_second > 0                  # page 1 did come from the cache
+    for html in (html_first, html_second):
+        assert html and all("?page=1&" in url for url in html)     # page 1 only, incl. size probes
+    assert second == first
+
+
+def test_a_rejected_page_size_keeps_the_data_route(server, monkeypatch):
+    urls = []
+    page_url = bakuelectronics.SITE.page_url
+
+    def refuse_100(page):
+        url = page_url(page)
+        urls.append(url)
+        return url.replace("/bakuelectronics/", "/nowhere/") if url.endswith("size=100") else url
+
+    monkeypatch.setattr(bakuelectronics.SITE, "page_url", refuse_100)
+    monkeypatch.setattr(bakuelectronics, "build_id", None)
+    monkeypatch.setattr(bakuelectronics, "use_data_route", True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.scrape(bakuelectronics.SITE)
+
+    assert metrics.summary("bakuelectronics")["counters"]["page_size_rejected"] == 1
+    assert bakuelectronics.use_data_route
+    later = [url for url in urls if "page=1&" not in url]
+    assert later and all("/_next/data/" in url for url in later)
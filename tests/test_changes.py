@@ -0,0 +1,70 @@
+import contextlib
+import csv
+import io
+import json
+
+import changes
+
+HEADER = ["source", "product_id", "title", "url", "price_azn", "discount_azn", "discount_percent", "brand"]
+
+
+def snapshot(path, *rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return path
+
+
+def feed(path) -> dict[str, dict]:
+    with open(path, encoding="utf-8") as f:
+        return {event["product_id"]: event for event in map(json.loads, f)}
+
+
+def test_diff_writes_one_event_per_change(tmp_path):
+    old = snapshot(tmp_path / "old.csv",
+                   ["kontakt.az", "1", "Lenovo", "u1", "1000.0", "", "", "Lenovo"],
+                   ["kontakt.az", "2", "Asus", "u2", "800.0", "", "", "Asus"],
+                   ["kontakt.az", "3", "Acer", "u3", "700.0", "100.0", "12.5", "Acer"],
+                   ["kontakt.az", "4", "HP", "u4", "", "", "", "HP"],
+                   ["kontakt.az", "5", "Dell", "u5", "900.0", "", "", "Dell"],
+                   ["soliton.az", "", "MSI", "u6", "1200.0", "", "", "MSI"],
+                   ["kontakt.az", "7", "Apple", "u7", "2000.0", "", "", "Apple"])
+    new = snapshot(tmp_path / "new.csv",
+                   ["kontakt.az", "1", "Lenovo", "u1", "950.0", "", "", "Lenovo"],
+                   ["kontakt.az", "2", "Asus", "u2", "850.0", "", "", "Asus"],
+                   ["kontakt.az", "3", "Acer", "u3", "700.0", "150.0", "17.6", "Acer"],
+                   ["kontakt.az", "4", "HP", "u4", "999.0", "", "", "HP"],
+                   ["soliton.az", "", "MSI", "u6", "1200.0", "", "", "Other brand"],
+                   ["kontakt.az", "7", "Apple", "u7", "2000.0", "", "", "Apple"],
+                   ["kontakt.az", "7", "Apple", "u7", "1.0", "", "", "Apple"],
+                   ["kontakt.az", "8", "Huawei", "u8", "600.0", "", "", "Huawei"])
+    counts = changes.diff(old, new, tmp_path / "feed.jsonl")
+
+    events = feed(tmp_path / "feed.jsonl")
+    assert {pid: event["type"] for pid, event in events.items()} == {
+        "1": "price_drop", "2": "price_rise", "3": "discount_change", "4": "price_change",
+        "5": "delisted", "8": "new"}
+    assert sum(counts.values()) == len(events)
+    assert events["1"]["old_price_azn"] == 1000.0 and events["1"]["new_price_azn"] == 950.0
+    assert events["5"]["new_price_azn"] is None and events["8"]["old_discount_azn"] is None
+
+
+def test_no_changes_writes_no_feed(tmp_path):
+    old = snapshot(tmp_path / "old.csv", ["kontakt.az", "1", "Lenovo", "u1", "1000.0", "", "", "Lenovo"])
+    assert not changes.diff(old, old, tmp_path / "feed.jsonl")
+    assert not (tmp_path / "feed.jsonl").exists()
+
+
+def test_update_diffs_against_the_last_snapshot(tmp_path):
+    data = tmp_path / "data.csv"
+    root = tmp_path / "changes"
+    with contextlib.redirect_stdout(io.StringIO()):
+        snapshot(data, ["kontakt.az", "1", "Lenovo", "u1", "1000.0", "", "", "Lenovo"])
+        assert changes.update(data, root) is None               # the baseline
+        assert changes.update(data, root) is None               # nothing changed
+        snapshot(data, ["kontakt.az", "1", "Lenovo", "u1", "900.0", "", "", "Lenovo"])
+        path = changes.update(data, root)
+    assert [event["type"] for event in feed(path).values()] == ["price_drop"]
+    assert (root / "snapshot.csv").read_text() == data.read_text()
+    assert sorted(p.name for p in root.iterdir()) == sorted([path.name, "snapshot.csv"])
@@ -0,0 +1,82 @@
+import contextlib
+import io
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import combine
+import generate_charts
+
+SCRIPTS = Path(__file__).parent.parent / "scripts"
+DATA = Path(__file__).parent.parent / "data"
+
+
+def test_combine_and_charts_do_not_import_the_scraper():
+    probe = "import sys, combine, changes, generate_charts; print(sorted({'engine', 'bs4'} & set(sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=SCRIPTS, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+OLD_HEADER = ("source,product_id,title,url,price_azn,old_price_azn,discount_azn,discount_percent,brand,specs,"
+              "availability,label,monthly_payment_azn,rating,review_count\n")
+
+
+def test_load_reads_a_data_csv_from_before_typed_columns(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(OLD_HEADER
+                    + "kontakt.az,1,Lenovo IdeaPad Slim 3 15IRU8 (82X700D6RK),u1,1299.99,1499.99,200,-13 %,,,,,,4.5,12\n"
+                    + "soliton.az,2,LENOVO IPS3 15IRU8 i3-1315U/8/256,u2,0.0,,,11%,,,,,,,\n", encoding="utf-8")
+    rows, priced = generate_charts.load(path)
+    assert [r["price_azn"] for r in rows] == [1299.99, None]
+    assert [r["discount_percent"] for r in rows] == [13.0, 11.0]
+    assert rows[0]["review_count"] == 12 and rows[0]["ram_gb"] is None and rows[0]["screen_in"] is None
+    assert "price_azn=0.0: not positive" in rows[1]["rejected"]
+    assert rows[0]["product_key"] and len(priced) == 1
+
+
+def unified(**values) -> dict:
+    row = dict.fromkeys(combine.UNIFIED_FIELDS, "")
+    row.update(values)
+    return row
+
+
+@pytest.mark.parametrize("values, typed, rejected", [
+    ({"price_azn": "1299.99", "old_price_azn": "1499.99", "discount_percent": "-13 %", "review_count": "12.0"},
+     {"price_azn": 1299.99, "old_price_azn": 1499.99, "discount_percent": 13.0, "review_count": 12}, []),
+    ({"price_azn": "0.0", "discount_percent": "11%"}, {"price_azn": None, "discount_percent": 11.0}, ["price_azn"]),
+    ({"price_azn": "900", "old_price_azn": "800"}, {"price_azn": 900.0, "old_price_azn": None}, ["old_price_azn"]),
+    ({"price_azn": "n/a", "discount_percent": "120%"}, {"price_azn": None, "discount_percent": None},
+     ["price_azn", "discount_percent"]),
+    ({"rating": "0", "review_count": "0"}, {"rating": None, "review_count": 0}, []),
+    ({"rating": "4.5", "review_count": "1.5"}, {"rating": 4.5, "review_count": None}, ["review_count"]),
+    ({"rating": "nan"}, {"rating": None}, ["rating"]),
+])
+def test_validate_types_the_numeric_columns(values, typed, rejected):
+    row = unified(**values)
+    reasons = combine.validate(row)
+    assert {field: row[field] for field in typed} == typed
+    assert [reason.split("=", 1)[0] for reason in reasons] == rejected
+
+
+def test_load_reads_back_the_columns_combine_wrote(tmp_path):
+    for name in ("kontakt", "soliton"):
+        shutil.copy(DATA / f"{name}.csv", tmp_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        combine.main(tmp_path, tmp_path / "data.csv")
+    rows = combine.load(tmp_path / "data.csv")
+    assert rows and all(row["rejected"] or isinstance(row["price_azn"], float) for row in rows)
+    assert any(isinstance(row["ram_gb"], int) for row in rows)
+    assert {type(row[f]) for row in rows for f in combine.FLOAT_FIELDS} <= {float, type(None)}
+    assert {type(row[f]) for row in rows for f in combine.INT_FIELDS} <= {int, type(None)}
+
+
+def test_workers_write_the_same_data_csv(tmp_path):
+    for name in ("kontakt", "soliton", "irshad", "mgstore"):
+        shutil.copy(DATA / f"{name}.csv", tmp_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        combine.main(tmp_path, tmp_path / "one.csv", workers=1)
+        combine.main(tmp_path, tmp_path / "pool.csv", workers=3)
+    assert (tmp_path / "pool.csv").read_bytes() == (tmp_path / "one.csv").read_bytes()
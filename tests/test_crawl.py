@@ -0,0 +1,44 @@
+import contextlib
+import io
+import json
+import threading
+
+import bench_pipeline
+import crawl
+import engine
+from conftest import site
+
+FAST = ["kontakt", "mgstore", "soliton", "aztechshop", "irshad", "bakuelectronics"]
+
+
+def test_one_queue_returns_what_each_site_scrapes_alone(server):
+    with contextlib.redirect_stdout(io.StringIO()):
+        alone = {name: engine.scrape(site(name)) for name in FAST}
+        together = crawl.Crawl([site(name) for name in FAST]).run()
+    assert together == alone
+
+
+def test_a_host_never_has_more_requests_in_flight_than_its_cap(server, monkeypatch):
+    kontakt = site("kontakt")
+    monkeypatch.setattr(kontakt, "concurrency", 2)
+    engine.THROTTLE_CACHE.parent.mkdir(parents=True)
+    engine.THROTTLE_CACHE.write_text(json.dumps({engine.host_of(kontakt): {"limit": 2}}))
+    monkeypatch.setattr(server, "latency", 0.05)
+
+    lock, in_flight, peak = threading.Lock(), [0], [0]
+    respond = bench_pipeline.FixtureHandler._respond
+
+    def counted(handler):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        try:
+            respond(handler)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+    monkeypatch.setattr(bench_pipeline.FixtureHandler, "do_GET", counted)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        crawl.Crawl([kontakt], workers=8).run()
+    assert peak[0] == 2
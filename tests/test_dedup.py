@@ -0,0 +1,70 @@
+import contextlib
+import copy
+import io
+
+import archive
+import crawl
+import engine
+import metrics
+from conftest import site
+
+
+def scrape(name: str) -> list[dict]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return engine.scrape(site(name))
+
+
+def test_a_shifted_listing_counts_duplicates_not_skips(server):
+    products = scrape("birmarket")
+    counters = metrics.summary("birmarket")["counters"]
+    assert counters["duplicates_dropped"] > 0
+    assert counters.get("likely_skips", 0) == 0
+    assert len({p["product_id"] for p in products}) == len(products)
+
+
+def test_a_short_page_counts_as_skips():
+    dedup = engine.Dedup(site("birmarket"))
+    for seq, n in enumerate([60, 60, 50, 60, 20]):
+        dedup.add(seq, [{"product_id": f"{seq}-{i}"} for i in range(n)])
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert dedup.report(250) == 10
+
+
+def test_reparse_drops_duplicates_like_the_scrape(server):
+    birmarket = site("birmarket")
+    products = scrape("birmarket")
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert archive.reparse(birmarket, archive.runs("birmarket")[-1]) == products
+
+
+def test_reparse_replays_a_parallel_crawl_in_page_order(server, monkeypatch):
+    notecomp = site("notecomp")
+    monkeypatch.setattr(notecomp, "delay", 0.01)
+    with contextlib.redirect_stdout(io.StringIO()):
+        products = crawl.Crawl([notecomp], workers=8).run()["notecomp"]
+        assert archive.reparse(notecomp, archive.runs("notecomp")[-1]) == products
+
+
+def test_spilling_to_bloom_and_sqlite_keeps_the_same_rows(server, monkeypatch):
+    birmarket = site("birmarket")
+    monkeypatch.setattr(birmarket, "delay", 0.01)
+    in_memory = scrape("birmarket")
+    monkeypatch.setattr(engine, "DEDUP_SPILL", 10)
+    metrics.reset()
+    spilled = scrape("birmarket")
+    counters = metrics.summary("birmarket")["counters"]
+    assert counters["dedup_spills"] == 1 and counters["duplicates_dropped"] > 0
+    assert spilled == in_memory
+    with contextlib.redirect_stdout(io.StringIO()):
+        products = crawl.Crawl([birmarket], workers=8).run()["birmarket"]
+    assert products == in_memory
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = engine.Bloom(1000)
+    fps = [engine._fingerprint(str(n)) for n in range(1000)]
+    for fp in fps:
+        bloom.add(fp)
+    assert all(copy.deepcopy(bloom).add(fp) for fp in fps)
+    false_positives = sum(copy.deepcopy(bloom).add(engine._fingerprint(f"x{n}")) for n in range(2000))
+    assert false_positives < 20         # 0.1% target, generous margin
@@ -0,0 +1,35 @@
+import contextlib
+import io
+
+import engine
+import enrich
+from conftest import site
+from detail_cache import DetailCache
+
+
+def rows(server, *paths: str) -> list[dict]:
+    return [{"source": "notecomp.az", "url": f"{server.base}{path}", "product_key": "k1", "specs": ""}
+            for path in paths]
+
+
+def test_a_failed_page_backs_off_and_the_next_run_tries_another(server, sandbox):
+    cache = DetailCache(sandbox / "details.jsonl")
+    listings = rows(server, "/nowhere/1", "/notecomp/2")
+    groups, _ = enrich.select(listings, cache, ["notecomp"])
+    assert groups["k1"][0][1].endswith("/nowhere/1")
+
+    crawl = enrich.DetailCrawl([site("notecomp")], cache, workers=2)
+    with contextlib.redirect_stdout(io.StringIO()):
+        crawl.fetch([("notecomp", listings[0]["url"], "k1")])
+    entry = cache.entries[listings[0]["url"]]
+    assert entry["failures"] == 1 and entry["error"].startswith("HTTPError") and entry["retry_at"] > enrich._now()
+
+    groups, _ = enrich.select(listings, DetailCache(sandbox / "details.jsonl"), ["notecomp"])
+    assert [url for _, url in groups["k1"]] == [listings[1]["url"]]
+
+
+def test_a_detail_run_keeps_no_listing_state(server):
+    site_run = engine.SiteRun(site("notecomp"), kind="detail")
+    assert site_run.cache is None and site_run.health is None and site_run.dedup is None
+    site_run.close()
+    assert not engine.PARSE_CACHE.exists()
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import threading
+
+import archive
+import engine
+import jobs
+from conftest import site
+
+
+def test_a_failing_job_is_tried_max_attempts_times(sandbox, monkeypatch):
+    tries = []
+
+    def first(self):
+        tries.append(self.site.name)
+        raise OSError("connection reset")
+
+    monkeypatch.setattr(engine.SiteRun, "first", first)
+    monkeypatch.setattr(jobs, "POLL_S", 0.01)
+    db = jobs.connect(sandbox / "jobs.sqlite")
+    run = jobs.enqueue(db, [site("notecomp")])
+    db.execute("UPDATE hosts SET interval = 0")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        jobs.Worker(sandbox / "jobs.sqlite").work(until_idle=True)
+
+    assert len(tries) == jobs.MAX_ATTEMPTS
+    job = db.execute("SELECT state, attempts FROM jobs WHERE run = ?", (run,)).fetchone()
+    assert (job["state"], job["attempts"]) == ("failed", jobs.MAX_ATTEMPTS)
+
+
+def test_workers_of_one_run_share_an_archive_index(server, sandbox, monkeypatch):
+    monkeypatch.setattr(jobs, "POLL_S", 0.01)
+    monkeypatch.setattr(site("notecomp"), "delay", 0.01)
+    db = jobs.connect(sandbox / "jobs.sqlite")
+    run = jobs.enqueue(db, [site("notecomp")])
+    workers = [jobs.Worker(sandbox / "jobs.sqlite", f"w{n}") for n in range(3)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        threads = [threading.Thread(target=w.work, args=(True,)) for w in workers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        products = jobs.collect(db, run)["notecomp"]
+        [index] = archive.runs("notecomp")
+        assert index.stem == run
+        assert archive.reparse(site("notecomp"), index) == products
+    assert len({row["worker"] for row in db.execute("SELECT worker FROM jobs")}) > 1
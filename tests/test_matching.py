@@ -0,0 +1,28 @@
+import matching
+
+NITRO = [
+    "Notbuk Acer Nitro NL16-71G (NH.DAAER.001)",
+    "Acer Nitro Lite NL16 71G-560W (NH.DAAER.001)",
+    'Notbuk Acer Nitro Lite NL16-71G /16"IPS 165HZ/ I5-13420H/16 GB/512GB SSD/ RTX 3050/DOS (NH.DAAER.001)',
+]
+IDEAPAD = [
+    "LENOVO IPS3 15IRU8 i3-1315U/8/256",
+    "Lenovo IdeaPad Slim 3 15IRU8 i3-1315U 8GB 256GB",
+]
+
+
+def test_key_survives_listings_joining_and_leaving():
+    keys = matching.match_products(NITRO + IDEAPAD)
+    assert len(set(keys[:3])) == 1 and len(set(keys[3:])) == 1 and keys[0] != keys[3]
+    assert matching.match_products(NITRO[:1] + IDEAPAD)[0] == keys[0]
+    assert matching.match_products(NITRO[2:] + IDEAPAD[::-1])[0] == keys[0]
+    assert matching.match_products(IDEAPAD[::-1] + NITRO[1:])[1] == keys[3]
+
+
+def test_block_size_does_not_grow_with_the_catalog():
+    # more listings of one model code than MAX_BLOCK are never paired on it,
+    # however many other listings there are
+    codes = [f"Asus Vivobook 15 X1504VA-NJ{100 + n}" for n in range(matching.MAX_BLOCK + 1)]
+    others = [f"Dell Latitude {n} L{n}X" for n in range(8000)]
+    keys = matching.match_products(codes + others)
+    assert len(set(keys[:len(codes)])) == len(codes)
@@ -0,0 +1,24 @@
+import contextlib
+import io
+import json
+
+import metrics
+
+
+def export(site: str, *args) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return metrics.export(site, *args)
+
+
+def test_export_writes_to_the_given_dir(tmp_path):
+    metrics.incr("test", "parse_fallbacks")
+    export("test", tmp_path / "out")
+    [line] = (tmp_path / "out" / "runs.jsonl").read_text().splitlines()
+    assert json.loads(line)["counters"] == {"parse_fallbacks": 1}
+    assert 'site="test"' in (tmp_path / "out" / "test.prom").read_text()
+
+
+def test_export_defaults_to_metrics_dir_at_call_time(sandbox):
+    export("test")
+    assert (sandbox / "metrics" / "runs.jsonl").exists()
+    assert (sandbox / "metrics" / "test.prom").exists()
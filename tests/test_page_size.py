@@ -0,0 +1,59 @@
+import json
+import urllib.error
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import engine
+import metrics
+from conftest import site
+
+TOTAL = 100     # products in the listing
+
+
+@pytest.fixture
+def soliton(monkeypatch):
+    soliton = site("soliton")
+    monkeypatch.setattr(soliton.page_size, "value", soliton.page_size.value)
+    return soliton
+
+
+def negotiate(soliton, serve) -> list[int]:
+    """Negotiate against serve(size) -> products served; returns the sizes tried."""
+    tried = []
+
+    def load():
+        tried.append(soliton.page_size.value)
+        served = serve(soliton.page_size.value)
+        if served is None:
+            raise urllib.error.HTTPError("", 400, "bad limit", None, None)
+        return [{}] * served, (True, TOTAL)
+    engine.negotiate_page_size(soliton, load)
+    return tried
+
+
+def cached(name: str) -> int:
+    return json.loads(engine.PAGE_SIZE_CACHE.read_text())[name]["size"]
+
+
+def test_the_largest_honoured_size_is_cached_for_the_next_run(soliton):
+    assert negotiate(soliton, lambda size: None if size > 60 else size) == [120, 60]
+    assert cached("soliton") == soliton.page_size.value == 60
+    assert negotiate(soliton, lambda size: size) == [60]
+    assert metrics.summary("soliton")["counters"] == {"page_size_rejected": 1}
+
+
+def test_an_empty_page_is_a_rejection_and_a_short_one_a_truncation(soliton):
+    assert negotiate(soliton, lambda size: 0 if size == 120 else min(size, 40)) == [120, 60]
+    assert cached("soliton") == 40
+    assert metrics.summary("soliton")["counters"] == {"page_size_rejected": 1, "page_size_truncated": 1}
+
+
+def test_a_stale_size_is_probed_again_from_the_top(soliton):
+    negotiate(soliton, lambda size: min(size, 30))
+    sizes = json.loads(engine.PAGE_SIZE_CACHE.read_text())
+    probed = datetime.now(timezone.utc) - engine.PAGE_SIZE_TTL - timedelta(minutes=1)
+    sizes["soliton"]["probed_at"] = probed.isoformat(timespec="seconds")
+    engine.PAGE_SIZE_CACHE.write_text(json.dumps(sizes))
+    assert negotiate(soliton, lambda size: size) == [120]
+    assert cached("soliton") == 120
@@ -0,0 +1,56 @@
+import importlib
+import json
+
+import pytest
+
+import engine
+import metrics
+from fixtures import render_pages
+
+# site -> an element inside the first card whose text the scan reads
+SCANNED = {"kontakt": "<b>", "mgstore": "<b>", "soliton": '<span class="percent">'}
+
+
+def listing(name: str) -> str:
+    """Card markup of the site's first fixture page (soliton wraps it in JSON)."""
+    page = render_pages(name)[0]
+    return json.loads(page)["html"] if name == "soliton" else page
+
+
+def dom_only(adapter, monkeypatch):
+    def refuse(raw):
+        raise engine.ScanError("forced")
+    monkeypatch.setattr(adapter, "scan_card", refuse)
+
+
+@pytest.mark.parametrize("name", SCANNED)
+def test_attribute_scan_matches_the_dom_parse(name, monkeypatch):
+    adapter = importlib.import_module(name)
+    page = listing(name)
+    fast = adapter.parse_products(page)
+    assert fast and metrics.summary(name)["counters"] == {}
+
+    dom_only(adapter, monkeypatch)
+    assert adapter.parse_products(page) == fast
+    assert metrics.summary(name)["counters"] == {"parse_fallbacks": len(fast)}
+
+
+@pytest.mark.parametrize("name, read", SCANNED.items())
+def test_a_card_the_scan_cannot_read_falls_back_to_the_dom(name, read):
+    adapter = importlib.import_module(name)
+    page = listing(name)
+    expected = adapter.parse_products(page)
+    page = page.replace(read, read + "<!-- promo -->", 1)
+    assert adapter.parse_products(page) == expected
+    assert metrics.summary(name)["counters"] == {"parse_fallbacks": 1}
+
+
+def test_scan_helpers_mirror_get_text():
+    markup = '<div class="card" data-id="7"><a class="t x" href="/p?a=1&amp;b=2"> Lenovo <b>IdeaPad</b> </a><img src=i.png/></div>'
+    card = engine.element(markup)
+    link = engine.select_one(markup, "a.t", card)
+    assert card.attrs["data-id"] == "7" and link.attrs["href"] == "/p?a=1&b=2"
+    assert engine.text(markup, link, " ") == "Lenovo IdeaPad"
+    assert engine.select_one(markup, "a.missing", card) is None
+    with pytest.raises(engine.ScanError):
+        engine.element('<div class="card"><span>open')
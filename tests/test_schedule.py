@@ -0,0 +1,23 @@
+import csv
+
+import schedule
+
+
+def write_listing(path, n: int) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["product_id", "title", "price_azn"])
+        writer.writerows([str(i), f"Laptop {i}", "999"] for i in range(n))
+
+
+def test_a_site_without_history_is_planned_on_its_listing_count(sandbox):
+    write_listing(sandbox / "fresh.csv", 500)
+    write_listing(sandbox / "tiny.csv", 1)
+    state = {}
+    for site in ("fresh", "tiny"):
+        assert schedule.observe(site, state, sandbox / "schedule", sandbox)
+        state[site]["cost"] = 10
+    rows = {r["site"]: r for r in schedule.plan(state, ["fresh", "tiny"], budget=200)}
+    assert rows["fresh"]["listings"] == 500 and state["fresh"]["history"] == []
+    # interval ∝ sqrt(cost / (listings · rate)): more listings, more frequent refreshes
+    assert rows["fresh"]["interval_h"] < rows["tiny"]["interval_h"]
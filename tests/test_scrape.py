@@ -0,0 +1,164 @@
+import contextlib
+import gzip
+import io
+import json
+import sys
+import zlib
+
+import pytest
+
+import bench_pipeline
+import crawl
+import engine
+import metrics
+from conftest import site
+
+
+def drift(server, name="notecomp"):
+    pages = server.pages[name]
+    pages[1:] = [page.replace('class="product-thumb', 'class="x-thumb') for page in pages[1:]]
+
+
+def exported(name: str) -> list[dict]:
+    with open(metrics.METRICS_DIR / "runs.jsonl", encoding="utf-8") as f:
+        return [run for run in map(json.loads, f) if run["site"] == name]
+
+
+def scrape_quietly(adapter: engine.Site) -> list[dict]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return engine.scrape(adapter)
+
+
+def test_a_drift_stop_still_saves_the_caches(server):
+    notecomp = site("notecomp")
+    drift(server)
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(engine.ParserDrift):
+        engine.scrape(notecomp)
+
+    with gzip.open(engine.PARSE_CACHE / "notecomp.json.gz", "rt", encoding="utf-8") as f:
+        assert json.load(f)["pages"]            # page 1 parsed before the drift
+    throttles = json.loads(engine.THROTTLE_CACHE.read_text())
+    assert throttles[engine.host_of(notecomp)]["baseline_s"]["page"] > 0
+
+
+def test_a_failed_run_still_exports_its_metrics(server):
+    drift(server)
+    with contextlib.redirect_stdout(io.StringIO()), pytest.raises(engine.ParserDrift):
+        engine.run(site("notecomp"))
+    [run] = exported("notecomp")
+    assert run["error"].startswith("ParserDrift") and run["counters"]["health_failures"] == 1
+    assert (metrics.METRICS_DIR / "notecomp.prom").exists()
+
+
+def test_crawl_exports_the_sites_that_failed(server, monkeypatch):
+    drift(server)
+    monkeypatch.setattr(sys, "argv", ["crawl.py", "notecomp", "ctrl"])
+    with contextlib.redirect_stdout(io.StringIO()):
+        crawl.main()
+    assert "error" in exported("notecomp")[0] and "error" not in exported("ctrl")[0]
+
+
+PAGE = "<div class='product-item'>Lenovo IdeaPad ₼</div>".encode() * 20
+
+
+@pytest.mark.parametrize("body, encoding", [
+    (gzip.compress(PAGE), "gzip"),
+    (zlib.compress(PAGE), "deflate"),
+    (zlib.compress(PAGE)[2:-4], "deflate"),         # raw deflate, no zlib header
+    (zlib.compress(gzip.compress(PAGE)), "gzip, deflate"),
+    (PAGE, ""),
+    (PAGE, "identity"),
+])
+def test_decompress_undoes_each_content_encoding(body, encoding):
+    assert engine.decompress(body, encoding) == PAGE
+
+
+def test_decompress_rejects_an_unknown_coding():
+    with pytest.raises(ValueError):
+        engine.decompress(PAGE, "compress")
+
+
+def test_gzip_responses_parse_the_same_and_count_both_sizes(server, monkeypatch):
+    kontakt = site("kontakt")
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = engine.scrape(kontakt)
+    gzipped = metrics.summary("kontakt")
+
+    metrics.reset()
+    monkeypatch.setattr(server, "compress", False)
+    engine.PARSE_CACHE.joinpath("kontakt.json.gz").unlink()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert engine.scrape(kontakt) == rows
+    plain = metrics.summary("kontakt")
+
+    assert rows and gzipped["decoded_bytes"] == plain["decoded_bytes"] == plain["bytes"]
+    assert gzipped["bytes"] < gzipped["decoded_bytes"] / 3
+
+
+def test_a_saved_session_is_reused_by_the_next_run(server):
+    irshad = site("irshad")
+    before = server.requests["irshad"]
+    rows = scrape_quietly(irshad)
+    first = server.requests["irshad"] - before
+    saved = json.loads(engine.SESSION_CACHE.read_text())["irshad"]
+    assert saved["headers"] == {"X-CSRF-TOKEN": "fixture-csrf-token"}
+    assert metrics.summary("irshad")["counters"]["session_bootstraps"] == 1
+
+    metrics.reset()
+    assert scrape_quietly(irshad) == rows
+    assert server.requests["irshad"] - before - first == first - 1      # no landing page this time
+    assert "session_bootstraps" not in metrics.summary("irshad")["counters"]
+
+
+def test_a_rejected_session_is_bootstrapped_again(server, monkeypatch):
+    irshad = site("irshad")
+    rows = scrape_quietly(irshad)
+    sessions = json.loads(engine.SESSION_CACHE.read_text())
+    sessions["irshad"]["headers"] = {"X-CSRF-TOKEN": "stale"}
+    engine.SESSION_CACHE.write_text(json.dumps(sessions))
+
+    respond = bench_pipeline.FixtureHandler._respond
+
+    def csrf_check(handler):
+        if handler.headers.get("X-CSRF-TOKEN") == "stale":
+            handler.send_error(419)
+        else:
+            respond(handler)
+    monkeypatch.setattr(bench_pipeline.FixtureHandler, "do_GET", csrf_check)
+    monkeypatch.setattr(bench_pipeline.FixtureHandler, "do_POST", csrf_check)
+
+    metrics.reset()
+    assert scrape_quietly(irshad) == rows
+    assert metrics.summary("irshad")["counters"]["session_bootstraps"] == 1
+    assert json.loads(engine.SESSION_CACHE.read_text())["irshad"]["headers"] == {"X-CSRF-TOKEN": "fixture-csrf-token"}
+
+
+def test_an_expired_session_is_not_reused(server, monkeypatch):
+    irshad = site("irshad")
+    scrape_quietly(irshad)
+    monkeypatch.setattr(irshad, "session_ttl", 0)
+    metrics.reset()
+    scrape_quietly(irshad)
+    assert metrics.summary("irshad")["counters"]["session_bootstraps"] == 1
+
+
+def test_unchanged_pages_come_from_the_parse_cache(server):
+    kontakt = site("kontakt")
+    rows = scrape_quietly(kontakt)
+    pages = metrics.summary("kontakt")["pages"]
+
+    metrics.reset()
+    server.pages["kontakt"][0] = server.pages["kontakt"][0].replace("</body>", "<p>new banner</p></body>")
+    assert scrape_quietly(kontakt) == rows
+    assert metrics.summary("kontakt")["counters"]["parse_cache_hits"] == pages - 1
+    with gzip.open(engine.PARSE_CACHE / "kontakt.json.gz", "rt", encoding="utf-8") as f:
+        assert len(json.load(f)["pages"]) == pages      # the old page 1 is gone
+
+
+def test_a_new_parser_version_ignores_the_parse_cache(server, monkeypatch):
+    kontakt = site("kontakt")
+    rows = scrape_quietly(kontakt)
+    monkeypatch.setattr(engine, "parser_version", lambda module: "edited-parser")
+    metrics.reset()
+    assert scrape_quietly(kontakt) == rows
+    assert "parse_cache_hits" not in metrics.summary("kontakt")["counters"]
@@ -0,0 +1,44 @@
+import pytest
+
+import specs
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(specs, "_cache", {})
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("LENOVO IPS3 15IRU8 i3-1315U/8/256",
+     {"cpu_family": "Core i3", "cpu_model": "Core i3-1315U", "ram_gb": 8, "ssd_gb": 256}),
+    ('Notbuk Asus Vivobook 15 X1504VA i5-1335U 16GB 512GB SSD 15.6" FHD',
+     {"cpu_model": "Core i5-1335U", "ram_gb": 16, "ssd_gb": 512, "screen_in": 15.6}),
+    ("RAM 32GB DDR5/SSD 1TB, RTX 4060 8GB",
+     {"cpu_family": None, "ram_gb": 32, "ssd_gb": 1024, "gpu": "RTX 4060"}),
+    ("15.6 inç ekran ölçüsü, Intel Core i7 prosessor seriyası",
+     {"cpu_family": "Core i7", "cpu_model": None, "ram_gb": None, "screen_in": 15.6}),
+])
+def test_extract_types_the_spec_columns(text, expected):
+    result = specs.extract(text)
+    assert set(result) == set(specs.SPEC_FIELDS)
+    assert {field: result[field] for field in expected} == expected
+
+
+def test_specs_text_wins_but_a_title_cpu_model_beats_a_bare_family():
+    row = specs.extract_row("Asus Vivobook 15 i5-1335U 8GB 256GB", "Intel Core i5 prosessor, RAM 16GB")
+    assert row["cpu_model"] == "Core i5-1335U" and row["ram_gb"] == 16 and row["ssd_gb"] == 256
+
+
+def test_results_are_cached_by_input_and_version(tmp_path, monkeypatch):
+    specs.extract("i3-1315U/8/256")
+    specs.extract("i3-1315U/8/256")
+    assert specs.cache_size() == 1
+    specs.save_cache(tmp_path / "specs.json")
+
+    monkeypatch.setattr(specs, "_cache", {})
+    specs.load_cache(tmp_path / "specs.json")
+    assert specs.cache_size() == 1
+    monkeypatch.setattr(specs, "_cache", {})
+    monkeypatch.setattr(specs, "EXTRACTOR_VERSION", specs.EXTRACTOR_VERSION + 1)
+    specs.load_cache(tmp_path / "specs.json")       # written by the old patterns
+    assert specs.cache_size() == 0
@@ -0,0 +1,70 @@
+import contextlib
+import io
+
+import engine
+from conftest import site
+
+
+def throttle(host="example.test") -> engine.Throttle:
+    return engine.Throttle(host, delay=0.6, ceiling=4, site="test")
+
+
+def test_one_fast_response_does_not_stop_recovery():
+    t = throttle()
+    for _ in range(20):
+        t.success(0.2)
+    t.success(0.01)                 # jitter, a 304, a tiny page
+    for _ in range(100):
+        t.success(0.2)
+    assert t.limit == 4
+    assert engine.metrics.summary("test")["counters"].get("throttle_latency", 0) == 0
+
+
+def test_saved_baseline_is_the_usual_latency_not_the_minimum():
+    t = throttle()
+    for seconds in [0.2] * 30 + [0.01]:
+        t.success(seconds)
+    t.save()
+    again = throttle()
+    assert again.baseline() == 0.2
+    for _ in range(60):
+        again.success(0.2)
+    assert again.limit == 4
+
+
+def test_detail_pages_keep_their_own_baseline():
+    t = throttle()
+    for _ in range(30):
+        t.success(0.02, "detail")
+    for _ in range(100):
+        t.success(0.3)              # listing pages are slower; not a spike
+    assert t.limit == 4
+    assert t.baseline("detail") == 0.02 and t.baseline() == 0.3
+
+
+def test_a_sustained_spike_still_halves_the_limit():
+    t = throttle()
+    for _ in range(60):
+        t.success(0.2)
+    limit = t.limit
+    for _ in range(5):
+        t.success(2.0)
+    assert t.limit <= limit / 2
+    assert engine.metrics.summary("test")["counters"]["throttle_latency"] >= 1
+
+
+def test_old_minimum_baseline_in_the_cache_is_ignored(sandbox):
+    engine.THROTTLE_CACHE.parent.mkdir(parents=True)
+    engine.THROTTLE_CACHE.write_text('{"example.test": {"limit": 1.0, "baseline_s": 0.001}}')
+    t = throttle()
+    assert t.baseline() is None
+    for _ in range(40):
+        t.success(0.2)
+    assert t.limit == 4
+
+
+def test_scrape_saves_the_page_baseline(server):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.scrape(site("ctrl"))
+    saved = engine._load_throttles(engine.THROTTLE_CACHE)
+    assert set(saved[engine.host_of(site("ctrl"))]["baseline_s"]) == {"page"}